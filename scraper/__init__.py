@@ -0,0 +1,6 @@
+"""
+Python tooling for the Google Maps scraping pipeline.
+
+Modules are run from the repository root, e.g. ``python3 -m scraper.ingest``.
+Only the standard library is used so the workflow needs no ``pip install``.
+"""
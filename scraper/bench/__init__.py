@@ -0,0 +1,6 @@
+"""
+Benchmarks and synthetic data for the ingestion pipeline.
+
+    python3 -m scraper.bench.synth --rows 10000 --output /tmp/synth.csv
+    python3 -m scraper.bench.run --sizes 1000,10000,100000
+"""
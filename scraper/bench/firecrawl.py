@@ -0,0 +1,130 @@
+"""
+Local stand-in for the Firecrawl scrape API.
+
+Answers ``POST /v1/scrape`` with deterministic markdown for the requested URL
+after a configurable latency. It can also refuse a share of requests with 429
+and Retry-After, and enforce its own requests-per-second limit, so
+scraper.enrich can be exercised without an API key:
+
+    python3 -m scraper.bench.firecrawl --port 8787 --latency 0.2 --error-rate 0.05 &
+    FIRECRAWL_API_KEY=test python3 -m scraper.enrich --leads leads.jsonl \\
+      --api-url http://127.0.0.1:8787 --output /tmp/enriched.jsonl
+
+Prints request, connection and status counts when stopped.
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockFirecrawl(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.0, error_rate=0.0, rate_limit=0.0, seed=0):
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = Counter()
+        self.urls = Counter()
+        self._window = []
+
+    def admit(self):
+        """False if this request breaks the injected error rate or rate limit."""
+        with self.lock:
+            if self.error_rate and self.rng.random() < self.error_rate:
+                return False
+            if self.rate_limit:
+                now = time.monotonic()
+                self._window = [t for t in self._window if now - t < 1.0]
+                if len(self._window) >= self.rate_limit:
+                    return False
+                self._window.append(now)
+            return True
+
+
+def markdown_for(url):
+    digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    return (f"# Practice at {url}\n\nWe offer general, cosmetic and emergency dentistry.\n\n"
+            f"Reference {digest[:12]}.\n")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.stats["connections"] += 1
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, payload, headers=()):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        with self.server.lock:
+            self.server.stats[status] += 1
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length)
+        with self.server.lock:
+            self.server.stats["requests"] += 1
+        if self.path != "/v1/scrape":
+            return self._reply(404, {"success": False, "error": "Not found"})
+        if not (self.headers.get("Authorization") or "").startswith("Bearer "):
+            return self._reply(401, {"success": False, "error": "Unauthorized"})
+        try:
+            url = json.loads(raw)["url"]
+        except (ValueError, KeyError):
+            return self._reply(400, {"success": False, "error": "url is required"})
+        if not self.server.admit():
+            return self._reply(429, {"success": False, "error": "Rate limit exceeded"},
+                               [("Retry-After", "1")])
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        with self.server.lock:
+            self.server.urls[url] += 1
+        self._reply(200, {"success": True, "data": {"markdown": markdown_for(url),
+                                                    "metadata": {"sourceURL": url}}})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a mock Firecrawl scrape API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per scrape")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered 429")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests per second before 429")
+    args = parser.parse_args(argv)
+
+    server = MockFirecrawl((args.host, args.port), args.latency, args.error_rate, args.rate_limit)
+    print(f"Mock Firecrawl on http://{args.host}:{args.port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        most = max(server.urls.values(), default=0)
+        print(json.dumps({**{str(k): v for k, v in server.stats.items()},
+                          "distinct_urls": len(server.urls), "max_requests_per_url": most}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Throughput and peak-RSS benchmarks for the ingestion pipeline.
+
+Each (case, size) pair runs in a fresh subprocess so its peak RSS is its own.
+Results are appended as JSON lines (one per case/size, tagged with the git
+revision) so runs can be compared over time. The default results file is
+gitignored, so local runs never show up as changes to the tree.
+
+Cases:
+    parse     stream and type every row (gosom_csv.read_records)
+    scan      filter DentistRecords by rating and bounding box (records
+              ``matched``)
+    dedup     filter the batch through a fresh dedup index
+    append    append to the accumulated CSV and the column store
+    progress  sync a ledger with one query per 60 rows, then drain it in
+              batches of 20 recording an outcome per query
+    cities    build cities.txt content from the catalog (size-independent)
+
+Usage (from the repository root):
+    python3 -m scraper.bench.run --sizes 1000,10000,100000
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from . import synth
+from ..metrics import peak_rss_kb
+
+CASES = ["parse", "scan", "dedup", "append", "progress", "cities"]
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_OUTPUT = "scraper/bench/results.jsonl"
+
+
+def run_case(case, data_file, rows, workdir):
+    """
+    Run one case in this process; returns the number of items processed, or
+    (items, extra counts to record with the result).
+    """
+    if case == "parse":
+        from ..gosom_csv import read_records
+        return sum(1 for _ in read_records(data_file))
+    if case == "scan":
+        from ..record import iter_dentists
+        # JSON columns are never touched, so none are decoded
+        scanned = matched = 0
+        for record in iter_dentists(data_file):
+            scanned += 1
+            if (record.rating or 0) >= 3.5 and record.has_location and 0 <= record.latitude <= 60:
+                matched += 1
+        return scanned, {"matched": matched}
+    if case == "dedup":
+        from ..dedup import dedup_file
+        stats = dedup_file(data_file, os.path.join(workdir, "index.sqlite"),
+                           os.path.join(workdir, "delta.csv"))
+        return sum(stats.values())
+    if case == "append":
+        from ..ingest import ingest
+        return ingest(data_file, os.path.join(workdir, "all.csv"),
+                      os.path.join(workdir, "store"))
+    if case == "progress":
+        from ..ledger import DONE, Ledger
+        queries = [f"dentists Area {i}, Synthetic City" for i in range(max(1, rows // 60))]
+        with Ledger(os.path.join(workdir, "ledger.sqlite")) as ledger:
+            ledger.sync(queries)
+            recorded = 0
+            while True:
+                batch = ledger.select_batch(20)
+                if not batch:
+                    break
+                for qid, _ in batch:
+                    ledger.record(qid, DONE, rows=60, duration=1.0)
+                    recorded += 1
+            ledger.write_progress(os.path.join(workdir, "progress.json"))
+        return recorded
+    if case == "cities":
+        from .. import generate_cities
+        _, total = generate_cities.generate_cities_file()
+        return total
+    raise ValueError(f"unknown case {case}")
+
+
+def _child(case, data_file, rows):
+    workdir = tempfile.mkdtemp(prefix="bench-")
+    try:
+        started = time.perf_counter()
+        items = run_case(case, data_file, int(rows), workdir)
+        seconds = time.perf_counter() - started
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    extra = {}
+    if isinstance(items, tuple):
+        items, extra = items
+    print(json.dumps({"items": items, **extra, "seconds": seconds, "peak_rss_kb": peak_rss_kb()}))
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def benchmark(cases, sizes, datadir, log=print):
+    """Yield one result dict per (case, size)."""
+    revision = _git_revision()
+    for size in sizes:
+        data_file = os.path.join(datadir, f"synth-{size}.csv")
+        if not os.path.exists(data_file):
+            log(f"Generating {size} rows -> {data_file}")
+            synth.write_csv(synth.generate(size), data_file)
+        for case in cases:
+            if case == "cities" and size != sizes[0]:
+                continue
+            out = subprocess.run(
+                [sys.executable, "-m", "scraper.bench.run", "--child", case, data_file, str(size)],
+                capture_output=True, text=True, check=True,
+            ).stdout
+            measured = json.loads(out.strip().splitlines()[-1])
+            result = {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "revision": revision,
+                "python": platform.python_version(),
+                "case": case,
+                "rows": size if case != "cities" else None,
+                "file_bytes": os.path.getsize(data_file) if case != "cities" else None,
+                **measured,
+                "items_per_second": measured["items"] / measured["seconds"] if measured["seconds"] else None,
+            }
+            log(f"{case:9} {size:>9} rows  {measured['seconds']:8.3f}s  "
+                f"{result['items_per_second'] or 0:12.0f}/s  {measured['peak_rss_kb'] / 1024:8.1f} MiB")
+            yield result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the ingestion pipeline")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated row counts, e.g. 1000,10000,100000,1000000")
+    parser.add_argument("--cases", default=",".join(CASES))
+    parser.add_argument("--datadir", help="keep generated CSVs here for reuse")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON lines file to append to")
+    parser.add_argument("--child", nargs=3, metavar=("CASE", "FILE", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        _child(*args.child)
+        return
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    cases = [c for c in args.cases.split(",") if c]
+    unknown = set(cases) - set(CASES)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+
+    datadir = args.datadir or tempfile.mkdtemp(prefix="bench-data-")
+    os.makedirs(datadir, exist_ok=True)
+    try:
+        results = list(benchmark(cases, sizes, datadir))
+    finally:
+        if not args.datadir:
+            shutil.rmtree(datadir, ignore_errors=True)
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "a", encoding="utf-8") as f:
+        for result in results:
+            f.write(json.dumps(result) + "\n")
+    print(f"Appended {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
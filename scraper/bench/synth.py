@@ -0,0 +1,219 @@
+"""
+Synthetic gosom-format CSV generator.
+
+Rows mimic results.csv: quoted JSON columns (reviews with embedded newlines,
+popular times, opening hours), unicode names and addresses, and a share of
+duplicate places as returned by overlapping neighbourhood queries, some of
+them with changed ratings.
+
+Also usable as a stand-in for the gosom scraper (``stub`` mode), which reads
+``-input`` queries and writes ``-results`` with a few rows per query:
+
+    python3 -m scraper.runner queries.txt out.csv \\
+      --command "python3 -m scraper.bench.synth stub -input {input_path} -results {results_path}"
+
+For exercising the runner, the stub can also take ``-seconds-per-query`` to
+scrape, idle for ``-exit-on-inactivity`` before exiting as gosom does, hang
+on queries containing ``-hang-on``, and fail while ``-fail-once`` names a
+file that does not exist yet (creating it, so the retry succeeds).
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import re
+import sys
+import time
+
+from ..gosom_csv import COLUMNS
+from ..ledger import query_id, split_input
+
+CITIES = [
+    ("Tokyo", "Japan", 35.6762, 139.6503, "Asia/Tokyo", "JP"),
+    ("São Paulo", "Brazil", -23.5505, -46.6333, "America/Sao_Paulo", "BR"),
+    ("İstanbul", "Turkey", 41.0082, 28.9784, "Europe/Istanbul", "TR"),
+    ("New York", "USA", 40.7128, -74.0060, "America/New_York", "US"),
+    ("Mumbai", "India", 19.0760, 72.8777, "Asia/Kolkata", "IN"),
+    ("Zürich", "Switzerland", 47.3769, 8.5417, "Europe/Zurich", "CH"),
+    ("Cairo", "Egypt", 30.0444, 31.2357, "Africa/Cairo", "EG"),
+    ("Ciudad de México", "Mexico", 19.4326, -99.1332, "America/Mexico_City", "MX"),
+]
+
+NAME_PARTS = [
+    "Smile", "Dental", "Clinic", "Care", "Family", "Bright", "Odontologia",
+    "Diş Kliniği", "歯科医院", "デンタルクリニック", "Zahnarztpraxis", "Clínica",
+    "Orthodontics", "Implant Center", "Sorriso", "Gülüş", "Dentistry",
+]
+REVIEW_WORDS = (
+    "great friendly staff clean office painless cleaning explained everything "
+    "waited long appointment recommend dentist hygienist crown filling muito "
+    "bom atendimento çok memnun kaldım 丁寧 な 説明"
+).split()
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def _reviews(rng, count):
+    reviews = []
+    for _ in range(count):
+        lines = [" ".join(rng.choices(REVIEW_WORDS, k=rng.randint(8, 30)))
+                 for _ in range(rng.randint(1, 3))]
+        reviews.append({
+            "Name": f"Reviewer {rng.randint(1, 99999)}",
+            "ProfilePicture": f"https://lh3.googleusercontent.com/a/{rng.getrandbits(64):x}=s120",
+            "Rating": rng.randint(1, 5),
+            # Multi-line descriptions are what broke split('\n') appends
+            "Description": "\n".join(lines),
+            "Images": None,
+            "When": f"{rng.randint(1, 11)} months ago",
+        })
+    return reviews
+
+
+def make_place(rng, index):
+    """One distinct synthetic place as a gosom row dict."""
+    city, country, lat, lon, tz, cc = rng.choice(CITIES)
+    lat += rng.uniform(-0.25, 0.25)
+    lon += rng.uniform(-0.25, 0.25)
+    name = " ".join(rng.sample(NAME_PARTS, rng.randint(2, 3)))
+    street = f"{rng.randint(1, 999)} {rng.choice(['Rua', 'Cadde', 'Ave', '通り', 'Strasse'])} {index}"
+    cid = str(rng.getrandbits(63))
+    data_id = f"0x{rng.getrandbits(60):x}:0x{int(cid):x}"
+    place_id = f"ChIJ{index:010d}{rng.getrandbits(40):010x}"
+    per_rating = {str(s): rng.randint(0, 300) for s in range(1, 6)}
+    review_count = sum(per_rating.values())
+    rating = sum(int(s) * n for s, n in per_rating.items()) / max(review_count, 1)
+    hours = {d: [f"{rng.randint(7, 10)} am–{rng.randint(4, 8)} pm"] for d in DAYS}
+    popular = {d: {str(h): rng.randint(0, 100) for h in range(6, 24)} for d in DAYS}
+    site = f"https://www.{name.split()[0].lower()}-{index}.example.com/"
+    return {
+        "input_id": "",
+        "link": f"https://www.google.com/maps/place/{name.replace(' ', '+')}/data=!4m7!3m6!1s{data_id}",
+        "title": name,
+        "category": "Dentist",
+        "address": f"{street}, {city}, {country}",
+        "open_hours": json.dumps(hours, ensure_ascii=False),
+        "popular_times": json.dumps(popular),
+        "website": site if rng.random() < 0.85 else "",
+        "phone": f"+{rng.randint(1, 99)} {rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+        "plus_code": f"{rng.getrandbits(20):X}+{rng.randint(10, 99)} {city}",
+        "review_count": str(review_count),
+        "review_rating": f"{rating:.6f}",
+        "reviews_per_rating": json.dumps(per_rating),
+        "latitude": f"{lat:.6f}",
+        "longitude": f"{lon:.6f}",
+        "cid": cid,
+        "status": "",
+        "descriptions": "",
+        "reviews_link": "",
+        "thumbnail": f"https://lh3.googleusercontent.com/p/{rng.getrandbits(80):x}=w408-h270-k-no",
+        "timezone": tz,
+        "price_range": "",
+        "data_id": data_id,
+        "place_id": place_id,
+        "images": json.dumps([{"title": "All", "image": f"https://lh3.googleusercontent.com/p/{rng.getrandbits(64):x}"}
+                              for _ in range(rng.randint(1, 6))]),
+        "reservations": "null",
+        "order_online": "null",
+        "menu": json.dumps({"link": "", "source": ""}),
+        "owner": json.dumps({"id": str(rng.getrandbits(60)), "name": f"{name} (Owner)"}, ensure_ascii=False),
+        "complete_address": json.dumps({"street": street, "city": city, "postal_code": str(rng.randint(10000, 99999)),
+                                        "state": "", "country": cc}, ensure_ascii=False),
+        "about": json.dumps([{"id": "accessibility", "name": "Accessibility",
+                              "options": [{"name": "Wheelchair-accessible entrance", "enabled": rng.random() < 0.5}]}]),
+        "user_reviews": json.dumps(_reviews(rng, rng.randint(0, 8)), ensure_ascii=False),
+        "user_reviews_extended": "null",
+        "emails": json.dumps([f"info@{name.split()[0].lower()}{index}.example.com"]) if rng.random() < 0.3 else "",
+    }
+
+
+def generate(rows, duplicate_rate=0.25, change_rate=0.3, seed=0, queries=None):
+    """
+    Yield ``rows`` synthetic rows.
+
+    ``duplicate_rate`` of them repeat an earlier place; ``change_rate`` of those
+    repeats come back with a different rating/review count.
+    """
+    rng = random.Random(seed)
+    queries = queries or [f"dentists Area {i}, Synthetic City" for i in range(max(1, rows // 60))]
+    ids = [query_id(q) for q in queries]
+    places = []
+    for i in range(rows):
+        if places and rng.random() < duplicate_rate:
+            row = dict(rng.choice(places))
+            if rng.random() < change_rate:
+                row["review_count"] = str(int(row["review_count"]) + rng.randint(1, 20))
+                row["review_rating"] = f"{min(5.0, float(row['review_rating']) + 0.01):.6f}"
+        else:
+            row = make_place(rng, i)
+            places.append(row)
+        row["input_id"] = ids[i * len(ids) // rows]
+        yield row
+
+
+def write_csv(rows, path):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def duration_seconds(value):
+    """Seconds in a Go duration such as "1m", "90s" or "1m30s" ("" is 0)."""
+    units = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+    parts = re.findall(r"([0-9.]+)(ms|h|m|s)", value or "")
+    if "".join(n + u for n, u in parts) != (value or ""):
+        raise ValueError(f"bad duration {value!r}")
+    return sum(float(n) * units[u] for n, u in parts)
+
+
+def stub(argv):
+    """Minimal gosom command-line stand-in for local runs."""
+    parser = argparse.ArgumentParser(prog="synth stub")
+    parser.add_argument("-input", required=True)
+    parser.add_argument("-results", required=True)
+    parser.add_argument("-rows-per-query", type=int, default=20)
+    parser.add_argument("-seconds-per-query", type=float, default=0.0)
+    parser.add_argument("-exit-on-inactivity", default="")
+    parser.add_argument("-hang-on")
+    parser.add_argument("-fail-once")
+    args, _ = parser.parse_known_args(argv)
+
+    if args.fail_once and not os.path.exists(args.fail_once):
+        open(args.fail_once, "w").close()
+        sys.exit("stub: failing once")
+    with open(args.input, "r", encoding="utf-8") as f:
+        lines = [line for line in f if line.strip()]
+    if args.hang_on and any(args.hang_on in line for line in lines):
+        time.sleep(3600)
+    time.sleep(args.seconds_per_query * len(lines))
+    rows = []
+    for line in lines:
+        query, qid = split_input(line)
+        seed = int(qid[:8], 16) if all(c in "0123456789abcdef" for c in qid[:8]) else len(query)
+        for row in generate(args.rows_per_query, seed=seed, queries=[query]):
+            row["input_id"] = qid
+            rows.append(row)
+    write_csv(rows, args.results)
+    time.sleep(duration_seconds(args.exit_on_inactivity))
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "stub":
+        stub(argv[1:])
+        return
+    parser = argparse.ArgumentParser(description="Generate a synthetic gosom CSV")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--duplicates", type=float, default=0.25, help="share of repeated places")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args(argv)
+
+    write_csv(generate(args.rows, args.duplicates, seed=args.seed), args.output)
+    print(f"Wrote {args.rows} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
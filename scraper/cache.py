@@ -0,0 +1,247 @@
+"""
+Content-addressed cache for scraped website markdown.
+
+Chains share one website across many listed locations (e.g. every "A Dental365
+Company" practice), often with different tracking parameters per listing.
+Entries are keyed by a namespace and a normalised URL. Each entry points at
+an object file named by the sha256 of its content, so identical pages are
+stored once however many keys lead to them.
+
+A SQLite index records when each entry was written and last read:
+
+- entries older than the TTL are treated as missing
+- when stored objects exceed the size budget, the least recently read entries
+  are dropped first, then any objects no longer referenced
+
+Usage (from the repository root):
+    python3 -m scraper.cache stats
+    python3 -m scraper.cache evict --max-mb 512
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DEFAULT_ROOT = "scraper/cache"
+DEFAULT_TTL_DAYS = 30
+DEFAULT_MAX_BYTES = 1 << 30
+INDEX_FILE = "index.sqlite"
+OBJECTS_DIR = "objects"
+
+# Query parameters that identify the listing or campaign, not the page
+TRACKING_PARAMS = frozenset([
+    "gclid", "fbclid", "msclkid", "dclid", "yclid", "_ga", "mc_cid", "mc_eid", "y_source",
+])
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace   TEXT NOT NULL,
+    key         TEXT NOT NULL,
+    digest      TEXT NOT NULL,
+    created     REAL NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS entries_by_access ON entries (last_access);
+CREATE INDEX IF NOT EXISTS entries_by_digest ON entries (digest);
+CREATE TABLE IF NOT EXISTS objects (
+    digest TEXT PRIMARY KEY,
+    size   INTEGER NOT NULL
+);
+"""
+
+
+def normalize_url(url):
+    """
+    Canonical form of a practice URL.
+
+    Adds https:// to bare domains, lower-cases the host, drops ``www.``,
+    default ports, fragments and tracking parameters (``utm_*``, ``gclid``...),
+    sorts the remaining query and trims trailing slashes, so
+    ``HTTP://www.Example.com:80/?utm_source=gmb`` -> ``http://example.com``.
+    """
+    url = url.strip()
+    if "://" not in url:
+        url = f"https://{url}"
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower().rstrip(".")
+    if host.startswith("www."):
+        host = host[4:]
+    netloc = host
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{parts.port}"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, netloc, parts.path.rstrip("/"), urlencode(query), ""))
+
+
+def content_hash(content):
+    """sha256 hex digest of text or bytes."""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+class ContentCache:
+    """sha256-addressed object files with a SQLite key index, TTL and LRU eviction."""
+
+    def __init__(self, root=DEFAULT_ROOT, ttl=DEFAULT_TTL_DAYS * 86400, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.join(root, OBJECTS_DIR), exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(root, INDEX_FILE))
+        self.conn.executescript(_SCHEMA)
+        self.hits = 0
+        self.misses = 0
+
+    def _object_path(self, digest):
+        return os.path.join(self.root, OBJECTS_DIR, digest[:2], digest[2:])
+
+    def get(self, namespace, key):
+        """Cached text for a key, or None if absent or older than the TTL."""
+        now = time.time()
+        found = self.conn.execute(
+            "SELECT digest, created FROM entries WHERE namespace = ? AND key = ?",
+            (namespace, key),
+        ).fetchone()
+        if found is None or (self.ttl and now - found[1] > self.ttl):
+            self.misses += 1
+            return None
+        digest = found[0]
+        try:
+            with open(self._object_path(digest), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            with self.conn:
+                self.conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+            self.misses += 1
+            return None
+        with self.conn:
+            self.conn.execute(
+                "UPDATE entries SET last_access = ? WHERE namespace = ? AND key = ?",
+                (now, namespace, key),
+            )
+        self.hits += 1
+        return data.decode("utf-8")
+
+    def put(self, namespace, key, content):
+        """Store text under a key; returns its sha256 digest."""
+        data = content.encode("utf-8")
+        digest = content_hash(data)
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        now = time.time()
+        with self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO objects (digest, size) VALUES (?, ?)",
+                              (digest, len(data)))
+            self.conn.execute(
+                "INSERT INTO entries (namespace, key, digest, created, last_access)"
+                " VALUES (?, ?, ?, ?, ?) ON CONFLICT (namespace, key) DO UPDATE SET"
+                " digest = excluded.digest, created = excluded.created,"
+                " last_access = excluded.last_access",
+                (namespace, key, digest, now, now),
+            )
+        return digest
+
+    def total_bytes(self):
+        return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+
+    def evict(self, max_bytes=None):
+        """
+        Drop expired entries, then least recently read ones until the objects
+        fit in ``max_bytes``; delete unreferenced objects. Returns bytes freed.
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        before = self.total_bytes()
+        with self.conn:
+            if self.ttl:
+                self.conn.execute("DELETE FROM entries WHERE created < ?", (time.time() - self.ttl,))
+            freed = self._collect()
+            total = before - freed
+            if max_bytes is not None and total > max_bytes:
+                # Sizes are per object, so walk entries oldest-read first and
+                # count an object once its last referencing entry is gone
+                for namespace, key, digest in self.conn.execute(
+                        "SELECT namespace, key, digest FROM entries ORDER BY last_access").fetchall():
+                    self.conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ?",
+                                      (namespace, key))
+                    if self.conn.execute("SELECT 1 FROM entries WHERE digest = ? LIMIT 1",
+                                         (digest,)).fetchone() is None:
+                        total -= self.conn.execute("SELECT size FROM objects WHERE digest = ?",
+                                                   (digest,)).fetchone()[0]
+                        if total <= max_bytes:
+                            break
+                freed += self._collect()
+        return freed
+
+    def _collect(self):
+        """Delete objects no entry points at; returns bytes freed."""
+        orphans = self.conn.execute(
+            "SELECT digest, size FROM objects WHERE digest NOT IN (SELECT digest FROM entries)"
+        ).fetchall()
+        for digest, _ in orphans:
+            try:
+                os.remove(self._object_path(digest))
+            except FileNotFoundError:
+                pass
+        self.conn.executemany("DELETE FROM objects WHERE digest = ?", ((d,) for d, _ in orphans))
+        return sum(size for _, size in orphans)
+
+    def stats(self):
+        entries, keys_per_object = self.conn.execute(
+            "SELECT COUNT(*), COUNT(*) * 1.0 / MAX(1, COUNT(DISTINCT digest)) FROM entries"
+        ).fetchone()
+        namespaces = dict(self.conn.execute(
+            "SELECT namespace, COUNT(*) FROM entries GROUP BY namespace").fetchall())
+        objects = self.conn.execute("SELECT COUNT(*) FROM objects").fetchone()[0]
+        return {
+            "entries": entries,
+            "objects": objects,
+            "bytes": self.total_bytes(),
+            "keys_per_object": round(keys_per_object, 2),
+            "namespaces": namespaces,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or trim the content cache")
+    parser.add_argument("command", choices=["stats", "evict"])
+    parser.add_argument("--root", default=DEFAULT_ROOT)
+    parser.add_argument("--ttl-days", type=float, default=DEFAULT_TTL_DAYS)
+    parser.add_argument("--max-mb", type=float, default=DEFAULT_MAX_BYTES / (1 << 20))
+    args = parser.parse_args(argv)
+
+    with ContentCache(args.root, args.ttl_days * 86400, int(args.max_mb * (1 << 20))) as cache:
+        if args.command == "evict":
+            print(f"Freed {cache.evict()} bytes")
+        for name, value in cache.stats().items():
+            print(f"{name:16} {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+City catalog: every area the scraper covers, loaded from catalog.json.
+
+The catalog lists tiers (megacities and large cities split into
+neighbourhoods, medium cities as single queries). Each tier maps a group, e.g.
+``Tokyo, Japan`` or ``Nigeria``, to its area names. Loading compiles it once
+into an ordered list of CatalogQuery entries. Each entry carries its ledger
+query id, its position, and its tier, country, city and neighbourhood. A dict
+gives O(1) lookup by id or text. The compiled catalog is cached per file
+version, so every step in a process shares one copy.
+
+cities.txt is generated from the catalog (see generate_cities.py) as a
+readable listing; the workflow reads the catalog directly.
+
+Usage (from the repository root):
+    python3 -m scraper.catalog stats
+    python3 -m scraper.catalog list --tier megacity --country Japan
+    python3 -m scraper.catalog position "dentists Shinjuku, Tokyo, Japan"
+"""
+
+import argparse
+import json
+import os
+from functools import lru_cache
+
+from .ledger import query_id
+
+DEFAULT_CATALOG = "scraper/catalog.json"
+FORMAT_VERSION = 1
+
+NEIGHBORHOODS = "neighborhoods"
+CITIES = "cities"
+
+
+class CatalogQuery:
+    """One query of the catalog and where it sits."""
+
+    __slots__ = ("query", "query_id", "position", "tier", "group", "name",
+                 "country", "city", "neighborhood")
+
+    def __init__(self, query, position, tier, group, name, kind):
+        self.query = query
+        self.query_id = query_id(query)
+        self.position = position
+        self.tier = tier
+        self.group = group
+        self.name = name
+        parts = [p.strip() for p in group.split(",")]
+        self.country = parts[-1]
+        if kind == NEIGHBORHOODS:
+            self.city = parts[0]
+            self.neighborhood = name
+        else:
+            self.city = name
+            self.neighborhood = None
+
+    @property
+    def city_key(self):
+        """``City, Country``, the grouping key used for peer percentiles."""
+        return f"{self.city}, {self.country}"
+
+    def __repr__(self):
+        return f"CatalogQuery({self.query!r}, position={self.position}, tier={self.tier!r})"
+
+
+class Catalog:
+    """Compiled, indexed catalog."""
+
+    def __init__(self, data):
+        if data.get("version") != FORMAT_VERSION:
+            raise ValueError(f"unsupported catalog version {data.get('version')!r}")
+        self.version = data["version"]
+        self.tiers = data["tiers"]
+        template = data["query_format"]
+        self.queries = []
+        self._by_id = {}
+        for tier in self.tiers:
+            for group, names in tier["groups"].items():
+                for name in names:
+                    entry = CatalogQuery(template.format(name=name, group=group), len(self.queries),
+                                         tier["name"], group, name, tier["kind"])
+                    # The same area listed twice keeps its first position
+                    if entry.query_id not in self._by_id:
+                        self._by_id[entry.query_id] = entry
+                        self.queries.append(entry)
+
+    def __len__(self):
+        return len(self.queries)
+
+    def __iter__(self):
+        return iter(self.queries)
+
+    def get(self, query_or_id):
+        """The entry for a query id (e.g. a row's input_id) or query text, or None."""
+        entry = self._by_id.get(query_or_id)
+        if entry is None:
+            entry = self._by_id.get(query_id(query_or_id))
+        return entry
+
+    def position(self, query_or_id):
+        """Position of a query in catalog order, or None if not listed."""
+        entry = self.get(query_or_id)
+        return entry.position if entry else None
+
+    def filter(self, tiers=None, countries=None, min_population=None):
+        """
+        Entries in the given tiers and countries whose tier reaches
+        ``min_population``. Populations are tier bands, not per city.
+        """
+        tiers = set(tiers) if tiers else None
+        countries = {c.casefold() for c in countries} if countries else None
+        if min_population is not None:
+            big_enough = {t["name"] for t in self.tiers
+                          if t["max_population"] is None or t["max_population"] > min_population}
+            tiers = big_enough if tiers is None else tiers & big_enough
+        return [
+            q for q in self.queries
+            if (tiers is None or q.tier in tiers)
+            and (countries is None or q.country.casefold() in countries)
+        ]
+
+    def texts(self, entries=None):
+        """Query strings, for Ledger.sync."""
+        return [q.query for q in (self.queries if entries is None else entries)]
+
+    def cities_txt(self):
+        """cities.txt content: queries under tier and group headings."""
+        lines = []
+        entries = iter(self.queries)
+        entry = next(entries, None)
+        for tier in self.tiers:
+            lines.append(f"# {tier['title']}")
+            lines.append("")
+            for group in tier["groups"]:
+                lines.append(f"# {group}")
+                while entry is not None and entry.tier == tier["name"] and entry.group == group:
+                    lines.append(entry.query)
+                    entry = next(entries, None)
+                lines.append("")
+        return "\n".join(lines)
+
+
+@lru_cache(maxsize=4)
+def _load(path, mtime_ns):
+    with open(path, "r", encoding="utf-8") as f:
+        return Catalog(json.load(f))
+
+
+def load_catalog(path=DEFAULT_CATALOG):
+    """The compiled catalog, reused until the file changes."""
+    return _load(os.path.abspath(path), os.stat(path).st_mtime_ns)
+
+
+def parse_list(value):
+    return [v.strip() for v in value.split(",") if v.strip()] if value else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect the city catalog")
+    parser.add_argument("--catalog", default=DEFAULT_CATALOG)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="query counts per tier")
+    listing = sub.add_parser("list", help="print queries, optionally filtered")
+    listing.add_argument("--tier", help="comma-separated tiers, e.g. megacity,large")
+    listing.add_argument("--country", help="comma-separated countries")
+    listing.add_argument("--min-population", type=int)
+    position = sub.add_parser("position", help="where a query sits in the catalog")
+    position.add_argument("query", help="query text or id")
+    args = parser.parse_args(argv)
+
+    catalog = load_catalog(args.catalog)
+    if args.command == "stats":
+        for tier in catalog.tiers:
+            count = sum(1 for q in catalog if q.tier == tier["name"])
+            print(f"{tier['name']:10} {len(tier['groups']):4} groups {count:5} queries")
+        print(f"{'total':10} {len(catalog):22} queries")
+    elif args.command == "list":
+        for q in catalog.filter(parse_list(args.tier), parse_list(args.country), args.min_population):
+            print(f"{q.position:5} {q.query_id} {q.query}")
+    else:
+        entry = catalog.get(args.query)
+        if entry is None:
+            parser.exit(1, f"{args.query!r} is not in the catalog\n")
+        print(f"{entry.position} {entry.query_id} {entry.tier} {entry.city_key}"
+              + (f" / {entry.neighborhood}" if entry.neighborhood else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+Append-only columnar store for accumulated scraper results.
+
+Each appended batch becomes one immutable segment file. Inside a segment every
+column is stored as its own zlib-compressed block, so a reader that only needs
+``latitude``/``longitude`` never touches the review blobs. Segments are read
+through ``mmap`` and located via a JSON footer:
+
+    [column block]...[footer JSON][footer length: u64 LE][MAGIC]
+
+Column encodings:
+    "f64"  array('d') of floats, NaN for missing
+    "i64"  array('q') of ints, INT_NULL for missing
+    "str"  concatenated UTF-8 bytes, plus a second block holding an
+           array('I') of per-value byte lengths
+
+``manifest.json`` lists the segments in append order.
+"""
+
+import itertools
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+from .gosom_csv import COLUMNS, FLOAT_COLUMNS, INT_COLUMNS, to_float, to_int
+
+MAGIC = b"DNCS"
+FORMAT_VERSION = 1
+INT_NULL = -(2**63)
+MANIFEST = "manifest.json"
+# Larger batches are split across several segments
+SEGMENT_ROWS = 50000
+_TRAILER = struct.Struct("<Q4s")
+_COMPRESS_CHUNK = 1 << 18
+
+
+def _encoding_for(column):
+    if column in FLOAT_COLUMNS:
+        return "f64"
+    if column in INT_COLUMNS:
+        return "i64"
+    return "str"
+
+
+class _ColumnWriter:
+    """Accumulates one column, compressing string data as it arrives."""
+
+    def __init__(self, encoding):
+        self.encoding = encoding
+        if encoding == "f64":
+            self.values = array("d")
+        elif encoding == "i64":
+            self.values = array("q")
+        else:
+            self.values = array("I")
+            self._compressor = zlib.compressobj(6)
+            self._chunks = []
+            self._pending = []
+            self._pending_bytes = 0
+
+    def add(self, value):
+        # Unparseable cells ("n/a", "1,234") are stored as missing, not fatal
+        if self.encoding == "f64":
+            number = None if value is None or value == "" else to_float(value)
+            self.values.append(math.nan if number is None else number)
+        elif self.encoding == "i64":
+            number = None if value is None or value == "" else to_int(value)
+            if number is not None and not INT_NULL < number < 2**63:
+                number = None
+            self.values.append(INT_NULL if number is None else number)
+        else:
+            data = ("" if value is None else str(value)).encode("utf-8")
+            self.values.append(len(data))
+            self._pending.append(data)
+            self._pending_bytes += len(data)
+            if self._pending_bytes >= _COMPRESS_CHUNK:
+                self._compress_pending()
+
+    def _compress_pending(self):
+        # Feeding zlib per value is dominated by call overhead; batch it
+        out = self._compressor.compress(b"".join(self._pending))
+        if out:
+            self._chunks.append(out)
+        self._pending = []
+        self._pending_bytes = 0
+
+    def blocks(self):
+        """The compressed block(s) for this column, data first."""
+        if self.encoding == "str":
+            self._compress_pending()
+            self._chunks.append(self._compressor.flush())
+            return [b"".join(self._chunks), zlib.compress(self.values.tobytes(), 6)]
+        return [zlib.compress(self.values.tobytes(), 6)]
+
+
+def _decode_array(blob, typecode, byteorder):
+    data = array(typecode)
+    data.frombytes(blob)
+    if byteorder != sys.byteorder:
+        data.byteswap()
+    return data
+
+
+def write_segment(path, rows, columns):
+    """
+    Write rows (dicts) as a single segment file; returns its row count.
+
+    ``rows`` is consumed once; only compressed data and per-row lengths are
+    held in memory, so large review blobs do not accumulate.
+    """
+    writers = [_ColumnWriter(_encoding_for(c)) for c in columns]
+    count = 0
+    for row in rows:
+        for column, writer in zip(columns, writers):
+            writer.add(row.get(column))
+        count += 1
+
+    footer = {
+        "version": FORMAT_VERSION,
+        "rows": count,
+        "byteorder": sys.byteorder,
+        "columns": {},
+    }
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        offset = 0
+        for column, writer in zip(columns, writers):
+            entry = [writer.encoding]
+            for block in writer.blocks():
+                f.write(block)
+                entry += [offset, len(block)]
+                offset += len(block)
+            footer["columns"][column] = entry
+        meta = json.dumps(footer, separators=(",", ":")).encode("utf-8")
+        f.write(meta)
+        f.write(_TRAILER.pack(len(meta), MAGIC))
+    os.replace(tmp, path)
+    return count
+
+
+class Segment:
+    """Read-only, memory-mapped view of one segment file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        meta_len, magic = _TRAILER.unpack(self._map[-_TRAILER.size:])
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a column segment")
+        start = len(self._map) - _TRAILER.size - meta_len
+        footer = json.loads(self._map[start:start + meta_len])
+        self.rows = footer["rows"]
+        self.columns = footer["columns"]
+        self._byteorder = footer["byteorder"]
+
+    def column(self, name):
+        """Decode one column; missing columns read as all-empty."""
+        if name not in self.columns:
+            return [None if _encoding_for(name) != "str" else ""] * self.rows
+        encoding, offset, length, *lengths_block = self.columns[name]
+        blob = zlib.decompress(self._map[offset:offset + length])
+        if encoding == "f64":
+            return [None if math.isnan(v) else v
+                    for v in _decode_array(blob, "d", self._byteorder)]
+        if encoding == "i64":
+            return [None if v == INT_NULL else v
+                    for v in _decode_array(blob, "q", self._byteorder)]
+        len_offset, len_length = lengths_block
+        lengths = _decode_array(zlib.decompress(self._map[len_offset:len_offset + len_length]),
+                                "I", self._byteorder)
+        values = []
+        position = 0
+        for size in lengths:
+            values.append(blob[position:position + size].decode("utf-8"))
+            position += size
+        return values
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ColumnStore:
+    """A directory of segments plus a manifest recording their order."""
+
+    def __init__(self, root, columns=None):
+        self.root = root
+        self._manifest_path = os.path.join(root, MANIFEST)
+        if os.path.exists(self._manifest_path):
+            with open(self._manifest_path, "r", encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {
+                "version": FORMAT_VERSION,
+                "columns": list(columns or COLUMNS),
+                "rows": 0,
+                "segments": [],
+            }
+
+    @property
+    def columns(self):
+        return self.manifest["columns"]
+
+    @property
+    def rows(self):
+        return self.manifest["rows"]
+
+    def append(self, rows):
+        """
+        Write rows as new segment(s) of at most SEGMENT_ROWS rows each.
+
+        Empty batches are skipped. Returns the number of rows written.
+        """
+        rows = iter(rows)
+        total = 0
+        while True:
+            count = self._append_segment(itertools.islice(rows, SEGMENT_ROWS))
+            total += count
+            if count < SEGMENT_ROWS:
+                return total
+
+    def _append_segment(self, rows):
+        os.makedirs(self.root, exist_ok=True)
+        name = f"seg-{len(self.manifest['segments']) + 1:06d}.dncs"
+        path = os.path.join(self.root, name)
+        count = write_segment(path, rows, self.columns)
+        if count == 0:
+            os.remove(path)
+            return 0
+        self.manifest["segments"].append({
+            "file": name,
+            "rows": count,
+            "bytes": os.path.getsize(os.path.join(self.root, name)),
+        })
+        self.manifest["rows"] += count
+        self._save_manifest()
+        return count
+
+    def _save_manifest(self):
+        tmp = self._manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp, self._manifest_path)
+
+    def segments(self):
+        for entry in self.manifest["segments"]:
+            yield Segment(os.path.join(self.root, entry["file"]))
+
+    def column(self, name):
+        """Yield every value of one column across all segments."""
+        for segment in self.segments():
+            with segment:
+                yield from segment.column(name)
+
+    def scan(self, columns=None):
+        """Yield rows as dicts containing only the requested columns."""
+        columns = list(columns or self.columns)
+        for segment in self.segments():
+            with segment:
+                data = [segment.column(c) for c in columns]
+            for values in zip(*data):
+                yield dict(zip(columns, values))
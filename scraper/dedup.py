@@ -0,0 +1,258 @@
+"""
+Persistent dedup index for scraped places.
+
+Overlapping neighbourhood queries (e.g. Shinjuku vs Shibuya) return many of the
+same places. The index remembers every place seen, keyed by ``place_id`` with
+``cid``/``data_id`` as fallbacks, together with a fingerprint of its content.
+Filtering a batch through it keeps only rows that are new or whose content
+changed, so unchanged places are neither re-synced nor re-stored.
+
+The index is not committed: a binary file rewritten every run would add a
+full copy to git history each time. ``--export`` rebuilds a missing index
+from the export, whose snapshot and deltas hold the latest content of every
+place that passed dedup. Unchanged re-finds never reach the export, so how
+often each place has been returned (``times_seen``, the planner's saturation
+signal) is kept separately in place_hits.csv, one sorted line per place;
+``--hits`` seeds a rebuilt index from it and rewrites it after the batch.
+
+``--outcomes`` also writes the counts per query (``input_id``), which the
+ledger keeps as each query's latest yield and churn.
+
+Usage (from the repository root):
+    python3 -m scraper.dedup scraper/batch_results.csv --export scraper/export \
+        --hits scraper/place_hits.csv --outcomes scraper/batch_outcomes.json
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime, timezone
+
+from .gosom_csv import COLUMNS, append_rows, read_header, read_rows
+from .metrics import stage
+
+DEFAULT_INDEX = "scraper/seen_places.sqlite"
+DEFAULT_HITS = "scraper/place_hits.csv"
+
+NEW = "new"
+CHANGED = "changed"
+UNCHANGED = "unchanged"
+
+# Columns that describe how a place was found rather than the place itself
+_VOLATILE_COLUMNS = frozenset(["input_id"])
+# gosom's own columns; ones added later (city resolution) or dropped by the
+# export don't change a place's fingerprint
+_FINGERPRINT_COLUMNS = sorted(c for c in COLUMNS if c not in _VOLATILE_COLUMNS)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS places (
+    place_key   TEXT PRIMARY KEY,
+    place_id    TEXT,
+    cid         TEXT,
+    data_id     TEXT,
+    fingerprint TEXT NOT NULL,
+    first_seen  TEXT NOT NULL,
+    last_seen   TEXT NOT NULL,
+    times_seen  INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS places_by_place_id ON places (place_id);
+CREATE INDEX IF NOT EXISTS places_by_cid ON places (cid);
+CREATE INDEX IF NOT EXISTS places_by_data_id ON places (data_id);
+"""
+
+
+def place_key(row):
+    """Stable identity for a row, or None if it carries no Google id."""
+    for column in ("place_id", "cid", "data_id"):
+        value = (row.get(column) or "").strip()
+        if value:
+            return f"{column}:{value}"
+    return None
+
+
+def fingerprint(row):
+    """Content hash of a row's gosom columns, ignoring query-specific ones."""
+    digest = hashlib.blake2b(digest_size=16)
+    for column in _FINGERPRINT_COLUMNS:
+        value = row.get(column)
+        digest.update(column.encode("utf-8"))
+        digest.update(b"\x1f")
+        digest.update(("" if value is None else str(value)).encode("utf-8"))
+        digest.update(b"\x1e")
+    return digest.hexdigest()
+
+
+class DedupIndex:
+    """SQLite-backed set of seen places with their content fingerprints."""
+
+    def __init__(self, path=DEFAULT_INDEX):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(_SCHEMA)
+
+    def _lookup(self, row):
+        for column in ("place_id", "cid", "data_id"):
+            value = (row.get(column) or "").strip()
+            if not value:
+                continue
+            found = self.conn.execute(
+                f"SELECT place_key, fingerprint FROM places WHERE {column} = ?",
+                (value,),
+            ).fetchone()
+            if found:
+                return found
+        return None
+
+    def classify(self, row, now=None):
+        """Record a row and return NEW, CHANGED or UNCHANGED."""
+        now = now or datetime.now(timezone.utc).isoformat()
+        fp = fingerprint(row)
+        found = self._lookup(row)
+        if found is None:
+            key = place_key(row)
+            if key is None:
+                # Nothing to dedup on; always ship it
+                return NEW
+            self.conn.execute(
+                "INSERT INTO places (place_key, place_id, cid, data_id, fingerprint,"
+                " first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, row.get("place_id") or "", row.get("cid") or "",
+                 row.get("data_id") or "", fp, now, now),
+            )
+            return NEW
+
+        key, old_fp = found
+        self.conn.execute(
+            "UPDATE places SET fingerprint = ?, last_seen = ?, times_seen = times_seen + 1"
+            " WHERE place_key = ?",
+            (fp, now, key),
+        )
+        return UNCHANGED if fp == old_fp else CHANGED
+
+    def filter(self, rows, stats=None, by_query=None):
+        """
+        Yield only new or changed rows, counting outcomes into ``stats`` and
+        per input_id into ``by_query``.
+        """
+        now = datetime.now(timezone.utc).isoformat()
+        for row in rows:
+            status = self.classify(row, now)
+            if stats is not None:
+                stats[status] = stats.get(status, 0) + 1
+            if by_query is not None:
+                counts = by_query.setdefault(row.get("input_id") or "", {NEW: 0, CHANGED: 0, UNCHANGED: 0})
+                counts[status] += 1
+            if status != UNCHANGED:
+                yield row
+
+    def write_hits(self, path=DEFAULT_HITS):
+        """Write place_key,times_seen for every place, sorted by key."""
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(["place_key", "times_seen"])
+            writer.writerows(self.conn.execute(
+                "SELECT place_key, times_seen FROM places ORDER BY place_key"))
+        os.replace(tmp, path)
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM places").fetchone()[0]
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_hits(path=DEFAULT_HITS):
+    """{place_key: times_seen} from place_hits.csv, or {} if there is none."""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return {row["place_key"]: int(row["times_seen"]) for row in csv.DictReader(f)}
+
+
+def rebuild_index(index_path=DEFAULT_INDEX, export_root=None, hits_path=None):
+    """
+    Create the index from every row in the export, with ``times_seen`` from
+    ``hits_path``; returns places indexed.
+    """
+    # export imports this module for place_key
+    from .export import DEFAULT_EXPORT, Export
+
+    export = Export(export_root or DEFAULT_EXPORT)
+    _, rows = export.rows_since(0, COLUMNS)
+    with DedupIndex(index_path) as index:
+        now = datetime.now(timezone.utc).isoformat()
+        for row in rows:
+            index.classify(row, now)
+        index.conn.executemany("UPDATE places SET times_seen = ? WHERE place_key = ?",
+                               ((seen, key) for key, seen in read_hits(hits_path).items()))
+        return len(index)
+
+
+def dedup_file(batch_file, index_path=DEFAULT_INDEX, output=None, by_query=None):
+    """
+    Rewrite ``batch_file`` (or write ``output``) with only new/changed rows.
+
+    Returns a dict of counts per status; ``by_query`` collects them per input_id.
+    """
+    stats = {NEW: 0, CHANGED: 0, UNCHANGED: 0}
+    header = read_header(batch_file)
+    if header is None:
+        return stats
+    target = output or batch_file
+    tmp = target + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    with DedupIndex(index_path) as index:
+        append_rows(tmp, index.filter(read_rows(batch_file), stats, by_query), header)
+    os.replace(tmp, target)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drop already-seen, unchanged places from a batch CSV")
+    parser.add_argument("batch_file", help="gosom CSV produced by this run")
+    parser.add_argument("--index", default=DEFAULT_INDEX, help="SQLite dedup index")
+    parser.add_argument("--output", help="write filtered rows here instead of in place")
+    parser.add_argument("--export", help="rebuild a missing index from this export first")
+    parser.add_argument("--hits", help="per-place hit counts: seed a rebuilt index, rewrite after")
+    parser.add_argument("--outcomes", help="write per-query new/changed/unchanged counts here (JSON)")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.batch_file):
+        print(f"No batch file at {args.batch_file}")
+        return
+    with stage("dedup") as metrics:
+        if args.export and not os.path.exists(args.index):
+            places = rebuild_index(args.index, args.export, args.hits)
+            metrics.set(rebuilt=places)
+            print(f"Rebuilt dedup index from {args.export}: {places} places")
+        by_query = {}
+        stats = dedup_file(args.batch_file, args.index, args.output, by_query)
+        if args.hits:
+            with DedupIndex(args.index) as index:
+                index.write_hits(args.hits)
+        if args.outcomes:
+            with open(args.outcomes, "w", encoding="utf-8") as f:
+                json.dump(by_query, f, indent=2)
+        metrics.add(rows_in=sum(stats.values()), rows_out=stats[NEW] + stats[CHANGED],
+                    new=stats[NEW], changed=stats[CHANGED], duplicates=stats[UNCHANGED])
+    print(f"Dedup: {stats[NEW]} new, {stats[CHANGED]} changed, "
+          f"{stats[UNCHANGED]} unchanged (skipped)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,387 @@
+"""
+Concurrent website enrichment through Firecrawl.
+
+``process-lead-queue`` scrapes five leads per invocation, one at a time with a
+fixed 2 s pause, then calls itself again. This runner drains every pending lead
+in one process. A fixed pool of asyncio workers shares two kinds of token
+bucket:
+
+- one for the Firecrawl API as a whole (``--api-rate`` requests per second)
+- one per practice website host (``--host-rate``), so the sites of chains
+  with many locations are not hammered
+
+Each worker owns a keep-alive Session (see scraper.uploader) and runs its
+blocking requests on a thread pool, so connections are reused across leads.
+Successful scrapes are kept in the content cache (scraper.cache) by
+normalised URL. Chain locations sharing a website, and reruns within the
+cache TTL, cost no API call. Leads whose URL is already in flight wait for
+that one request.
+
+Every outcome is appended to the output JSON lines file as soon as it is
+known. That file is the checkpoint: a rerun skips leads already scraped and
+leads that have used up their attempts.
+
+Leads come from a JSON lines export of ``dentist_scrapes`` (``id``,
+``website``) or, by default, from the places in the accumulated results.
+
+Usage (from the repository root):
+    FIRECRAWL_API_KEY=... python3 -m scraper.enrich --output scraper/enriched.jsonl
+"""
+
+import argparse
+import asyncio
+import http.client
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+from .cache import DEFAULT_ROOT as DEFAULT_CACHE, ContentCache, normalize_url
+from .dedup import place_key
+from .ingest import DEFAULT_RESULTS, DEFAULT_STORE, scan_results
+from .uploader import RETRY_STATUSES, Session
+
+DEFAULT_API_URL = "https://api.firecrawl.dev"
+SCRAPE_PATH = "/v1/scrape"
+DEFAULT_OUTPUT = "scraper/enriched.jsonl"
+DEFAULT_CONCURRENCY = 8
+DEFAULT_API_RATE = 4.0
+DEFAULT_HOST_RATE = 0.5
+DEFAULT_RETRIES = 3
+DEFAULT_TIMEOUT = 60
+MAX_ATTEMPTS = 3
+
+# Cache namespace for Firecrawl markdown, keyed by normalised URL
+MARKDOWN_NAMESPACE = "firecrawl-markdown"
+
+SCRAPED = "scraped"
+FAILED = "failed"
+
+
+class TokenBucket:
+    """Allows ``rate`` acquisitions per second on average, ``burst`` at once."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self):
+        """Take a token and return 0, or return the seconds until one is free."""
+        if self.rate <= 0:
+            return 0.0
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    async def acquire(self):
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+
+def format_url(website):
+    """Add https:// to bare domains, as scrapeWebsite does."""
+    url = website.strip()
+    if not url.startswith(("http://", "https://")):
+        url = f"https://{url}"
+    return url
+
+
+def load_checkpoint(path):
+    """Latest entry per lead id from an earlier run's output, or {}."""
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # A run killed mid-write leaves a partial last line
+                continue
+            done[entry["id"]] = entry
+    return done
+
+
+def load_leads(path):
+    """Leads from a JSON lines export with ``id`` and ``website``."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                if row.get("website"):
+                    yield {"id": row["id"], "website": row["website"]}
+
+
+def leads_from_results(store_dir=DEFAULT_STORE, results_file=DEFAULT_RESULTS):
+    """One lead per distinct place with a website, keyed by its place key."""
+    seen = set()
+    for row in scan_results(["place_id", "cid", "data_id", "website"], store_dir, results_file):
+        key = place_key(row)
+        if key is None or key in seen or not (row.get("website") or "").strip():
+            continue
+        seen.add(key)
+        yield {"id": key, "website": row["website"].strip()}
+
+
+class Enricher:
+    """Scrapes lead websites through Firecrawl with a pool of asyncio workers."""
+
+    def __init__(self, api_key, api_url=DEFAULT_API_URL, concurrency=DEFAULT_CONCURRENCY,
+                 api_rate=DEFAULT_API_RATE, host_rate=DEFAULT_HOST_RATE,
+                 retries=DEFAULT_RETRIES, backoff=1.0, timeout=DEFAULT_TIMEOUT, cache=None, log=print):
+        self.api_key = api_key
+        self.endpoint = api_url.rstrip("/") + SCRAPE_PATH
+        self.concurrency = concurrency
+        self.api_bucket = TokenBucket(api_rate, burst=max(1, int(api_rate)))
+        self.host_rate = host_rate
+        self.host_buckets = {}
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.cache = cache
+        self._inflight = {}
+        self.log = log
+
+    def _host_bucket(self, url):
+        host = (urlsplit(url).hostname or "").lower()
+        if host.startswith("www."):
+            host = host[4:]
+        bucket = self.host_buckets.get(host)
+        if bucket is None:
+            bucket = self.host_buckets[host] = TokenBucket(self.host_rate)
+        return bucket
+
+    def _post(self, session, url):
+        """One blocking Firecrawl call; returns (status, headers, parsed body)."""
+        body = json.dumps({"url": url, "formats": ["markdown"], "onlyMainContent": True})
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "Connection": "keep-alive",
+        }
+        status, response_headers, data = session.request("POST", self.endpoint, body.encode("utf-8"), headers)
+        try:
+            parsed = json.loads(data or b"{}")
+        except ValueError:
+            parsed = {"error": data[:200].decode("utf-8", "replace")}
+        return status, response_headers, parsed
+
+    async def scrape(self, session, executor, url):
+        """Scrape one URL with retries; returns (markdown, error, attempts)."""
+        loop = asyncio.get_running_loop()
+        for attempt in range(1, self.retries + 2):
+            await self.api_bucket.acquire()
+            try:
+                status, headers, data = await loop.run_in_executor(executor, self._post, session, url)
+            except (OSError, http.client.HTTPException) as exc:
+                status, headers, data = None, {}, {"error": str(exc)}
+            if status is not None and 200 <= status < 300:
+                markdown = (data.get("data") or {}).get("markdown") or data.get("markdown")
+                if markdown and markdown.strip():
+                    return markdown, None, attempt
+                return None, "Empty content returned", attempt
+            error = data.get("error") or f"Firecrawl failed with status {status}"
+            if (status is not None and status not in RETRY_STATUSES) or attempt > self.retries:
+                return None, error, attempt
+            try:
+                delay = float(headers.get("Retry-After", ""))
+            except ValueError:
+                delay = self.backoff * (2 ** (attempt - 1))
+            await asyncio.sleep(delay)
+
+    async def _fetch(self, session, executor, url, key):
+        """
+        Markdown for a URL as (markdown, error, requests, shared).
+
+        Leads whose URL is already being fetched wait for that request
+        instead of sending their own; successes are added to the cache.
+        """
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            try:
+                # Shielded, so cancelling this waiter leaves the request alone
+                markdown, error, _, _ = await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                return None, "Shared request was cancelled", 0, True
+            return markdown, error, 0, True
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            markdown, error, requests = await self.scrape(session, executor, url)
+            if markdown is not None and self.cache is not None:
+                self.cache.put(MARKDOWN_NAMESPACE, key, markdown)
+            future.set_result((markdown, error, requests, False))
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            del self._inflight[key]
+        return markdown, error, requests, False
+
+    @staticmethod
+    def _entry(lead, started, markdown=None, error=None, requests=0, cached=False):
+        return {
+            "id": lead["id"],
+            "website": lead["website"],
+            "status": FAILED if error else SCRAPED,
+            "text_content": markdown,
+            "processing_error": error,
+            "attempts": lead.get("attempts", 0) + 1,
+            "requests": requests,
+            "cached": cached,
+            "duration": round(time.monotonic() - started, 3),
+            "scraped_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+    async def _worker(self, queue, executor, results):
+        with Session(self.timeout) as session:
+            while True:
+                lead = await queue.get()
+                started = time.monotonic()
+                requeued = False
+                try:
+                    try:
+                        url = format_url(lead["website"])
+                        key = normalize_url(url)
+                    except ValueError as exc:
+                        results.put_nowait(self._entry(lead, started, error=f"Invalid URL: {exc}"))
+                        continue
+                    hit = self.cache.get(MARKDOWN_NAMESPACE, key) if self.cache is not None else None
+                    # Cached and in-flight URLs cost no request, so skip the host limit
+                    wait = 0
+                    if hit is None and key not in self._inflight:
+                        wait = self._host_bucket(url).try_acquire()
+                    if wait:
+                        # Host is rate limited: requeue instead of holding this
+                        # worker. task_done follows the put so join() can't see 0.
+                        asyncio.get_running_loop().call_later(wait, self._requeue, queue, lead)
+                        requeued = True
+                        continue
+                    if hit is not None:
+                        markdown, error, requests, cached = hit, None, 0, True
+                    else:
+                        markdown, error, requests, cached = await self._fetch(session, executor, url, key)
+                    results.put_nowait(self._entry(lead, started, markdown, error, requests, cached))
+                except Exception as exc:
+                    # One bad lead must not take its worker down with it
+                    results.put_nowait(self._entry(lead, started, error=f"{type(exc).__name__}: {exc}"))
+                finally:
+                    if not requeued:
+                        queue.task_done()
+
+    @staticmethod
+    def _requeue(queue, lead):
+        queue.put_nowait(lead)
+        queue.task_done()
+
+    async def run(self, leads, output):
+        """Scrape every lead, appending each outcome to ``output``; returns counts."""
+        queue = asyncio.Queue()
+        for lead in leads:
+            queue.put_nowait(lead)
+        results = asyncio.Queue()
+        counts = {SCRAPED: 0, FAILED: 0}
+        if queue.empty():
+            return counts
+
+        async def write():
+            with open(output, "a", encoding="utf-8") as f:
+                while True:
+                    entry = await results.get()
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                    f.flush()
+                    counts[entry["status"]] += 1
+                    done = counts[SCRAPED] + counts[FAILED]
+                    if entry["status"] == FAILED:
+                        self.log(f"{entry['website']}: {entry['processing_error']}")
+                    if done % 100 == 0:
+                        self.log(f"{done} leads: {counts[SCRAPED]} scraped, {counts[FAILED]} failed")
+                    results.task_done()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            tasks = [asyncio.create_task(self._worker(queue, executor, results))
+                     for _ in range(self.concurrency)]
+            writer = asyncio.create_task(write())
+            await queue.join()
+            await results.join()
+            for task in tasks + [writer]:
+                task.cancel()
+            await asyncio.gather(*tasks, writer, return_exceptions=True)
+        return counts
+
+
+def pending(leads, checkpoint, max_attempts=MAX_ATTEMPTS):
+    """Leads not yet scraped and not out of attempts, carrying prior attempts."""
+    seen = set()
+    for lead in leads:
+        if lead["id"] in seen:
+            continue
+        seen.add(lead["id"])
+        previous = checkpoint.get(lead["id"])
+        if previous is None:
+            yield lead
+        elif previous["status"] != SCRAPED and previous.get("attempts", 0) < max_attempts:
+            yield {**lead, "attempts": previous.get("attempts", 0)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape lead websites through Firecrawl concurrently")
+    parser.add_argument("--leads", help="JSON lines with id and website (default: places in the results)")
+    parser.add_argument("--store", default=DEFAULT_STORE)
+    parser.add_argument("--results", default=DEFAULT_RESULTS)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON lines output, also the resume checkpoint")
+    parser.add_argument("--api-url", default=os.environ.get("FIRECRAWL_API_URL", DEFAULT_API_URL))
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--api-rate", type=float, default=DEFAULT_API_RATE, help="Firecrawl requests per second")
+    parser.add_argument("--host-rate", type=float, default=DEFAULT_HOST_RATE, help="requests per second per website host")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES)
+    parser.add_argument("--max-attempts", type=int, default=MAX_ATTEMPTS, help="runs before a failed lead is skipped")
+    parser.add_argument("--limit", type=int, help="stop after this many leads")
+    parser.add_argument("--cache", default=DEFAULT_CACHE, help="content cache directory")
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args(argv)
+
+    api_key = os.environ.get("FIRECRAWL_API_KEY")
+    if not api_key:
+        parser.error("FIRECRAWL_API_KEY not configured")
+
+    leads = load_leads(args.leads) if args.leads else leads_from_results(args.store, args.results)
+    todo = list(pending(leads, load_checkpoint(args.output), args.max_attempts))
+    if args.limit is not None:
+        todo = todo[:args.limit]
+    print(f"{len(todo)} leads to scrape")
+
+    cache = None if args.no_cache else ContentCache(args.cache)
+    enricher = Enricher(api_key, args.api_url, args.concurrency, args.api_rate,
+                        args.host_rate, args.retries, cache=cache)
+    started = time.monotonic()
+    try:
+        counts = asyncio.run(enricher.run(todo, args.output))
+    finally:
+        if cache is not None:
+            cache.evict()
+            cache.close()
+    elapsed = time.monotonic() - started
+    if cache is not None:
+        print(f"Cache: {cache.hits} hits, {cache.misses} misses")
+    print(f"Scraped {counts[SCRAPED]}, failed {counts[FAILED]} in {elapsed:.1f}s -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+"""
+Delta export of accumulated results.
+
+all_results.csv grew by one batch per run and was committed whole each time,
+so git stored a new copy of the full file on every commit and every consumer
+re-read everything. The export writes instead:
+
+- one immutable ``delta-NNNNNN.csv.gz`` per run, holding only that run's new
+  or changed places (the batch after dedup and city resolution)
+- every few runs, a compacted ``snapshot-NNNNNN.csv.gz``: the latest row of
+  every place up to that delta
+- ``manifest.json``, listing each file with its sequence number, row range,
+  size and sha256
+
+Files are gzip with a fixed header time, so identical rows give identical
+bytes. A consumer keeps a cursor, the sequence number of the last delta it
+applied, and asks for ``changes(cursor)``. The answer is the deltas after the
+cursor or, if the deltas are gone or the latest snapshot is smaller, that
+snapshot with ``reset`` set and the deltas after it. Older snapshots and the
+deltas they cover are pruned, so the tree stays bounded.
+
+Usage (from the repository root):
+    python3 -m scraper.export append scraper/batch_results.csv
+    python3 -m scraper.export since 42
+    python3 -m scraper.export rows --output all_results.csv
+"""
+
+import argparse
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+from .dedup import place_key
+from .gosom_csv import COLUMNS, read_rows
+from .metrics import run_id, stage
+from .normalize import OUTPUT_COLUMNS
+
+DEFAULT_EXPORT = "scraper/export"
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+EXPORT_COLUMNS = COLUMNS + OUTPUT_COLUMNS
+# Deltas between snapshots, and snapshots kept (with the deltas after the oldest)
+DEFAULT_SNAPSHOT_EVERY = 20
+DEFAULT_KEEP_SNAPSHOTS = 2
+_READ_CHUNK = 1 << 20
+
+
+class ExportError(Exception):
+    """A cursor the export cannot serve, or a file failing its checksum."""
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_READ_CHUNK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_csv_gz(path, rows, columns):
+    """Write rows as a reproducible gzip CSV; returns rows written (0 leaves no file)."""
+    tmp = path + ".tmp"
+    count = 0
+    with open(tmp, "wb") as raw:
+        with gzip.GzipFile(filename="", mode="wb", fileobj=raw, compresslevel=6, mtime=0) as gz:
+            with io.TextIOWrapper(gz, encoding="utf-8", newline="") as text:
+                writer = csv.DictWriter(text, fieldnames=columns, restval="",
+                                        extrasaction="ignore", lineterminator="\n")
+                writer.writeheader()
+                for row in rows:
+                    writer.writerow(row)
+                    count += 1
+    if count == 0:
+        os.remove(tmp)
+        return 0
+    os.replace(tmp, path)
+    return count
+
+
+def read_csv_gz(path):
+    """Yield rows of a gzip CSV as dicts of strings."""
+    with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            yield {k: (v if v is not None else "") for k, v in row.items() if k is not None}
+
+
+class Export:
+    """A directory of delta and snapshot files plus their manifest."""
+
+    def __init__(self, root=DEFAULT_EXPORT, columns=None):
+        self.root = root
+        self._manifest_path = os.path.join(root, MANIFEST)
+        if os.path.exists(self._manifest_path):
+            with open(self._manifest_path, "r", encoding="utf-8") as f:
+                self.manifest = json.load(f)
+            if self.manifest.get("version") != FORMAT_VERSION:
+                raise ValueError(f"unsupported export version {self.manifest.get('version')!r}")
+        else:
+            self.manifest = {
+                "version": FORMAT_VERSION,
+                "columns": list(columns or EXPORT_COLUMNS),
+                "head": 0,
+                "rows": 0,
+                "deltas": [],
+                "snapshots": [],
+            }
+
+    @property
+    def head(self):
+        """Sequence number of the newest delta (0 if none)."""
+        return self.manifest["head"]
+
+    @property
+    def columns(self):
+        return self.manifest["columns"]
+
+    def _path(self, entry):
+        return os.path.join(self.root, entry["file"])
+
+    def _entry(self, name, rows, **extra):
+        path = os.path.join(self.root, name)
+        return {
+            "file": name,
+            "rows": rows,
+            "bytes": os.path.getsize(path),
+            "sha256": file_sha256(path),
+            "created": datetime.now(timezone.utc).isoformat(),
+            **extra,
+        }
+
+    def _save_manifest(self):
+        tmp = self._manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp, self._manifest_path)
+
+    def append(self, rows, run=None):
+        """
+        Write rows as the next delta; returns its manifest entry, or None
+        for an empty batch (which does not advance the head).
+        """
+        os.makedirs(self.root, exist_ok=True)
+        seq = self.head + 1
+        name = f"delta-{seq:06d}.csv.gz"
+        count = write_csv_gz(os.path.join(self.root, name), rows, self.columns)
+        if count == 0:
+            return None
+        first = self.manifest["rows"]
+        entry = self._entry(name, count, seq=seq, row_range=[first, first + count],
+                            run_id=run or run_id())
+        self.manifest["deltas"].append(entry)
+        self.manifest["head"] = seq
+        self.manifest["rows"] = first + count
+        self._save_manifest()
+        return entry
+
+    def latest_snapshot(self):
+        return self.manifest["snapshots"][-1] if self.manifest["snapshots"] else None
+
+    def compact(self):
+        """
+        Snapshot the latest row of every place up to the head; returns its
+        entry, or None if there is nothing new since the last snapshot.
+        """
+        base = self.latest_snapshot()
+        if self.head == 0 or (base and base["seq"] == self.head):
+            return None
+        sources = ([base] if base else []) + [d for d in self.manifest["deltas"]
+                                              if d["seq"] > (base["seq"] if base else 0)]
+
+        # First pass finds each place's last occurrence; rows without a
+        # Google id cannot be merged and are all kept
+        last = {}
+        for position, row in enumerate(self._read(sources, ("place_id", "cid", "data_id"), verify=True)):
+            key = place_key(row)
+            if key is not None:
+                last[key] = position
+
+        def latest():
+            for position, row in enumerate(self._read(sources)):
+                key = place_key(row)
+                if key is None or last[key] == position:
+                    yield row
+
+        name = f"snapshot-{self.head:06d}.csv.gz"
+        count = write_csv_gz(os.path.join(self.root, name), latest(), self.columns)
+        entry = self._entry(name, count, seq=self.head, row_range=[0, self.manifest["rows"]])
+        self.manifest["snapshots"].append(entry)
+        self._save_manifest()
+        return entry
+
+    def prune(self, keep_snapshots=DEFAULT_KEEP_SNAPSHOTS):
+        """Drop all but the newest snapshots and the deltas the oldest kept one covers."""
+        snapshots = self.manifest["snapshots"]
+        if len(snapshots) <= keep_snapshots:
+            return []
+        dropped = snapshots[:-keep_snapshots]
+        kept = snapshots[-keep_snapshots:]
+        covered = kept[0]["seq"]
+        dropped += [d for d in self.manifest["deltas"] if d["seq"] <= covered]
+        self.manifest["snapshots"] = kept
+        self.manifest["deltas"] = [d for d in self.manifest["deltas"] if d["seq"] > covered]
+        self._save_manifest()
+        for entry in dropped:
+            try:
+                os.remove(self._path(entry))
+            except FileNotFoundError:
+                pass
+        return [entry["file"] for entry in dropped]
+
+    def maybe_compact(self, every=DEFAULT_SNAPSHOT_EVERY, keep_snapshots=DEFAULT_KEEP_SNAPSHOTS):
+        """Snapshot and prune once ``every`` deltas have built up since the last snapshot."""
+        base = self.latest_snapshot()
+        if self.head - (base["seq"] if base else 0) < every:
+            return None
+        entry = self.compact()
+        self.prune(keep_snapshots)
+        return entry
+
+    def changes(self, cursor=0):
+        """
+        What a consumer at ``cursor`` must fetch to reach the head:
+        {"cursor": new cursor, "reset": bool, "files": [manifest entries]}.
+        With ``reset`` the first file is a snapshot replacing all prior state.
+        """
+        head = self.head
+        if cursor < 0 or cursor > head:
+            raise ExportError(f"cursor {cursor} is outside this export (head {head})")
+        deltas = [d for d in self.manifest["deltas"] if d["seq"] > cursor]
+        available = cursor == head or (deltas and deltas[0]["seq"] == cursor + 1)
+        snapshot = self.latest_snapshot()
+        if snapshot and snapshot["seq"] > cursor:
+            via_snapshot = [snapshot] + [d for d in deltas if d["seq"] > snapshot["seq"]]
+            if not available or (sum(e["bytes"] for e in via_snapshot)
+                                 < sum(e["bytes"] for e in deltas)):
+                return {"cursor": head, "reset": True, "files": via_snapshot}
+        if not available:
+            raise ExportError(f"deltas after cursor {cursor} were pruned and no snapshot covers them")
+        return {"cursor": head, "reset": False, "files": deltas}
+
+    def _read(self, entries, columns=None, verify=False):
+        for entry in entries:
+            path = self._path(entry)
+            if verify and file_sha256(path) != entry["sha256"]:
+                raise ExportError(f"{entry['file']} does not match its manifest checksum")
+            for row in read_csv_gz(path):
+                yield row if columns is None else {c: row.get(c, "") for c in columns}
+
+    def rows_since(self, cursor=0, columns=None, verify=True):
+        """(plan, rows): the changes() plan and an iterator over its rows, checksums verified."""
+        plan = self.changes(cursor)
+        return plan, self._read(plan["files"], columns, verify)
+
+
+def read_cursor(path):
+    """A consumer's saved cursor, or 0 if it has none."""
+    if not path or not os.path.exists(path):
+        return 0
+    with open(path, "r", encoding="utf-8") as f:
+        return int(f.read().strip() or 0)
+
+
+def write_cursor(path, cursor):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(f"{cursor}\n")
+    os.replace(tmp, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Delta export of accumulated results")
+    parser.add_argument("--root", default=DEFAULT_EXPORT)
+    sub = parser.add_subparsers(dest="command", required=True)
+    append = sub.add_parser("append", help="write a batch CSV as the next delta")
+    append.add_argument("batch_file")
+    append.add_argument("--snapshot-every", type=int, default=DEFAULT_SNAPSHOT_EVERY)
+    append.add_argument("--keep-snapshots", type=int, default=DEFAULT_KEEP_SNAPSHOTS)
+    sub.add_parser("compact", help="write a snapshot now and prune")
+    since = sub.add_parser("since", help="print the files a consumer at CURSOR needs, as JSON")
+    since.add_argument("cursor", type=int)
+    rows = sub.add_parser("rows", help="write the rows after a cursor as one CSV")
+    rows.add_argument("--since", type=int, default=0)
+    rows.add_argument("--output", help="CSV path (default: stdout)")
+    sub.add_parser("stats", help="summarise the manifest")
+    args = parser.parse_args(argv)
+
+    export = Export(args.root)
+    if args.command == "append":
+        if not os.path.exists(args.batch_file):
+            print(f"No batch file at {args.batch_file}")
+            return
+        with stage("export") as metrics:
+            entry = export.append(read_rows(args.batch_file))
+            snapshot = export.maybe_compact(args.snapshot_every, args.keep_snapshots)
+            metrics.add(rows_in=entry["rows"] if entry else 0,
+                        bytes_out=(entry["bytes"] if entry else 0) + (snapshot["bytes"] if snapshot else 0))
+        if entry:
+            print(f"Wrote {entry['file']}: {entry['rows']} rows, {entry['bytes']} bytes")
+        else:
+            print("Empty batch, no delta written")
+        if snapshot:
+            print(f"Wrote {snapshot['file']}: {snapshot['rows']} places, {snapshot['bytes']} bytes")
+    elif args.command == "compact":
+        entry = export.compact()
+        pruned = export.prune(DEFAULT_KEEP_SNAPSHOTS)
+        print(f"Wrote {entry['file']}: {entry['rows']} places" if entry else "Nothing new to compact")
+        if pruned:
+            print(f"Pruned {len(pruned)} files")
+    elif args.command == "since":
+        print(json.dumps(export.changes(args.cursor), indent=2))
+    elif args.command == "rows":
+        plan, found = export.rows_since(args.since)
+        out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+        try:
+            writer = csv.DictWriter(out, fieldnames=export.columns, restval="",
+                                    extrasaction="ignore", lineterminator="\n")
+            writer.writeheader()
+            count = 0
+            for row in found:
+                writer.writerow(row)
+                count += 1
+        finally:
+            if args.output:
+                out.close()
+        print(f"{count} rows from {len(plan['files'])} files, cursor now {plan['cursor']}"
+              + (" (reset)" if plan["reset"] else ""), file=sys.stderr)
+    else:
+        m = export.manifest
+        snapshot = export.latest_snapshot()
+        print(f"head        {m['head']}")
+        print(f"rows        {m['rows']}")
+        print(f"deltas      {len(m['deltas'])} ({sum(d['bytes'] for d in m['deltas'])} bytes)")
+        print("snapshot    " + (f"{snapshot['file']} ({snapshot['rows']} places, {snapshot['bytes']} bytes)"
+                                 if snapshot else "none"))
+
+
+if __name__ == "__main__":
+    main()
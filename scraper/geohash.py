@@ -0,0 +1,99 @@
+"""
+Minimal geohash encoding/decoding used for spatial bucketing.
+
+Precision guide (cell size at the equator):
+    4 ~ 39 km x 20 km, 5 ~ 4.9 km x 4.9 km, 6 ~ 1.2 km x 0.6 km, 7 ~ 153 m
+"""
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE = {c: i for i, c in enumerate(BASE32)}
+
+
+def encode(lat, lon, precision=5):
+    """Geohash of a point."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if lon >= mid:
+                value = (value << 1) | 1
+                lon_lo = mid
+            else:
+                value <<= 1
+                lon_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                value = (value << 1) | 1
+                lat_lo = mid
+            else:
+                value <<= 1
+                lat_hi = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = 0
+            value = 0
+    return "".join(chars)
+
+
+def bbox(cell):
+    """(min_lat, min_lon, max_lat, max_lon) of a geohash cell."""
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    even = True
+    for char in cell:
+        value = _DECODE[char]
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            if even:
+                mid = (lon_lo + lon_hi) / 2
+                if bit:
+                    lon_lo = mid
+                else:
+                    lon_hi = mid
+            else:
+                mid = (lat_lo + lat_hi) / 2
+                if bit:
+                    lat_lo = mid
+                else:
+                    lat_hi = mid
+            even = not even
+    return lat_lo, lon_lo, lat_hi, lon_hi
+
+
+def center(cell):
+    """(lat, lon) at the centre of a geohash cell."""
+    lat_lo, lon_lo, lat_hi, lon_hi = bbox(cell)
+    return (lat_lo + lat_hi) / 2, (lon_lo + lon_hi) / 2
+
+
+def children(cell):
+    """The 32 cells one level below ``cell``."""
+    return [cell + c for c in BASE32]
+
+
+def neighbors(cell):
+    """The up to 8 cells surrounding ``cell`` at the same precision."""
+    lat_lo, lon_lo, lat_hi, lon_hi = bbox(cell)
+    dlat = lat_hi - lat_lo
+    dlon = lon_hi - lon_lo
+    lat_c = (lat_lo + lat_hi) / 2
+    lon_c = (lon_lo + lon_hi) / 2
+    found = []
+    for i in (-1, 0, 1):
+        for j in (-1, 0, 1):
+            if i == 0 and j == 0:
+                continue
+            lat = lat_c + i * dlat
+            if lat <= -90 or lat >= 90:
+                continue
+            lon = (lon_c + j * dlon + 180) % 360 - 180
+            found.append(encode(lat, lon, len(cell)))
+    return list(dict.fromkeys(found))
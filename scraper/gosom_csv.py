@@ -0,0 +1,137 @@
+"""
+Streaming reader/writer for gosom/google-maps-scraper CSV output.
+
+gosom quotes JSON columns such as ``user_reviews`` and ``popular_times``, and
+those values may span several physical lines, so rows must be parsed with the
+``csv`` module rather than by splitting on newlines.
+"""
+
+import csv
+import os
+import sys
+
+# Column order written by gosom (see results.csv)
+COLUMNS = [
+    "input_id", "link", "title", "category", "address", "open_hours",
+    "popular_times", "website", "phone", "plus_code", "review_count",
+    "review_rating", "reviews_per_rating", "latitude", "longitude", "cid",
+    "status", "descriptions", "reviews_link", "thumbnail", "timezone",
+    "price_range", "data_id", "place_id", "images", "reservations",
+    "order_online", "menu", "owner", "complete_address", "about",
+    "user_reviews", "user_reviews_extended", "emails",
+]
+
+# Columns holding JSON-encoded values (kept as raw strings when streaming)
+JSON_COLUMNS = frozenset([
+    "open_hours", "popular_times", "reviews_per_rating", "images",
+    "reservations", "order_online", "menu", "owner", "complete_address",
+    "about", "user_reviews", "user_reviews_extended", "emails",
+])
+
+INT_COLUMNS = frozenset(["review_count"])
+FLOAT_COLUMNS = frozenset(["review_rating", "latitude", "longitude"])
+
+# Review blobs easily exceed the csv module's default 128 KiB field limit
+csv.field_size_limit(min(sys.maxsize, 2**31 - 1))
+
+
+def to_int(value):
+    """int of a cell, or None if it does not parse ("n/a", "nan", "1,234")."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        try:
+            return int(float(value))
+        except (TypeError, ValueError, OverflowError):
+            return None
+
+
+def to_float(value):
+    """float of a cell, or None if it does not parse."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def read_header(path):
+    """Return the header row of a CSV file, or None if it is missing/empty."""
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return next(csv.reader(f), None)
+
+
+def read_rows(path):
+    """Yield each row of a gosom CSV as a dict of raw strings."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            # Short rows get None from DictReader; normalise to ''
+            yield {k: (v if v is not None else "") for k, v in row.items() if k is not None}
+
+
+def parse_row(row):
+    """Convert the numeric columns of a raw row; JSON columns stay as text."""
+    record = dict(row)
+    for column in INT_COLUMNS:
+        if column in record:
+            record[column] = to_int(record[column]) if record[column] != "" else None
+    for column in FLOAT_COLUMNS:
+        if column in record:
+            record[column] = to_float(record[column]) if record[column] != "" else None
+    return record
+
+
+def read_records(path):
+    """Yield typed records (see parse_row) from a gosom CSV."""
+    for row in read_rows(path):
+        yield parse_row(row)
+
+
+class CsvAppender:
+    """
+    Incrementally append rows to a CSV file, writing a header if it is new.
+
+    The existing header wins over ``columns`` so the file stays rectangular.
+    """
+
+    def __init__(self, path, columns=None):
+        self.path = path
+        self.written = 0
+        header = read_header(path)
+        self._new_file = header is None
+        self.header = list(columns or COLUMNS) if self._new_file else header
+        self._file = None
+        self._writer = None
+
+    def __enter__(self):
+        # Older appends left the file without a trailing newline
+        needs_newline = False
+        if not self._new_file and os.path.getsize(self.path) > 0:
+            with open(self.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+
+        self._file = open(self.path, "a", encoding="utf-8", newline="")
+        if needs_newline:
+            self._file.write("\n")
+        self._writer = csv.DictWriter(self._file, fieldnames=self.header, restval="",
+                                      extrasaction="ignore", lineterminator="\n")
+        if self._new_file:
+            self._writer.writeheader()
+        return self
+
+    def write(self, row):
+        self._writer.writerow(row)
+        self.written += 1
+
+    def __exit__(self, *exc):
+        self._file.close()
+
+
+def append_rows(path, rows, columns=None):
+    """Append rows to a CSV file (see CsvAppender); returns rows written."""
+    with CsvAppender(path, columns) as out:
+        for row in rows:
+            out.write(row)
+    return out.written
@@ -0,0 +1,87 @@
+"""
+Append a gosom batch CSV to the accumulated results.
+
+Rows are streamed with the csv module, appended to ``all_results.csv`` with
+proper quoting, and written as a new segment of the columnar store.
+
+The store is not committed: the export already holds every kept row, so
+``--export`` rebuilds the store from it when the store is missing.
+
+Usage (from the repository root):
+    python3 -m scraper.ingest scraper/batch_results.csv
+    python3 -m scraper.ingest --export scraper/export
+"""
+
+import argparse
+import os
+
+from .colstore import MANIFEST, ColumnStore
+from .gosom_csv import CsvAppender, read_rows
+
+DEFAULT_RESULTS = "scraper/all_results.csv"
+DEFAULT_STORE = "scraper/results_store"
+
+
+def ingest(batch_file, results_file=DEFAULT_RESULTS, store_dir=DEFAULT_STORE):
+    """Append one batch to the CSV and the column store; returns rows added."""
+    if not os.path.exists(batch_file):
+        return 0
+    store = ColumnStore(store_dir)
+    if not results_file:
+        return store.append(read_rows(batch_file))
+
+    # Single streaming pass: each row goes to the CSV as the store consumes it
+    with CsvAppender(results_file, store.columns) as out:
+        def tee():
+            for row in read_rows(batch_file):
+                out.write(row)
+                yield row
+        return store.append(tee())
+
+
+def rebuild_store(store_dir=DEFAULT_STORE, export_root=None):
+    """Create the column store from every row in the export; returns rows added."""
+    # export imports normalize, which imports this module
+    from .export import DEFAULT_EXPORT, Export
+
+    store = ColumnStore(store_dir)
+    _, rows = Export(export_root or DEFAULT_EXPORT).rows_since(0, store.columns)
+    return store.append(rows)
+
+
+def scan_results(columns, store_dir=DEFAULT_STORE, results_file=DEFAULT_RESULTS):
+    """
+    Yield accumulated rows restricted to ``columns``.
+
+    Reads the column store when present, falling back to the CSV for trees
+    that predate it.
+    """
+    if os.path.exists(os.path.join(store_dir, MANIFEST)):
+        yield from ColumnStore(store_dir).scan(columns)
+    elif results_file and os.path.exists(results_file):
+        for row in read_rows(results_file):
+            yield {c: row.get(c, "") for c in columns}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("batch_file", nargs="?", help="gosom CSV produced by this run")
+    parser.add_argument("--results", default=DEFAULT_RESULTS,
+                        help="accumulated CSV to append to ('' to skip)")
+    parser.add_argument("--store", default=DEFAULT_STORE,
+                        help="column store directory")
+    parser.add_argument("--export", help="rebuild the store from this export when it is missing")
+    args = parser.parse_args(argv)
+    if not args.batch_file and not args.export:
+        parser.error("give a batch file, --export, or both")
+
+    if args.export and not os.path.exists(os.path.join(args.store, MANIFEST)):
+        rebuilt = rebuild_store(args.store, args.export)
+        print(f"Rebuilt column store from {args.export}: {rebuilt} rows")
+    if args.batch_file:
+        added = ingest(args.batch_file, args.results, args.store)
+        print(f"Appended {added} rows from {args.batch_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+Per-query progress ledger.
+
+Replaces the single ``last_index`` counter in progress.json with one SQLite row
+per query, keyed by a hash of the query text. Each row records status, row
+count, duration and attempts, so:
+
+- the next batch is the first N pending/failed queries by position, read
+  straight off a partial index instead of by index arithmetic
+- failed queries are retried (up to MAX_ATTEMPTS in a row) rather than skipped
+- editing the catalog only adds/reorders rows; finished work is kept
+- planner queries (scraper.planner) are queued after every catalog query
+- the latest run's new and changed place counts (from dedup) feed refresh
+  scheduling
+
+Only ``ledger.csv`` is committed: one line per query sorted by position, so
+each run's commit holds the lines of the queries it ran instead of a new
+binary copy of the database. Opening the ledger reloads ``ledger.sqlite``
+from it and closing writes it back.
+
+Batch files tag each query with its id using gosom's custom input id syntax
+(``query #!#id``), so result rows carry the id back in ``input_id``.
+
+Usage (from the repository root):
+    python3 -m scraper.ledger status
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime, timezone
+
+DEFAULT_LEDGER = "scraper/ledger.sqlite"
+DEFAULT_CITIES = "scraper/cities.txt"
+DEFAULT_PROGRESS = "scraper/progress.json"
+DEFAULT_PLANNED = "scraper/planned_queries.txt"
+INPUT_ID_SEPARATOR = " #!#"
+MAX_ATTEMPTS = 3
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+# Columns of ledger.csv and the type each is read back as (text otherwise)
+_COLUMNS = ["query_id", "query", "position", "active", "status", "attempts", "rows",
+            "duration", "last_run", "error", "new_places", "changed_places", "planned"]
+_TYPES = {"position": int, "active": int, "attempts": int, "rows": int,
+          "duration": float, "new_places": int, "changed_places": int, "planned": int}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS queries (
+    query_id  TEXT PRIMARY KEY,
+    query     TEXT NOT NULL,
+    position  INTEGER NOT NULL,
+    active    INTEGER NOT NULL DEFAULT 1,
+    status    TEXT NOT NULL DEFAULT 'pending',
+    attempts  INTEGER NOT NULL DEFAULT 0,
+    rows      INTEGER,
+    duration  REAL,
+    last_run  TEXT,
+    error     TEXT,
+    new_places     INTEGER,
+    changed_places INTEGER,
+    planned   INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS queries_todo ON queries (planned, position)
+    WHERE active = 1 AND status IN ('pending', 'failed');
+"""
+
+
+def query_id(query):
+    """Stable id for a query: first 16 hex chars of sha1 of its normalised text."""
+    normalised = " ".join(query.split()).casefold()
+    return hashlib.sha1(normalised.encode("utf-8")).hexdigest()[:16]
+
+
+def text_path(path):
+    """The committed CSV form of the ledger database at ``path``."""
+    return os.path.splitext(path)[0] + ".csv"
+
+
+def split_input(line):
+    """Split a batch line ``query #!#id`` into (query, id)."""
+    if INPUT_ID_SEPARATOR in line:
+        query, qid = line.rsplit(INPUT_ID_SEPARATOR, 1)
+        return query.strip(), qid.strip()
+    return line.strip(), query_id(line.strip())
+
+
+def read_queries(path=DEFAULT_CITIES):
+    """Queries from cities.txt, skipping comments and blank lines."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+class Ledger:
+    """SQLite table of queries and their latest outcome, kept as a CSV."""
+
+    def __init__(self, path=DEFAULT_LEDGER):
+        self.path = path
+        self.text_path = text_path(path)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(_SCHEMA)
+        if os.path.exists(self.text_path):
+            self._load_text()
+
+    def _load_text(self):
+        """Replace the table with the rows of ledger.csv."""
+        with open(self.text_path, "r", encoding="utf-8", newline="") as f:
+            rows = [tuple(None if row[c] == "" else _TYPES.get(c, str)(row[c]) for c in _COLUMNS)
+                    for row in csv.DictReader(f)]
+        with self.conn:
+            self.conn.execute("DELETE FROM queries")
+            self.conn.executemany(
+                f"INSERT INTO queries ({', '.join(_COLUMNS)})"
+                f" VALUES ({', '.join('?' * len(_COLUMNS))})", rows)
+
+    def write_text(self):
+        """Write every query to ledger.csv, sorted so diffs stay per line."""
+        tmp = self.text_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(_COLUMNS)
+            writer.writerows(
+                ["" if v is None else v for v in row]
+                for row in self.conn.execute(
+                    f"SELECT {', '.join(_COLUMNS)} FROM queries"
+                    " ORDER BY planned, position, query_id"))
+        os.replace(tmp, self.text_path)
+
+    def sync(self, queries):
+        """
+        Make the active set and order match ``queries``.
+
+        New queries start pending; existing ones keep their history; queries
+        no longer listed are deactivated rather than deleted. Planned queries
+        are left to sync_planned.
+        """
+        with self.conn:
+            self.conn.execute("UPDATE queries SET active = 0 WHERE planned = 0")
+            self.conn.executemany(
+                "INSERT INTO queries (query_id, query, position) VALUES (?, ?, ?)"
+                " ON CONFLICT (query_id) DO UPDATE SET position = excluded.position,"
+                " query = excluded.query, active = 1, planned = 0",
+                ((query_id(q), q, i) for i, q in enumerate(queries)),
+            )
+
+    def sync_planned(self, queries):
+        """
+        Make the active planned queries match ``queries``, in plan order.
+
+        Like sync, but for planner output: these run after every catalog
+        query, and a planned query that is also in the catalog stays a
+        catalog query.
+        """
+        with self.conn:
+            self.conn.execute("UPDATE queries SET active = 0 WHERE planned = 1")
+            self.conn.executemany(
+                "INSERT INTO queries (query_id, query, position, planned) VALUES (?, ?, ?, 1)"
+                " ON CONFLICT (query_id) DO UPDATE SET position = excluded.position,"
+                " query = excluded.query, active = 1 WHERE planned = 1",
+                ((query_id(q), q, i) for i, q in enumerate(queries)),
+            )
+
+    def select_batch(self, size, max_attempts=MAX_ATTEMPTS):
+        """The next ``size`` pending or retryable failed queries as (id, query)."""
+        return self.conn.execute(
+            "SELECT query_id, query FROM queries"
+            " WHERE active = 1 AND status IN ('pending', 'failed') AND attempts < ?"
+            " ORDER BY planned, position LIMIT ?",
+            (max_attempts, size),
+        ).fetchall()
+
+    def record(self, qid, status, rows=None, duration=None, attempts=1, error="", when=None,
+               new=None, changed=None):
+        """
+        Store the outcome of running one query (committed on close).
+
+        ``attempts`` counts runs since the query last succeeded, so a success
+        resets it and a refresh that fails gets its full set of retries.
+        """
+        when = when or datetime.now(timezone.utc).isoformat()
+        self.conn.execute(
+            "UPDATE queries SET status = ?, rows = ?, duration = ?, last_run = ?,"
+            " attempts = CASE WHEN ? = 'done' THEN 0 ELSE attempts + ? END,"
+            " error = ?, new_places = ?, changed_places = ? WHERE query_id = ?",
+            (status, rows, duration, when, status, attempts, error or None, new, changed, qid),
+        )
+
+    def record_report(self, report_path, outcomes=None):
+        """
+        Apply a runner report (see scraper.runner.write_report).
+
+        ``outcomes`` maps query id -> {"new": n, "changed": n} for this run,
+        as written by ``dedup --outcomes``; a finished query missing from it
+        found nothing new or changed. Queries absent from the report or still
+        pending (e.g. cut by the deadline) stay pending.
+        """
+        recorded = 0
+        with self.conn, open(report_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                _, qid = split_input(entry["query"])
+                if entry["status"] == "pending":
+                    continue
+                status = DONE if entry["status"] == "done" else FAILED
+                new = changed = None
+                if outcomes is not None and status == DONE:
+                    counts = outcomes.get(qid, {})
+                    new, changed = counts.get("new", 0), counts.get("changed", 0)
+                self.record(qid, status, entry.get("rows"), entry.get("duration"),
+                            entry.get("attempts", 1), entry.get("error", ""),
+                            new=new, changed=changed)
+                recorded += 1
+        return recorded
+
+    def counts(self):
+        """Number of active queries per status."""
+        return dict(self.conn.execute(
+            "SELECT status, COUNT(*) FROM queries WHERE active = 1 GROUP BY status"
+        ).fetchall())
+
+    def write_progress(self, path=DEFAULT_PROGRESS, last_batch=()):
+        """Write a human-readable summary to progress.json."""
+        counts = self.counts()
+        progress = {
+            "total_queries": sum(counts.values()),
+            "done": counts.get(DONE, 0),
+            "failed": counts.get(FAILED, 0),
+            "pending": counts.get(PENDING, 0),
+            "last_run": datetime.now(timezone.utc).isoformat(),
+            "last_batch": list(last_batch),
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(progress, f, indent=2, ensure_ascii=False)
+        return progress
+
+    def close(self):
+        self.conn.commit()
+        self.write_text()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_batch(batch, path):
+    """Write (id, query) pairs as gosom input lines tagged with their id."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(f"{q}{INPUT_ID_SEPARATOR}{qid}" for qid, q in batch))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or reset the per-query ledger")
+    parser.add_argument("command", choices=["status", "failed", "retry-failed"])
+    parser.add_argument("--ledger", default=DEFAULT_LEDGER)
+    parser.add_argument("--cities", help="sync from this query file instead of the catalog")
+    args = parser.parse_args(argv)
+
+    if args.cities:
+        if not os.path.exists(args.cities):
+            parser.error(f"{args.cities} not found")
+        queries = read_queries(args.cities)
+    else:
+        from .catalog import load_catalog
+        queries = load_catalog().texts()
+    with Ledger(args.ledger) as ledger:
+        ledger.sync(queries)
+        if args.command == "status":
+            for status, count in sorted(ledger.counts().items()):
+                print(f"{status:8} {count}")
+        elif args.command == "failed":
+            for query, attempts, error in ledger.conn.execute(
+                    "SELECT query, attempts, error FROM queries"
+                    " WHERE active = 1 AND status = 'failed' ORDER BY position"):
+                print(f"{attempts}x {query}: {error}")
+        else:
+            with ledger.conn:
+                reset = ledger.conn.execute(
+                    "UPDATE queries SET attempts = 0 WHERE status = 'failed'").rowcount
+            print(f"Reset attempts on {reset} failed queries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+Per-stage run metrics.
+
+Each pipeline stage runs inside ``stage(name)``. On exit it appends one JSON
+line recording wall and CPU time, the process's peak RSS, whether the stage
+failed, and whatever the stage counted (rows in and out, new vs duplicate
+places, bytes sent...):
+
+    with stage("upload") as s:
+        summary = uploader.upload_file(path)
+        s.add(rows_in=summary["rows"], bytes_sent=summary["sent_bytes"])
+
+Lines go to the file named by $SCRAPER_METRICS, so stages run outside the
+workflow record nothing. Stages of one workflow run share $METRICS_RUN_ID.
+Peak RSS is the process high-water mark, so it is per stage wherever a stage
+runs as its own command.
+
+Usage (from the repository root):
+    python3 -m scraper.metrics summary --runs 30
+    python3 -m scraper.metrics runs --runs 10
+"""
+
+import argparse
+import json
+import os
+import resource
+import statistics
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+DEFAULT_METRICS = "scraper/metrics.jsonl"
+METRICS_ENV = "SCRAPER_METRICS"
+RUN_ID_ENV = "METRICS_RUN_ID"
+# Pipeline order, used to sort stages in reports
+STAGES = ["select", "scrape", "dedup", "normalize", "export", "upload", "append", "progress", "percentiles"]
+
+
+def peak_rss_kb():
+    """High-water RSS of this process in KiB."""
+    # On Linux ru_maxrss survives exec, so a child would report the parent's
+    # peak (e.g. from generating data); VmHWM is reset for the new image
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def run_id():
+    return os.environ.get(RUN_ID_ENV) or datetime.now(timezone.utc).strftime("local-%Y%m%dT%H%M%S")
+
+
+class Stage:
+    """Times one stage and appends its record on exit."""
+
+    def __init__(self, name, path=None, run=None):
+        self.name = name
+        self.path = path if path is not None else os.environ.get(METRICS_ENV)
+        self.run = run or run_id()
+        self.counts = {}
+        self.record = None
+
+    def add(self, **counts):
+        """Add to counters (missing ones start at 0)."""
+        for key, value in counts.items():
+            self.counts[key] = self.counts.get(key, 0) + (value or 0)
+
+    def set(self, **values):
+        """Record values as-is, e.g. settings like concurrency."""
+        self.counts.update(values)
+
+    def __enter__(self):
+        self._started_at = datetime.now(timezone.utc).isoformat()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is SystemExit and not exc.code:
+            # exit(0) ends a stage early without failing it
+            exc_type = None
+        self.record = {
+            "run_id": self.run,
+            "stage": self.name,
+            "started": self._started_at,
+            "wall_seconds": round(time.perf_counter() - self._wall, 3),
+            "cpu_seconds": round(time.process_time() - self._cpu, 3),
+            "peak_rss_kb": peak_rss_kb(),
+            "status": "ok" if exc_type is None else "error",
+            **self.counts,
+        }
+        if exc_type is not None:
+            self.record["error"] = f"{exc_type.__name__}: {exc}"[:500]
+        if self.path:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(self.record) + "\n")
+        return False
+
+
+def stage(name, path=None, run=None):
+    return Stage(name, path, run)
+
+
+def read_metrics(path=DEFAULT_METRICS):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def group_runs(records, last=None):
+    """[(run id, {stage: record})] in file order, optionally the last N runs."""
+    runs = {}
+    for record in records:
+        runs.setdefault(record["run_id"], {})[record["stage"]] = record
+    items = list(runs.items())
+    return items[-last:] if last else items
+
+
+def _stage_order(names):
+    return sorted(names, key=lambda s: (STAGES.index(s) if s in STAGES else len(STAGES), s))
+
+
+def _throughput(record):
+    rows = record.get("rows_in", record.get("rows_out"))
+    if rows is None or not record["wall_seconds"]:
+        return None
+    return rows / record["wall_seconds"]
+
+
+def _median(values):
+    values = [v for v in values if v is not None]
+    return statistics.median(values) if values else None
+
+
+def summarize(runs):
+    """
+    Per stage: runs, median and p90 wall time, share of the median run,
+    median rows/s, median peak RSS, and the change in median wall time
+    between the older and newer half of the runs.
+    """
+    by_stage = defaultdict(list)
+    for _, stages in runs:
+        for name, record in stages.items():
+            by_stage[name].append(record)
+    run_totals = [sum(r["wall_seconds"] for r in stages.values()) for _, stages in runs]
+    total = _median(run_totals) or 0
+    summary = []
+    for name in _stage_order(by_stage):
+        records = by_stage[name]
+        walls = [r["wall_seconds"] for r in records]
+        half = len(walls) // 2
+        older, newer = _median(walls[:half]), _median(walls[half:])
+        summary.append({
+            "stage": name,
+            "runs": len(records),
+            "errors": sum(1 for r in records if r.get("status") == "error"),
+            "median_seconds": _median(walls),
+            "p90_seconds": sorted(walls)[min(len(walls) - 1, int(len(walls) * 0.9))],
+            "share": (_median(walls) / total) if total else None,
+            "rows_per_second": _median(_throughput(r) for r in records),
+            "peak_rss_mib": (_median(r.get("peak_rss_kb") for r in records) or 0) / 1024,
+            "trend": (newer - older) / older if half and older else None,
+        })
+    return summary, total
+
+
+def _fmt(value, spec, empty="-"):
+    if value is None:
+        return empty.rjust(len(format(0, spec)))
+    return format(value, spec)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarise pipeline run metrics")
+    parser.add_argument("command", choices=["summary", "runs"])
+    parser.add_argument("--metrics", default=os.environ.get(METRICS_ENV) or DEFAULT_METRICS)
+    parser.add_argument("--runs", type=int, default=30, help="only the last N runs")
+    args = parser.parse_args(argv)
+
+    runs = group_runs(read_metrics(args.metrics), args.runs)
+    if not runs:
+        print(f"No metrics in {args.metrics}")
+        return
+
+    if args.command == "summary":
+        summary, total = summarize(runs)
+        print(f"{len(runs)} runs, median {total:.0f}s per run")
+        print(f"{'stage':12} {'runs':>5} {'err':>4} {'median s':>9} {'p90 s':>8} {'share':>6} "
+              f"{'rows/s':>9} {'peak MiB':>9} {'trend':>7}")
+        for s in summary:
+            print(f"{s['stage']:12} {s['runs']:5} {s['errors']:4} {s['median_seconds']:9.1f} "
+                  f"{s['p90_seconds']:8.1f} {_fmt(s['share'], '6.0%')} "
+                  f"{_fmt(s['rows_per_second'], '9.0f')} {s['peak_rss_mib']:9.1f} "
+                  f"{_fmt(s['trend'], '+7.0%')}")
+        return
+
+    names = _stage_order({name for _, stages in runs for name in stages})
+    print(f"{'run':24} " + " ".join(f"{n[:9]:>9}" for n in names) + f" {'total':>8} {'new':>6} {'dups':>6}")
+    for run, stages in runs:
+        cells = " ".join(_fmt(stages[n]["wall_seconds"] if n in stages else None, "9.1f") for n in names)
+        dedup = stages.get("dedup", {})
+        print(f"{run[:24]:24} {cells} {sum(r['wall_seconds'] for r in stages.values()):8.1f} "
+              f"{_fmt(dedup.get('new'), '6d')} {_fmt(dedup.get('duplicates'), '6d')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""
+City and neighbourhood resolution for scraped rows.
+
+github-sync-webhook's ``extractCity`` takes the third-from-last comma part of
+the address. That misfiles most non-US formats, such as Tokyo wards or São
+Paulo districts. This stage gives each row a clean ``city`` before upload,
+together with ``country``, ``neighborhood``, ``city_key`` (``City, Country``,
+as used for peer percentiles) and ``city_source``. The first rule that
+applies wins:
+
+1. query: ``input_id`` is the ledger id of the catalog query that found the
+   place, so the catalog says which city and neighbourhood were searched. It
+   is used when the place lies inside that city's box (or the city has none)
+2. coordinates: otherwise the smallest catalog city box containing the point.
+   This is how rows of planner queries, which are not in the catalog, resolve
+3. address: otherwise ``city``/``country`` from the ``complete_address`` JSON
+
+City and neighbourhood boxes come from the coordinates of places each catalog
+query has returned. Each box is trimmed of outliers and padded, then written
+to city_boxes.json. A coarse grid maps each point to the few boxes that can
+contain it.
+
+Usage (from the repository root):
+    python3 -m scraper.normalize boxes
+    python3 -m scraper.normalize batch scraper/batch_results.csv
+"""
+
+import argparse
+import json
+import math
+import os
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from .catalog import DEFAULT_CATALOG, load_catalog
+from .gosom_csv import append_rows, read_header, read_rows
+from .ingest import DEFAULT_RESULTS, DEFAULT_STORE, scan_results
+from .metrics import stage
+
+DEFAULT_BOXES = "scraper/city_boxes.json"
+FORMAT_VERSION = 1
+OUTPUT_COLUMNS = ["city", "country", "neighborhood", "city_key", "city_source"]
+
+# Box construction: drop TRIM of points on each side, pad by MARGIN of the
+# span (at least MIN_PAD degrees), skip keys with too few points
+TRIM = 0.05
+MARGIN = 0.25
+MIN_PAD = 0.01
+MIN_POINTS = 5
+# Boxes wider than this are bad data rather than a city
+MAX_SPAN = 3.0
+GRID = 0.5
+
+QUERY = "query"
+COORDINATES = "coordinates"
+ADDRESS = "address"
+
+
+def _float(value):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(number) else number
+
+
+def neighborhood_key(neighborhood, city_key):
+    return f"{neighborhood}, {city_key}"
+
+
+def trimmed_box(lats, lons, trim=TRIM, margin=MARGIN):
+    """[min_lat, min_lon, max_lat, max_lon] of the central points, padded."""
+    lats = sorted(lats)
+    lons = sorted(lons)
+    cut = int(len(lats) * trim)
+    lo, hi = cut, len(lats) - 1 - cut
+    min_lat, max_lat = lats[lo], lats[hi]
+    min_lon, max_lon = lons[lo], lons[hi]
+    pad_lat = max(MIN_PAD, (max_lat - min_lat) * margin)
+    pad_lon = max(MIN_PAD, (max_lon - min_lon) * margin)
+    return [round(min_lat - pad_lat, 5), round(min_lon - pad_lon, 5),
+            round(max_lat + pad_lat, 5), round(max_lon + pad_lon, 5)]
+
+
+def build_boxes(rows, catalog):
+    """The city_boxes.json dict from rows carrying input_id and coordinates."""
+    cities = defaultdict(lambda: ([], []))
+    neighborhoods = defaultdict(lambda: ([], []))
+    for row in rows:
+        entry = catalog.get(row.get("input_id") or "")
+        if entry is None:
+            continue
+        lat, lon = _float(row.get("latitude")), _float(row.get("longitude"))
+        if lat is None or lon is None:
+            continue
+        lats, lons = cities[entry.city_key]
+        lats.append(lat)
+        lons.append(lon)
+        if entry.neighborhood:
+            lats, lons = neighborhoods[neighborhood_key(entry.neighborhood, entry.city_key)]
+            lats.append(lat)
+            lons.append(lon)
+
+    def boxes(points):
+        out = {}
+        for key, (lats, lons) in sorted(points.items()):
+            if len(lats) >= MIN_POINTS:
+                out[key] = trimmed_box(lats, lons) + [len(lats)]
+        return out
+
+    return {
+        "version": FORMAT_VERSION,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "cities": boxes(cities),
+        "neighborhoods": boxes(neighborhoods),
+    }
+
+
+def load_boxes(path=DEFAULT_BOXES):
+    """city_boxes.json, or empty boxes if it has not been built yet."""
+    if not path or not os.path.exists(path):
+        return {"version": FORMAT_VERSION, "cities": {}, "neighborhoods": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        boxes = json.load(f)
+    if boxes.get("version") != FORMAT_VERSION:
+        raise ValueError(f"unsupported city box version {boxes.get('version')!r}")
+    return boxes
+
+
+def _inside(box, lat, lon):
+    return box[0] <= lat <= box[2] and box[1] <= lon <= box[3]
+
+
+class BoxIndex:
+    """Grid of GRID-degree cells -> boxes overlapping them, smallest first."""
+
+    def __init__(self, boxes, grid=GRID):
+        self.grid = grid
+        self.cells = defaultdict(list)
+        for key, box in boxes.items():
+            min_lat, min_lon, max_lat, max_lon = box[:4]
+            if max_lat - min_lat > MAX_SPAN or max_lon - min_lon > MAX_SPAN:
+                continue
+            area = (max_lat - min_lat) * (max_lon - min_lon)
+            for i in range(math.floor(min_lat / grid), math.floor(max_lat / grid) + 1):
+                for j in range(math.floor(min_lon / grid), math.floor(max_lon / grid) + 1):
+                    self.cells[(i, j)].append((area, key, min_lat, min_lon, max_lat, max_lon))
+        for entries in self.cells.values():
+            entries.sort()
+
+    def containing(self, lat, lon):
+        """Keys of boxes containing the point, smallest first."""
+        entries = self.cells.get((math.floor(lat / self.grid), math.floor(lon / self.grid)), ())
+        return [key for _, key, a, b, c, d in entries if a <= lat <= c and b <= lon <= d]
+
+
+class Normalizer:
+    """Resolves rows to clean city/neighbourhood keys (see module docstring)."""
+
+    def __init__(self, catalog, boxes):
+        self.catalog = catalog
+        self.city_boxes = boxes["cities"]
+        self.neighborhood_boxes = boxes["neighborhoods"]
+        self.cities = BoxIndex(self.city_boxes)
+        self.neighborhoods = BoxIndex(self.neighborhood_boxes)
+        self.city_names = {}
+        self.neighborhood_names = {}
+        for entry in catalog:
+            self.city_names[entry.city_key] = (entry.city, entry.country)
+            if entry.neighborhood:
+                key = neighborhood_key(entry.neighborhood, entry.city_key)
+                self.neighborhood_names[key] = (entry.neighborhood, entry.city_key)
+
+    def _neighborhood(self, city_key, lat, lon, hint=None):
+        if hint:
+            box = self.neighborhood_boxes.get(neighborhood_key(hint, city_key))
+            if box is None or lat is None or _inside(box, lat, lon):
+                return hint
+        if lat is None:
+            return None
+        for key in self.neighborhoods.containing(lat, lon):
+            name, parent = self.neighborhood_names.get(key, (None, None))
+            if parent == city_key:
+                return name
+        return None
+
+    def resolve(self, row):
+        """{city, country, neighborhood, city_key, city_source} for one row."""
+        lat, lon = _float(row.get("latitude")), _float(row.get("longitude"))
+        if lat is None or lon is None:
+            lat = lon = None
+        entry = self.catalog.get(row.get("input_id") or "")
+
+        if entry is not None:
+            box = self.city_boxes.get(entry.city_key)
+            if box is None or lat is None or _inside(box, lat, lon):
+                return {
+                    "city": entry.city,
+                    "country": entry.country,
+                    "neighborhood": self._neighborhood(entry.city_key, lat, lon, entry.neighborhood),
+                    "city_key": entry.city_key,
+                    "city_source": QUERY,
+                }
+
+        if lat is not None:
+            for key in self.cities.containing(lat, lon):
+                if key in self.city_names:
+                    city, country = self.city_names[key]
+                    return {
+                        "city": city,
+                        "country": country,
+                        "neighborhood": self._neighborhood(key, lat, lon),
+                        "city_key": key,
+                        "city_source": COORDINATES,
+                    }
+
+        raw = row.get("complete_address")
+        if raw and raw[0] == "{":
+            try:
+                address = json.loads(raw)
+            except ValueError:
+                address = None
+            if isinstance(address, dict) and address.get("city"):
+                city = address["city"].strip()
+                country = (address.get("country") or "").strip()
+                return {
+                    "city": city,
+                    "country": country,
+                    "neighborhood": (address.get("borough") or "").strip() or None,
+                    "city_key": f"{city}, {country}" if country else city,
+                    "city_source": ADDRESS,
+                }
+
+        if entry is not None:
+            # Outside its query's city and no better match
+            return {"city": entry.city, "country": entry.country, "neighborhood": None,
+                    "city_key": entry.city_key, "city_source": QUERY}
+        return {"city": "", "country": "", "neighborhood": None, "city_key": "", "city_source": ""}
+
+    def normalize(self, rows):
+        """Yield rows with OUTPUT_COLUMNS added."""
+        resolve = self.resolve
+        for row in rows:
+            resolved = resolve(row)
+            row.update(resolved)
+            if row["neighborhood"] is None:
+                row["neighborhood"] = ""
+            yield row
+
+
+def load_normalizer(catalog_path=DEFAULT_CATALOG, boxes_path=DEFAULT_BOXES):
+    return Normalizer(load_catalog(catalog_path), load_boxes(boxes_path))
+
+
+def normalize_file(batch_file, normalizer, output=None):
+    """Rewrite ``batch_file`` (or write ``output``) with OUTPUT_COLUMNS; returns counts per source."""
+    counts = defaultdict(int)
+    header = read_header(batch_file)
+    if header is None:
+        return counts
+    columns = header + [c for c in OUTPUT_COLUMNS if c not in header]
+    target = output or batch_file
+    tmp = target + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+
+    def counted(rows):
+        for row in rows:
+            counts[row["city_source"] or "unresolved"] += 1
+            yield row
+
+    append_rows(tmp, counted(normalizer.normalize(read_rows(batch_file))), columns)
+    os.replace(tmp, target)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resolve clean city keys for scraped rows")
+    parser.add_argument("--catalog", default=DEFAULT_CATALOG)
+    parser.add_argument("--boxes", default=DEFAULT_BOXES)
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("boxes", help="rebuild city/neighborhood boxes from accumulated results")
+    build.add_argument("--store", default=DEFAULT_STORE)
+    build.add_argument("--results", default=DEFAULT_RESULTS)
+    batch = sub.add_parser("batch", help="add city columns to a batch CSV")
+    batch.add_argument("batch_file")
+    batch.add_argument("--output", help="write here instead of in place")
+    args = parser.parse_args(argv)
+
+    if args.command == "boxes":
+        rows = scan_results(["input_id", "latitude", "longitude"], args.store, args.results)
+        boxes = build_boxes(rows, load_catalog(args.catalog))
+        with open(args.boxes, "w", encoding="utf-8") as f:
+            json.dump(boxes, f, ensure_ascii=False, indent=0, separators=(",", ":"))
+        print(f"Wrote {len(boxes['cities'])} city and {len(boxes['neighborhoods'])} "
+              f"neighborhood boxes -> {args.boxes}")
+        return
+
+    if not os.path.exists(args.batch_file):
+        print(f"No batch file at {args.batch_file}")
+        return
+    with stage("normalize") as metrics:
+        counts = normalize_file(args.batch_file, load_normalizer(args.catalog, args.boxes), args.output)
+        metrics.add(rows_in=sum(counts.values()), **{f"by_{k}": v for k, v in counts.items()})
+    print("Cities resolved by " + (", ".join(f"{k}: {v}" for k, v in sorted(counts.items())) or "nothing"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Precomputed peer-percentile tables for every city and neighbourhood.
+
+compute-comparative-positioning ranks one practice at a time by pulling its
+city's peers and counting how many score lower. This batch job does the same
+for every group in one pass over the accumulated results and writes a compact
+artifact. Each group stores its distinct metric values in sorted order with
+the number of peers below each value, so a percentile is one binary search:
+
+    percentile = round(peers_below(value) / peer_count * 100)
+
+which matches ``calculatePercentile`` in the edge function.
+
+Usage (from the repository root):
+    python3 -m scraper.percentiles --output scraper/percentiles.json
+"""
+
+import argparse
+import json
+import math
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime, timezone
+from functools import partial
+
+from .catalog import DEFAULT_CATALOG
+from .dedup import place_key
+from .ingest import DEFAULT_RESULTS, DEFAULT_STORE, scan_results
+from .metrics import stage
+from .normalize import DEFAULT_BOXES, load_normalizer, neighborhood_key
+
+DEFAULT_OUTPUT = "scraper/percentiles.json"
+FORMAT_VERSION = 1
+
+# Same minimums as PEER_THRESHOLDS in compute-comparative-positioning
+PEER_THRESHOLDS = {"city": 50, "neighborhood": 25}
+# Artifact metric name -> results column
+METRICS = {"rating": "review_rating", "reviews": "review_count"}
+
+
+def row_groups(row, normalizer):
+    """{scope: group key} for one row, from its normalised city (see normalize.py)."""
+    resolved = normalizer.resolve(row)
+    groups = {}
+    if resolved["city_key"]:
+        groups["city"] = resolved["city_key"]
+        if resolved["neighborhood"]:
+            groups["neighborhood"] = neighborhood_key(resolved["neighborhood"], resolved["city_key"])
+    return groups
+
+
+def _number(value):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(number) else number
+
+
+def collect(rows, groups_of):
+    """
+    One pass over rows -> {(scope, key): {metric: [values]}}.
+
+    Each place counts once; its latest row wins.
+    """
+    latest = {}
+    for row in rows:
+        key = place_key(row) or id(row)
+        latest[key] = row
+
+    values = defaultdict(lambda: {m: [] for m in METRICS})
+    for row in latest.values():
+        metrics = {m: _number(row.get(col)) for m, col in METRICS.items()}
+        for scope, group in groups_of(row).items():
+            bucket = values[(scope, group)]
+            for metric, value in metrics.items():
+                if value is not None:
+                    bucket[metric].append(value)
+    return values
+
+
+def rank_table(values):
+    """Sorted distinct values and, for each, the count of values below it."""
+    values = sorted(values)
+    distinct = []
+    below = []
+    for i, value in enumerate(values):
+        if not distinct or value != distinct[-1]:
+            distinct.append(value)
+            below.append(i)
+    return {"n": len(values), "values": distinct, "below": below}
+
+
+def build_tables(rows, groups_of):
+    """The artifact dict: {scope: {group: {metric: rank table}}}."""
+    tables = defaultdict(dict)
+    for (scope, group), metrics in collect(rows, groups_of).items():
+        tables[scope][group] = {m: rank_table(v) for m, v in metrics.items() if v}
+    return {
+        "version": FORMAT_VERSION,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "thresholds": PEER_THRESHOLDS,
+        "scopes": {scope: dict(sorted(groups.items())) for scope, groups in tables.items()},
+    }
+
+
+def percentile(table, value):
+    """Percentile of ``value`` within a rank table, as calculatePercentile does."""
+    n = table["n"]
+    if not n:
+        return None
+    i = bisect_left(table["values"], value)
+    below = table["below"][i] if i < len(table["values"]) else n
+    # JS Math.round rounds halves up
+    return math.floor(below / n * 100 + 0.5)
+
+
+def lookup(artifact, scope, group, metric, value):
+    """
+    {percentile, peer_count, threshold_met} for one value, or None if the
+    group has no data for the metric.
+    """
+    table = artifact["scopes"].get(scope, {}).get(group, {}).get(metric)
+    if not table:
+        return None
+    threshold = artifact["thresholds"].get(scope, 25)
+    return {
+        "percentile": percentile(table, value),
+        "peer_count": table["n"],
+        "threshold_met": table["n"] >= threshold,
+    }
+
+
+def place_positions(rows, groups_of, artifact):
+    """Yield {place, scope, group, metric, percentile, ...} for every place."""
+    latest = {}
+    for row in rows:
+        key = place_key(row)
+        if key is not None:
+            latest[key] = row
+    for key, row in latest.items():
+        for scope, group in groups_of(row).items():
+            for metric, column in METRICS.items():
+                value = _number(row.get(column))
+                if value is None:
+                    continue
+                found = lookup(artifact, scope, group, metric, value)
+                if found:
+                    yield {"place": key, "scope": scope, "group": group, "metric": metric, **found}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute peer percentile tables per city/neighborhood")
+    parser.add_argument("--store", default=DEFAULT_STORE)
+    parser.add_argument("--results", default=DEFAULT_RESULTS)
+    parser.add_argument("--catalog", default=DEFAULT_CATALOG, help="maps input_id back to its query")
+    parser.add_argument("--boxes", default=DEFAULT_BOXES)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--places", help="also write every place's percentiles here (JSON lines)")
+    args = parser.parse_args(argv)
+
+    columns = ["input_id", "place_id", "cid", "data_id", "complete_address",
+               "latitude", "longitude"] + list(METRICS.values())
+    groups_of = partial(row_groups, normalizer=load_normalizer(args.catalog, args.boxes))
+    with stage("percentiles") as metrics:
+        artifact = build_tables(scan_results(columns, args.store, args.results), groups_of)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(artifact, f, ensure_ascii=False, separators=(",", ":"))
+        metrics.add(groups=sum(len(groups) for groups in artifact["scopes"].values()))
+
+    if args.places:
+        count = 0
+        with open(args.places, "w", encoding="utf-8") as f:
+            for position in place_positions(scan_results(columns, args.store, args.results),
+                                            groups_of, artifact):
+                f.write(json.dumps(position, ensure_ascii=False) + "\n")
+                count += 1
+        print(f"Wrote {count} place percentiles -> {args.places}")
+
+    summary = ", ".join(f"{len(groups)} {scope} groups" for scope, groups in artifact["scopes"].items())
+    print(f"Wrote {summary or 'no groups'} -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
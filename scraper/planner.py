@@ -0,0 +1,189 @@
+"""
+Geo-aware query planner.
+
+Instead of one fixed ``dentists <neighborhood>, <city>`` line per hand-written
+entry, the planner buckets every place we have already scraped into geohash
+cells and plans the next queries from the observed density:
+
+- dense cells (a query there was probably truncated) are split into child
+  cells, recursively, so each query covers fewer places
+- neighbouring sparse cells are merged into their parent cell
+- saturated cells, where most places have been returned by several queries
+  already, are dropped
+- the remaining candidates are ranked by expected new places and cut to the
+  daily query budget
+
+Committing the output as scraper/planned_queries.txt queues it: each
+scheduled run syncs it into the ledger (``Ledger.sync_planned``) after every
+catalog query. Planned queries are not in the catalog, so their rows get a
+city from the coordinates rule of scraper.normalize.
+
+Usage (from the repository root):
+    python3 -m scraper.planner --budget 60 --output scraper/planned_queries.txt
+"""
+
+import argparse
+from collections import defaultdict
+
+from . import geohash
+from .dedup import DEFAULT_HITS, place_key, read_hits
+from .ingest import DEFAULT_RESULTS, DEFAULT_STORE, scan_results
+
+# 20 queries x 3 runs per day
+DEFAULT_BUDGET = 60
+# gosom at -depth 3 returns ~50-60 places before Maps stops paginating
+DENSE_THRESHOLD = 40
+SPARSE_THRESHOLD = 10
+SATURATION_THRESHOLD = 0.8
+BASE_PRECISION = 5
+MAX_PRECISION = 7
+
+
+class Cell:
+    """Aggregated observations for one geohash cell."""
+
+    __slots__ = ("cell", "places", "repeats", "action")
+
+    def __init__(self, cell, places=0, repeats=0, action=""):
+        self.cell = cell
+        self.places = places
+        self.repeats = repeats
+        self.action = action
+
+    @property
+    def saturation(self):
+        return self.repeats / self.places if self.places else 0.0
+
+    @property
+    def score(self):
+        """Heuristic count of new places a query on this cell would return."""
+        weight = 1.0 if self.action == "split" else 0.5
+        return self.places * (1.0 - self.saturation) * weight
+
+    def query(self, template):
+        lat, lon = geohash.center(self.cell)
+        return template.format(lat=lat, lon=lon)
+
+
+def load_points(store_dir=DEFAULT_STORE, results_file=DEFAULT_RESULTS,
+                hits_path=DEFAULT_HITS):
+    """
+    Return [(lat, lon, times_seen)] for every distinct scraped place.
+
+    ``times_seen`` comes from dedup's per-place hit counts, which include the
+    unchanged re-finds that never reach the results; a place returned by
+    several queries is evidence that its area is already covered. The results
+    only supply coordinates.
+    """
+    times_seen = read_hits(hits_path)
+    columns = ["place_id", "cid", "data_id", "latitude", "longitude"]
+    points = {}
+    for row in scan_results(columns, store_dir, results_file):
+        try:
+            lat = float(row["latitude"])
+            lon = float(row["longitude"])
+        except (TypeError, ValueError):
+            continue
+        key = place_key(row) or f"{lat:.6f},{lon:.6f}"
+        if key not in points:
+            points[key] = (lat, lon, times_seen.get(key, 1))
+    return list(points.values())
+
+
+def _bucket(points, precision):
+    cells = defaultdict(list)
+    for point in points:
+        cells[geohash.encode(point[0], point[1], precision)].append(point)
+    return cells
+
+
+def _cell(name, points, action):
+    repeats = sum(1 for p in points if p[2] > 1)
+    return Cell(name, len(points), repeats, action)
+
+
+def plan_cells(points, precision=BASE_PRECISION, dense=DENSE_THRESHOLD,
+               sparse=SPARSE_THRESHOLD, saturation=SATURATION_THRESHOLD,
+               max_precision=MAX_PRECISION):
+    """Return (planned cells, dropped cells) for the given points."""
+    planned = []
+    dropped = []
+    sparse_by_parent = defaultdict(list)
+
+    def visit(name, cell_points, level):
+        cell = _cell(name, cell_points, "")
+        if cell.saturation >= saturation:
+            cell.action = "saturated"
+            dropped.append(cell)
+            return
+        if cell.places >= dense and level < max_precision:
+            for child, child_points in _bucket(cell_points, level + 1).items():
+                visit(child, child_points, level + 1)
+            return
+        if cell.places >= dense:
+            cell.action = "split"
+            planned.append(cell)
+        elif cell.places < sparse and level == precision and level > 1:
+            # Children of a split cell are never merged back into it
+            sparse_by_parent[name[:-1]].extend(cell_points)
+        else:
+            cell.action = "split" if level > precision else "keep"
+            planned.append(cell)
+
+    for name, cell_points in _bucket(points, precision).items():
+        visit(name, cell_points, precision)
+
+    for parent, parent_points in sparse_by_parent.items():
+        cell = _cell(parent, parent_points, "merge")
+        if cell.saturation >= saturation:
+            cell.action = "saturated"
+            dropped.append(cell)
+        else:
+            planned.append(cell)
+
+    planned.sort(key=lambda c: (-c.score, c.cell))
+    return planned, dropped
+
+
+def plan_queries(points, budget=DEFAULT_BUDGET,
+                 template="dentists near {lat:.5f},{lon:.5f}", **kwargs):
+    """Return up to ``budget`` (query, cell) pairs, best first."""
+    planned, _ = plan_cells(points, **kwargs)
+    return [(cell.query(template), cell) for cell in planned[:budget]]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plan adaptive queries from scraped dentist density")
+    parser.add_argument("--store", default=DEFAULT_STORE)
+    parser.add_argument("--results", default=DEFAULT_RESULTS)
+    parser.add_argument("--hits", default=DEFAULT_HITS, help="dedup's per-place hit counts (for saturation)")
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET, help="queries to emit")
+    parser.add_argument("--precision", type=int, default=BASE_PRECISION, help="base geohash precision")
+    parser.add_argument("--dense", type=int, default=DENSE_THRESHOLD)
+    parser.add_argument("--sparse", type=int, default=SPARSE_THRESHOLD)
+    parser.add_argument("--saturation", type=float, default=SATURATION_THRESHOLD)
+    parser.add_argument("--output", help="write queries here (default: stdout)")
+    args = parser.parse_args(argv)
+
+    points = load_points(args.store, args.results, args.hits)
+    planned = plan_queries(points, args.budget, precision=args.precision,
+                           dense=args.dense, sparse=args.sparse,
+                           saturation=args.saturation)
+
+    lines = [f"# Planned from {len(points)} places, {len(planned)} queries"]
+    for query, cell in planned:
+        lines.append(f"# {cell.cell} {cell.action} places={cell.places} "
+                     f"saturation={cell.saturation:.2f}")
+        lines.append(query)
+    content = "\n".join(lines) + "\n"
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(content)
+        print(f"Planned {len(planned)} queries from {len(points)} places -> {args.output}")
+    else:
+        print(content, end="")
+
+
+if __name__ == "__main__":
+    main()
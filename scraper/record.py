@@ -0,0 +1,111 @@
+"""
+Compact, typed record for one scraped dentist.
+
+Scalar columns are converted once on construction (``rating``,
+``review_count``, ``latitude``/``longitude``, ``cid``). JSON columns such as
+``user_reviews`` or ``popular_times`` are kept as the raw text and only decoded
+on first attribute access, then cached, so filtering many records by rating or
+location never pays for parsing review blobs.
+"""
+
+import json
+
+from .gosom_csv import JSON_COLUMNS, read_rows, to_float, to_int
+
+# Plain text columns copied as-is
+TEXT_FIELDS = (
+    "input_id", "link", "title", "category", "address", "website", "phone",
+    "plus_code", "status", "descriptions", "reviews_link", "thumbnail",
+    "timezone", "price_range", "data_id", "place_id",
+)
+# JSON columns decoded lazily, in slot order
+JSON_FIELDS = tuple(sorted(JSON_COLUMNS))
+
+_UNSET = object()
+
+
+def decode_json(raw):
+    """Decode a gosom JSON cell; '' and 'null' are None, bad JSON stays text."""
+    if raw is None or raw == "" or raw == "null":
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw
+
+
+class _LazyJSON:
+    """Descriptor decoding one JSON column on first access."""
+
+    __slots__ = ("index",)
+
+    def __init__(self, index):
+        self.index = index
+
+    def __get__(self, record, owner=None):
+        if record is None:
+            return self
+        cache = record._json_cache
+        if cache is None:
+            cache = record._json_cache = [_UNSET] * len(JSON_FIELDS)
+        value = cache[self.index]
+        if value is _UNSET:
+            value = cache[self.index] = decode_json(record._json_raw[self.index])
+        return value
+
+
+class DentistRecord:
+    """One gosom row with typed scalars and lazily decoded JSON fields."""
+
+    __slots__ = TEXT_FIELDS + (
+        "rating", "review_count", "latitude", "longitude", "cid",
+        "_json_raw", "_json_cache",
+    )
+
+    def __init__(self, **fields):
+        for name in TEXT_FIELDS:
+            value = fields.get(name)
+            setattr(self, name, "" if value is None else str(value))
+        self.rating = to_float(fields.get("review_rating", fields.get("rating")))
+        self.review_count = to_int(fields.get("review_count"))
+        self.latitude = to_float(fields.get("latitude"))
+        self.longitude = to_float(fields.get("longitude"))
+        self.cid = to_int(fields.get("cid"))
+        self._json_raw = tuple(fields.get(name) or "" for name in JSON_FIELDS)
+        self._json_cache = None
+
+    @classmethod
+    def from_row(cls, row):
+        """Build from a gosom row dict (raw strings or column-store values)."""
+        return cls(**row)
+
+    def raw_json(self, name):
+        """The undecoded text of a JSON column."""
+        return self._json_raw[JSON_FIELDS.index(name)]
+
+    @property
+    def has_location(self):
+        return self.latitude is not None and self.longitude is not None
+
+    @property
+    def email(self):
+        """First email address, matching github-sync-webhook's choice."""
+        emails = self.emails
+        if isinstance(emails, list):
+            return emails[0] if emails else None
+        return emails or None
+
+    def __repr__(self):
+        return (f"DentistRecord(title={self.title!r}, rating={self.rating!r}, "
+                f"review_count={self.review_count!r}, place_id={self.place_id!r})")
+
+
+for _index, _name in enumerate(JSON_FIELDS):
+    setattr(DentistRecord, _name, _LazyJSON(_index))
+del _index, _name
+
+
+def iter_dentists(path):
+    """Yield a DentistRecord per row of a gosom CSV."""
+    for row in read_rows(path):
+        yield DentistRecord.from_row(row)
@@ -0,0 +1,287 @@
+"""
+Sharded, work-stealing runner for the Google Maps scraper stage.
+
+Queries from the batch file are split into small jobs on a shared queue. N
+workers each pull the next job as soon as they are free, run one scraper
+process for it with a per-job timeout, and requeue it on failure until its
+retries are used up. A single hung query therefore costs one job, not the
+whole batch. Per-job CSVs are merged into one results file at the end.
+
+The scraper command is a template, so the same runner drives the gosom
+Docker image in CI and any stub executable locally. Placeholders:
+    {workdir} {input} {results}     shared directory and file names in it
+    {input_path} {results_path}     absolute paths of the same files
+    {name} {concurrency}            unique job name, per-process concurrency
+    {inactivity}                    idle time after which gosom exits
+
+gosom waits ``--inactivity`` for more results before it exits, and that idle
+tail is paid once per job, so the workflow puts several queries in each job
+with ``--chunk-size``; rows are still counted per query by ``input_id``. With ``--deadline`` no attempt may run past it:
+each attempt's timeout is capped at the time left, and a job cut off by the
+deadline stays pending instead of failing.
+
+Usage (from the repository root):
+    python3 -m scraper.runner scraper/batch_queries.txt scraper/batch_results.csv
+"""
+
+import argparse
+import json
+import os
+import queue
+import shlex
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+
+from .gosom_csv import append_rows, read_header, read_rows
+from .ledger import read_queries, split_input
+from .metrics import stage
+
+GOSOM_COMMAND = (
+    "docker run --rm --name {name} -v {workdir}:/work gosom/google-maps-scraper"
+    " -input /work/{input} -results /work/{results}"
+    " -exit-on-inactivity {inactivity} -depth 3 -c {concurrency}"
+)
+GOSOM_KILL_COMMAND = "docker rm -f {name}"
+
+DEFAULT_WORKERS = 2
+DEFAULT_CONCURRENCY = 2
+DEFAULT_TIMEOUT = 600
+DEFAULT_RETRIES = 1
+DEFAULT_INACTIVITY = "1m"
+# Don't start an attempt with less time than this left before the deadline
+MIN_ATTEMPT_SECONDS = 60
+
+
+class Job:
+    """A chunk of queries run by one scraper process."""
+
+    __slots__ = ("job_id", "queries", "attempts", "status", "rows", "query_rows", "duration", "error")
+
+    def __init__(self, job_id, queries):
+        self.job_id = job_id
+        self.queries = queries
+        self.attempts = 0
+        self.status = "pending"
+        self.rows = 0
+        self.query_rows = {}
+        self.duration = 0.0
+        self.error = ""
+
+
+def _count_by_input(job, rows):
+    # gosom copies the batch line's input id into every row it finds for it
+    for row in rows:
+        qid = row.get("input_id", "")
+        job.query_rows[qid] = job.query_rows.get(qid, 0) + 1
+        yield row
+
+
+class ShardRunner:
+    """Runs jobs on a pool of worker threads, each driving one subprocess."""
+
+    def __init__(self, command=GOSOM_COMMAND, kill_command=None, workers=DEFAULT_WORKERS,
+                 concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT,
+                 retries=DEFAULT_RETRIES, deadline=None, workdir=None,
+                 inactivity=DEFAULT_INACTIVITY, log=print):
+        self.command = command
+        self.kill_command = kill_command
+        self.workers = workers
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.deadline = deadline
+        self.workdir = workdir
+        self.inactivity = inactivity
+        self.log = log
+        self._lock = threading.Lock()
+
+    def _placeholders(self, job, attempt, workdir):
+        name = f"gmaps-{job.job_id:04d}-{attempt}"
+        return {
+            "workdir": workdir,
+            "input": f"{name}.txt",
+            "results": f"{name}.csv",
+            "input_path": os.path.join(workdir, f"{name}.txt"),
+            "results_path": os.path.join(workdir, f"{name}.csv"),
+            "name": name,
+            "concurrency": self.concurrency,
+            "inactivity": self.inactivity,
+        }
+
+    def _run_job(self, job, workdir, timeout):
+        job.attempts += 1
+        values = self._placeholders(job, job.attempts, workdir)
+        with open(values["input_path"], "w", encoding="utf-8") as f:
+            f.write("\n".join(job.queries) + "\n")
+
+        started = time.monotonic()
+        args = shlex.split(self.command.format(**values))
+        try:
+            proc = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        except OSError as exc:
+            job.error = str(exc)
+            return None
+        try:
+            _, stderr = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            if self.kill_command:
+                subprocess.run(shlex.split(self.kill_command.format(**values)),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            job.error = f"timed out after {timeout:.0f}s"
+            return None
+        finally:
+            job.duration += time.monotonic() - started
+
+        if proc.returncode != 0:
+            tail = stderr.decode("utf-8", "replace").strip().splitlines()[-1:] if stderr else []
+            job.error = f"exit {proc.returncode}" + (f": {tail[0]}" if tail else "")
+            return None
+        if not os.path.exists(values["results_path"]):
+            job.error = "no results file"
+            return None
+        return values["results_path"]
+
+    def run(self, queries, output, chunk_size=1):
+        """Run all queries and merge their results into ``output``; returns jobs."""
+        jobs = [Job(i, queries[i:i + chunk_size]) for i in range(0, len(queries), chunk_size)]
+        pending = queue.Queue()
+        for job in jobs:
+            pending.put(job)
+
+        workdir = os.path.abspath(self.workdir or tempfile.mkdtemp(prefix="gmaps-shards-"))
+        os.makedirs(workdir, exist_ok=True)
+        started = time.monotonic()
+        results = {}
+
+        def worker():
+            while True:
+                timeout = self.timeout
+                if self.deadline:
+                    left = self.deadline - (time.monotonic() - started)
+                    if left < MIN_ATTEMPT_SECONDS:
+                        return
+                    timeout = min(timeout, left)
+                try:
+                    job = pending.get_nowait()
+                except queue.Empty:
+                    return
+                path = self._run_job(job, workdir, timeout)
+                if path is None and timeout < self.timeout and job.error.startswith("timed out"):
+                    # Cut off by the deadline, not by its own timeout: leave it
+                    # pending for the next run without spending a retry
+                    job.attempts -= 1
+                    job.error = "deadline reached"
+                    continue
+                if path is not None:
+                    job.status = "done"
+                    job.error = ""
+                    with self._lock:
+                        results[job.job_id] = path
+                elif job.attempts <= self.retries:
+                    self.log(f"Job {job.job_id} failed ({job.error}), retrying")
+                    pending.put(job)
+                else:
+                    job.status = "failed"
+                    self.log(f"Job {job.job_id} failed ({job.error}), giving up: {job.queries}")
+
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(max(1, self.workers))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for job in jobs:
+            if job.status == "pending":
+                job.error = job.error or "deadline reached"
+
+        self._merge(jobs, results, output)
+        if not self.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+        return jobs
+
+    def _merge(self, jobs, results, output):
+        if os.path.exists(output):
+            os.remove(output)
+        header = None
+        for job in jobs:
+            path = results.get(job.job_id)
+            if path is None:
+                continue
+            job_header = read_header(path)
+            if job_header is None:
+                continue
+            header = header or job_header
+            job.query_rows = {}
+            job.rows = append_rows(output, _count_by_input(job, read_rows(path)), header)
+        if header is not None and not os.path.exists(output):
+            # Keep a header-only file so downstream steps see an empty batch
+            append_rows(output, [], header)
+
+
+def write_report(jobs, path):
+    """Write per-query outcomes as JSON lines."""
+    with open(path, "w", encoding="utf-8") as f:
+        for job in jobs:
+            for query in job.queries:
+                if len(job.queries) == 1:
+                    rows = job.rows
+                elif job.status == "done":
+                    rows = job.query_rows.get(split_input(query)[1], 0)
+                else:
+                    rows = None
+                f.write(json.dumps({
+                    "query": query,
+                    "status": job.status,
+                    "rows": rows,
+                    "attempts": job.attempts,
+                    "duration": round(job.duration, 3),
+                    "error": job.error,
+                }, ensure_ascii=False) + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the scraper over a batch of queries in parallel shards")
+    parser.add_argument("queries", help="batch queries file, one query per line")
+    parser.add_argument("output", help="merged results CSV")
+    parser.add_argument("--command", default=GOSOM_COMMAND, help="scraper command template")
+    parser.add_argument("--kill-command", help="run after a timeout (default: docker rm for the gosom command)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="parallel scraper processes")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="-c passed to each process")
+    parser.add_argument("--chunk-size", type=int, default=1, help="queries per job")
+    parser.add_argument("--timeout", type=int, default=DEFAULT_TIMEOUT, help="seconds per job attempt")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES, help="extra attempts per failed job")
+    parser.add_argument("--deadline", type=int, help="finish all attempts within this many seconds")
+    parser.add_argument("--inactivity", default=DEFAULT_INACTIVITY,
+                        help="gosom -exit-on-inactivity per process, e.g. 1m")
+    parser.add_argument("--workdir", help="keep shard files here instead of a temp dir")
+    parser.add_argument("--report", help="write per-query outcomes (JSON lines) here")
+    args = parser.parse_args(argv)
+
+    kill_command = args.kill_command
+    if kill_command is None and args.command == GOSOM_COMMAND:
+        kill_command = GOSOM_KILL_COMMAND
+
+    runner = ShardRunner(args.command, kill_command, args.workers, args.concurrency,
+                         args.timeout, args.retries, args.deadline, args.workdir, args.inactivity)
+    queries = read_queries(args.queries)
+    with stage("scrape") as metrics:
+        metrics.set(workers=args.workers, concurrency=args.concurrency)
+        jobs = runner.run(queries, args.output, args.chunk_size)
+        if args.report:
+            write_report(jobs, args.report)
+
+        done = sum(1 for j in jobs if j.status == "done")
+        rows = sum(j.rows for j in jobs)
+        metrics.add(queries=len(queries), rows_out=rows, jobs_done=done,
+                    jobs_failed=sum(1 for j in jobs if j.status == "failed"),
+                    attempts=sum(j.attempts for j in jobs))
+    print(f"Completed {done}/{len(jobs)} jobs ({len(queries)} queries), {rows} rows -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Incremental re-scrape scheduler.
+
+Once every query in the ledger has run, the workflow keeps the dataset fresh
+by re-running a fixed-size batch of the queries most worth refreshing. Each
+query is scored from:
+
+- age: days since it last ran, relative to REFRESH_DAYS
+- yield: share of its latest run's rows that were places seen for the first time
+- churn: share of its latest run's rows that were already-known places whose
+  content changed
+
+Yield and churn are per run: the dedup step counts each query's new and
+changed rows (by the ledger id carried in ``input_id``) and the ledger stores
+them with the run, so a query that stops finding anything new loses priority
+after its next refresh. Queries recorded before these counts existed are
+scored on age alone.
+
+Usage (from the repository root):
+    python3 -m scraper.scheduler --batch-size 20
+"""
+
+import argparse
+from datetime import datetime, timezone
+
+from .ledger import DEFAULT_LEDGER, DONE, Ledger
+
+REFRESH_DAYS = 30.0
+MIN_AGE_DAYS = 7.0
+YIELD_WEIGHT = 2.0
+CHURN_WEIGHT = 1.0
+# Queries that returned nothing are rarely worth repeating
+EMPTY_PENALTY = 0.25
+
+
+def _age_days(last_run, now):
+    if not last_run:
+        return None
+    then = datetime.fromisoformat(last_run)
+    if then.tzinfo is None:
+        then = then.replace(tzinfo=timezone.utc)
+    return (now - then).total_seconds() / 86400
+
+
+def score_queries(ledger, now=None, min_age=MIN_AGE_DAYS):
+    """
+    Yield (score, query_id, query) for finished queries at least ``min_age`` old.
+    """
+    now = now or datetime.now(timezone.utc)
+    for qid, query, rows, new, changed, last_run in ledger.conn.execute(
+            "SELECT query_id, query, rows, new_places, changed_places, last_run FROM queries"
+            " WHERE active = 1 AND status = ?", (DONE,)):
+        age = _age_days(last_run, now)
+        if age is None or age < min_age:
+            continue
+        score = age / REFRESH_DAYS
+        if rows:
+            yield_rate = min((new or 0) / rows, 1.0)
+            churn_rate = min((changed or 0) / rows, 1.0)
+            score *= 1.0 + YIELD_WEIGHT * yield_rate + CHURN_WEIGHT * churn_rate
+        else:
+            score *= EMPTY_PENALTY
+        yield score, qid, query
+
+
+def refresh_batch(ledger, size, min_age=MIN_AGE_DAYS, now=None):
+    """The ``size`` highest-scoring queries to re-scrape, as (id, query)."""
+    scored = sorted(score_queries(ledger, now, min_age), key=lambda item: (-item[0], item[1]))
+    return [(qid, query) for _, qid, query in scored[:size]]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print the highest-priority refresh batch")
+    parser.add_argument("--ledger", default=DEFAULT_LEDGER)
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--min-age", type=float, default=MIN_AGE_DAYS,
+                        help="skip queries scraped fewer than this many days ago")
+    args = parser.parse_args(argv)
+
+    with Ledger(args.ledger) as ledger:
+        scored = sorted(score_queries(ledger, min_age=args.min_age),
+                        key=lambda item: (-item[0], item[1]))
+    for score, qid, query in scored[:args.batch_size]:
+        print(f"{score:8.3f}  {qid}  {query}")
+
+
+if __name__ == "__main__":
+    main()
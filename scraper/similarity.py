@@ -0,0 +1,295 @@
+"""
+Corpus-wide near-duplicate check for generated SEO content.
+
+``compute-similarity`` checks one page at a time: it splits the source and the
+generated text into chunks and scores every chunk pair as
+
+    0.3 * word Jaccard + 0.7 * character 3-gram Jaccard
+
+flagging the page when any pair reaches 0.85. This batch job applies the same
+chunking, scoring and threshold to a whole export of ``dentist_scrapes``. It
+checks every generated chunk against every source chunk and every other
+generated chunk. The check is not pairwise. Each chunk gets a MinHash signature
+over its 3-grams, and the signatures are banded into LSH buckets. Only chunks
+sharing a bucket are scored exactly.
+
+A pair can only reach the threshold if its 3-gram Jaccard is at least
+(0.85 - 0.3) / 0.7 ~= 0.79. The banding is tuned so that such pairs collide
+with probability > 99.9%.
+
+The input is JSON lines, one row per practice, e.g. exported with
+``select id, text_content, profile_content from dentist_scrapes``.
+
+Usage (from the repository root):
+    python3 -m scraper.similarity scrapes.jsonl --output flagged.jsonl
+"""
+
+import argparse
+import hashlib
+import json
+import re
+from collections import defaultdict
+from functools import lru_cache
+
+# Same values as compute-similarity
+SIMILARITY_THRESHOLD = 0.85
+WORD_WEIGHT = 0.3
+NGRAM_WEIGHT = 0.7
+NGRAM_SIZE = 3
+CHUNK_WORDS = 400
+
+# One-permutation MinHash: BANDS * ROWS bins, banded for LSH
+BANDS = 20
+ROWS = 5
+NUM_BINS = BANDS * ROWS
+# Candidates whose estimated 3-gram Jaccard is this far below the lowest
+# value that can still reach the threshold are dropped without scoring
+ESTIMATE_MARGIN = 0.15
+
+SOURCE = "source"
+GENERATED = "generated"
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_WHITESPACE = re.compile(r"\s+")
+# JS \W is ASCII-only
+_NON_WORD = re.compile(r"\W+", re.ASCII)
+_EMPTY_BIN = 1 << 64
+
+
+def chunk_text(text, target_size=CHUNK_WORDS):
+    """Sentence-aligned chunks of about ``target_size`` words, as chunkText."""
+    chunks = []
+    current = ""
+    for sentence in _SENTENCE_END.split(text):
+        words = len(_WHITESPACE.split(current + " " + sentence))
+        if words > target_size and current:
+            chunks.append(current.strip())
+            current = sentence
+        else:
+            current = current + " " + sentence if current else sentence
+    if current.strip():
+        chunks.append(current.strip())
+    return chunks or [text]
+
+
+def word_set(text):
+    """Lower-cased words longer than two characters."""
+    return {w for w in _NON_WORD.split(text.lower()) if len(w) > 2}
+
+
+def ngram_set(text, n=NGRAM_SIZE):
+    """Character n-grams of the lower-cased, whitespace-collapsed text."""
+    normalized = _WHITESPACE.sub(" ", text.lower())
+    return {normalized[i:i + n] for i in range(len(normalized) - n + 1)}
+
+
+def jaccard(a, b):
+    union = len(a | b)
+    return len(a & b) / union if union else 0.0
+
+
+def similarity(text1, text2):
+    """The combined score computeSimilarity returns."""
+    return (WORD_WEIGHT * jaccard(word_set(text1), word_set(text2))
+            + NGRAM_WEIGHT * jaccard(ngram_set(text1), ngram_set(text2)))
+
+
+def min_ngram_jaccard(threshold=SIMILARITY_THRESHOLD):
+    """Lowest 3-gram Jaccard that can still score ``threshold`` (word Jaccard <= 1)."""
+    return max(0.0, (threshold - WORD_WEIGHT) / NGRAM_WEIGHT)
+
+
+@lru_cache(maxsize=1 << 18)
+def _hash64(shingle):
+    # The 3-gram vocabulary is small, so most shingles are hashed only once
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def signature(shingles, bins=NUM_BINS):
+    """
+    One-permutation MinHash of a shingle set.
+
+    Each shingle is hashed once and kept as the minimum of bin ``hash % bins``,
+    instead of being hashed once per permutation. Empty bins borrow the value
+    of the next non-empty bin (rotation densification), so every bin agrees
+    between two sets with probability equal to their Jaccard.
+    """
+    sig = [_EMPTY_BIN] * bins
+    for shingle in shingles:
+        h = _hash64(shingle)
+        b = h % bins
+        if h < sig[b]:
+            sig[b] = h
+    if _EMPTY_BIN in sig and len(sig) > sig.count(_EMPTY_BIN):
+        filled = [i for i, v in enumerate(sig) if v != _EMPTY_BIN]
+        for i in range(bins):
+            if sig[i] == _EMPTY_BIN:
+                # Nearest filled bin to the right, wrapping round; the
+                # distance term keeps borrowed values apart from real ones
+                j = next((f for f in filled if f > i), filled[0])
+                sig[i] = sig[j] + ((j - i) % bins) * _EMPTY_BIN
+    return sig
+
+
+def estimate(sig1, sig2):
+    """Estimated Jaccard: the share of bins two signatures agree on."""
+    return sum(1 for a, b in zip(sig1, sig2) if a == b) / len(sig1)
+
+
+class LSHIndex:
+    """Bands of MinHash signatures mapped to the keys that share them."""
+
+    def __init__(self, bands=BANDS, rows=ROWS):
+        self.bands = bands
+        self.rows = rows
+        self.buckets = defaultdict(list)
+
+    def add(self, key, sig):
+        rows = self.rows
+        for band in range(self.bands):
+            self.buckets[(band, tuple(sig[band * rows:(band + 1) * rows]))].append(key)
+
+    def candidates(self):
+        """Each unordered pair of keys sharing at least one bucket, once."""
+        seen = set()
+        for keys in self.buckets.values():
+            if len(keys) < 2:
+                continue
+            for i, a in enumerate(keys):
+                for b in keys[i + 1:]:
+                    pair = (a, b) if a < b else (b, a)
+                    if pair not in seen:
+                        seen.add(pair)
+                        yield pair
+
+
+class Chunk:
+    __slots__ = ("doc", "kind", "text", "sig", "_words", "_ngrams")
+
+    def __init__(self, doc, kind, text, bins=NUM_BINS):
+        self.doc = doc
+        self.kind = kind
+        self.text = text
+        self.sig = signature(ngram_set(text), bins)
+        # Sets for exact scoring are rebuilt on demand, only for candidates
+        self._words = None
+        self._ngrams = None
+
+    @property
+    def ngrams(self):
+        if self._ngrams is None:
+            self._ngrams = ngram_set(self.text)
+        return self._ngrams
+
+    @property
+    def words(self):
+        if self._words is None:
+            self._words = word_set(self.text)
+        return self._words
+
+
+def _preview(text):
+    return text[:200] + ("..." if len(text) > 200 else "")
+
+
+def find_similar(documents, threshold=SIMILARITY_THRESHOLD, bands=BANDS, rows=ROWS):
+    """
+    Flagged document pairs in a corpus.
+
+    ``documents`` yields (doc id, kind, text) with kind SOURCE or GENERATED.
+    Returns one dict per (generated doc, other doc, other kind) whose highest
+    chunk-pair score reaches ``threshold``, with the worst pair like
+    compute-similarity's ``worst_chunk_pair``. Source-vs-source pairs and
+    chunks of the same text are not compared.
+    """
+    chunks = []
+    index = LSHIndex(bands, rows)
+    for doc, kind, text in documents:
+        if not text:
+            continue
+        for piece in chunk_text(text):
+            chunk = Chunk(doc, kind, piece, bands * rows)
+            index.add(len(chunks), chunk.sig)
+            chunks.append(chunk)
+
+    floor = min_ngram_jaccard(threshold) - ESTIMATE_MARGIN
+    worst = {}
+    for i, j in index.candidates():
+        a, b = chunks[i], chunks[j]
+        if a.kind == SOURCE and b.kind == SOURCE:
+            continue
+        if a.doc == b.doc and a.kind == b.kind:
+            continue
+        if estimate(a.sig, b.sig) < floor:
+            continue
+        score = WORD_WEIGHT * jaccard(a.words, b.words) + NGRAM_WEIGHT * jaccard(a.ngrams, b.ngrams)
+        if score < threshold:
+            continue
+        if a.kind != GENERATED:
+            a, b = b, a
+        # A generated-vs-generated pair is reported once, lower id first
+        if b.kind == GENERATED and str(b.doc) < str(a.doc):
+            a, b = b, a
+        key = (a.doc, b.doc, b.kind)
+        if key not in worst or score > worst[key][0]:
+            worst[key] = (score, a.text, b.text)
+
+    return [
+        {
+            "generated": doc,
+            "other": other,
+            "kind": kind,
+            "max_similarity": round(score, 3),
+            "worst_chunk_pair": {
+                "generated_chunk": _preview(generated_text),
+                f"{kind}_chunk": _preview(other_text),
+                "similarity": score,
+            },
+            "status": "flagged",
+        }
+        for (doc, other, kind), (score, generated_text, other_text) in sorted(
+            worst.items(), key=lambda item: -item[1][0])
+    ]
+
+
+def load_corpus(path, id_field="id", source_field="text_content", generated_field="profile_content"):
+    """Yield (doc id, kind, text) from a JSON lines export of dentist_scrapes."""
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            doc = row.get(id_field, number)
+            if row.get(source_field):
+                yield doc, SOURCE, row[source_field]
+            if row.get(generated_field):
+                yield doc, GENERATED, row[generated_field]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find near-duplicate generated content across a corpus")
+    parser.add_argument("corpus", help="JSON lines, one dentist_scrapes row per line")
+    parser.add_argument("--output", help="write flagged pairs here (JSON lines) instead of stdout")
+    parser.add_argument("--threshold", type=float, default=SIMILARITY_THRESHOLD)
+    parser.add_argument("--id-field", default="id")
+    parser.add_argument("--source-field", default="text_content")
+    parser.add_argument("--generated-field", default="profile_content")
+    parser.add_argument("--bands", type=int, default=BANDS)
+    parser.add_argument("--rows", type=int, default=ROWS)
+    args = parser.parse_args(argv)
+
+    documents = load_corpus(args.corpus, args.id_field, args.source_field, args.generated_field)
+    flagged = find_similar(documents, args.threshold, args.bands, args.rows)
+    lines = (json.dumps(pair, ensure_ascii=False) for pair in flagged)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            for line in lines:
+                f.write(line + "\n")
+        print(f"Flagged {len(flagged)} pairs -> {args.output}")
+    else:
+        for line in lines:
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""
+Spatial index over scraped dentists.
+
+Points are sorted by geohash cell and stored as flat ``array('d')`` columns with
+a cell -> (start, count) table, so a query only scans the cells overlapping its
+search box and then filters candidates with a batched haversine pass. Supports
+bounding-box, radius and k-nearest-neighbour lookups and persists to a single
+binary file:
+
+    [MAGIC][header length: u32 LE][header JSON][lat f64...][lon f64...][ids]
+
+Usage (from the repository root):
+    python3 -m scraper.spatial build
+    python3 -m scraper.spatial radius 40.7580 -73.9855 2
+    python3 -m scraper.spatial knn 35.6938 139.7034 10
+"""
+
+import argparse
+import json
+import math
+import os
+import struct
+import sys
+from array import array
+
+from . import geohash
+from .dedup import place_key
+from .ingest import DEFAULT_RESULTS, DEFAULT_STORE, scan_results
+
+DEFAULT_INDEX = "scraper/spatial.idx"
+DEFAULT_PRECISION = 5
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG_LAT = math.pi * EARTH_RADIUS_KM / 180
+MAGIC = b"DNSI"
+_HEADER_LEN = struct.Struct("<I")
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points in kilometres."""
+    return haversine_km_many(lat1, lon1, [lat2], [lon2])[0]
+
+
+def haversine_km_many(lat, lon, lats, lons):
+    """Distances from one point to many, as a list (one pass, locals bound)."""
+    radians, sin, cos, asin, sqrt = math.radians, math.sin, math.cos, math.asin, math.sqrt
+    phi1 = radians(lat)
+    cos_phi1 = cos(phi1)
+    lam1 = radians(lon)
+    diameter = 2 * EARTH_RADIUS_KM
+    out = []
+    append = out.append
+    for lat2, lon2 in zip(lats, lons):
+        phi2 = radians(lat2)
+        a = sin((phi2 - phi1) / 2) ** 2 + cos_phi1 * cos(phi2) * sin((radians(lon2) - lam1) / 2) ** 2
+        append(diameter * asin(sqrt(min(1.0, a))))
+    return out
+
+
+def _cell_size(precision):
+    """(height, width) in degrees of a geohash cell at ``precision``."""
+    bits = 5 * precision
+    lon_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def _lon_ranges(min_lon, max_lon):
+    """Split a longitude range crossing the antimeridian into plain ranges."""
+    if max_lon - min_lon >= 360:
+        return [(-180.0, 180.0)]
+    min_lon = (min_lon + 180) % 360 - 180
+    max_lon = (max_lon + 180) % 360 - 180
+    if min_lon <= max_lon:
+        return [(min_lon, max_lon)]
+    return [(min_lon, 180.0), (-180.0, max_lon)]
+
+
+class SpatialIndex:
+    """Geohash-bucketed point index with bbox, radius and kNN queries."""
+
+    def __init__(self, precision=DEFAULT_PRECISION):
+        self.precision = precision
+        self.lats = array("d")
+        self.lons = array("d")
+        self.ids = []
+        self.cells = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, points, precision=DEFAULT_PRECISION):
+        """Build from an iterable of (id, lat, lon)."""
+        index = cls(precision)
+        keyed = sorted(
+            (geohash.encode(lat, lon, precision), pid, lat, lon)
+            for pid, lat, lon in points
+        )
+        for position, (cell, pid, lat, lon) in enumerate(keyed):
+            index.lats.append(lat)
+            index.lons.append(lon)
+            index.ids.append(pid)
+            start, count = index.cells.get(cell, (position, 0))
+            index.cells[cell] = (start, count + 1)
+        return index
+
+    # -- persistence -------------------------------------------------------
+
+    def save(self, path):
+        header = json.dumps({
+            "precision": self.precision,
+            "count": len(self.ids),
+            "byteorder": sys.byteorder,
+            "cells": [[cell, start, count] for cell, (start, count) in sorted(self.cells.items())],
+        }, separators=(",", ":")).encode("utf-8")
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(MAGIC)
+            f.write(_HEADER_LEN.pack(len(header)))
+            f.write(header)
+            self.lats.tofile(f)
+            self.lons.tofile(f)
+            f.write("\n".join(self.ids).encode("utf-8"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a spatial index")
+            (length,) = _HEADER_LEN.unpack(f.read(_HEADER_LEN.size))
+            header = json.loads(f.read(length))
+            index = cls(header["precision"])
+            count = header["count"]
+            index.lats.fromfile(f, count)
+            index.lons.fromfile(f, count)
+            if header["byteorder"] != sys.byteorder:
+                index.lats.byteswap()
+                index.lons.byteswap()
+            ids = f.read().decode("utf-8")
+        index.ids = ids.split("\n") if count else []
+        index.cells = {cell: (start, n) for cell, start, n in header["cells"]}
+        return index
+
+    # -- queries -----------------------------------------------------------
+
+    def _candidate_ranges(self, min_lat, min_lon, max_lat, max_lon):
+        """(start, count) slices of cells that may hold points in the box."""
+        min_lat = max(min_lat, -90.0)
+        max_lat = min(max_lat, 90.0)
+        height, width = _cell_size(self.precision)
+        ranges = []
+        for lo, hi in _lon_ranges(min_lon, max_lon):
+            rows = int((max_lat - min_lat) / height) + 2
+            cols = int((hi - lo) / width) + 2
+            if rows * cols > len(self.cells):
+                # Box covers more cells than are populated: test each one
+                for cell, span in self.cells.items():
+                    c_lat_lo, c_lon_lo, c_lat_hi, c_lon_hi = geohash.bbox(cell)
+                    if c_lat_hi >= min_lat and c_lat_lo <= max_lat and c_lon_hi >= lo and c_lon_lo <= hi:
+                        ranges.append(span)
+                continue
+            seen = set()
+            for i in range(rows):
+                lat = min(min_lat + i * height, max_lat)
+                for j in range(cols):
+                    lon = min(lo + j * width, hi)
+                    cell = geohash.encode(lat, min(lon, 179.9999999), self.precision)
+                    if cell not in seen:
+                        seen.add(cell)
+                        span = self.cells.get(cell)
+                        if span:
+                            ranges.append(span)
+        return list(dict.fromkeys(ranges))
+
+    def bbox(self, min_lat, min_lon, max_lat, max_lon):
+        """Ids of points inside the box (longitudes may wrap the antimeridian)."""
+        lon_ranges = _lon_ranges(min_lon, max_lon)
+        found = []
+        lats, lons, ids = self.lats, self.lons, self.ids
+        for start, count in self._candidate_ranges(min_lat, min_lon, max_lat, max_lon):
+            for i in range(start, start + count):
+                if min_lat <= lats[i] <= max_lat and any(lo <= lons[i] <= hi for lo, hi in lon_ranges):
+                    found.append(ids[i])
+        return found
+
+    def _within(self, lat, lon, radius_km):
+        """[(distance, position)] for points within ``radius_km``."""
+        dlat = radius_km / KM_PER_DEG_LAT
+        cos_lat = math.cos(math.radians(lat))
+        if abs(lat) + dlat >= 90 or cos_lat < 1e-6:
+            dlon = 360.0
+        else:
+            dlon = min(360.0, radius_km / (KM_PER_DEG_LAT * cos_lat))
+        positions = []
+        for start, count in self._candidate_ranges(lat - dlat, lon - dlon, lat + dlat, lon + dlon):
+            positions.extend(range(start, start + count))
+        distances = haversine_km_many(lat, lon, (self.lats[i] for i in positions),
+                                      (self.lons[i] for i in positions))
+        return [(d, i) for d, i in zip(distances, positions) if d <= radius_km]
+
+    def radius(self, lat, lon, radius_km):
+        """[(id, distance_km)] within ``radius_km``, nearest first."""
+        return [(self.ids[i], d) for d, i in sorted(self._within(lat, lon, radius_km))]
+
+    def knn(self, lat, lon, k, max_km=EARTH_RADIUS_KM * math.pi):
+        """The ``k`` nearest [(id, distance_km)], nearest first."""
+        if not self.ids or k <= 0:
+            return []
+        height, _ = _cell_size(self.precision)
+        radius_km = height * KM_PER_DEG_LAT
+        while True:
+            hits = self._within(lat, lon, radius_km)
+            # Every point closer than radius_km is in hits, so once there are
+            # k of them the k nearest overall are among them
+            if len(hits) >= k or radius_km >= max_km:
+                return [(self.ids[i], d) for d, i in sorted(hits)[:k]]
+            radius_km = min(radius_km * 2, max_km)
+
+
+def load_points(store_dir=DEFAULT_STORE, results_file=DEFAULT_RESULTS):
+    """Yield (place key, lat, lon) for each distinct place with coordinates."""
+    seen = set()
+    columns = ["place_id", "cid", "data_id", "latitude", "longitude"]
+    for row in scan_results(columns, store_dir, results_file):
+        key = place_key(row)
+        if key is None or key in seen:
+            continue
+        try:
+            lat = float(row["latitude"])
+            lon = float(row["longitude"])
+        except (TypeError, ValueError):
+            continue
+        seen.add(key)
+        yield key, lat, lon
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query the dentist spatial index")
+    parser.add_argument("--index", default=DEFAULT_INDEX)
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="index accumulated results")
+    build.add_argument("--store", default=DEFAULT_STORE)
+    build.add_argument("--results", default=DEFAULT_RESULTS)
+    build.add_argument("--precision", type=int, default=DEFAULT_PRECISION)
+    radius = sub.add_parser("radius", help="places within KM of a point")
+    radius.add_argument("lat", type=float)
+    radius.add_argument("lon", type=float)
+    radius.add_argument("km", type=float)
+    knn = sub.add_parser("knn", help="K nearest places to a point")
+    knn.add_argument("lat", type=float)
+    knn.add_argument("lon", type=float)
+    knn.add_argument("k", type=int)
+    box = sub.add_parser("bbox", help="places inside a bounding box")
+    for name in ("min_lat", "min_lon", "max_lat", "max_lon"):
+        box.add_argument(name, type=float)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        index = SpatialIndex.build(load_points(args.store, args.results), args.precision)
+        index.save(args.index)
+        print(f"Indexed {len(index)} places in {len(index.cells)} cells -> {args.index}")
+        return
+
+    index = SpatialIndex.load(args.index)
+    if args.command == "radius":
+        hits = index.radius(args.lat, args.lon, args.km)
+    elif args.command == "knn":
+        hits = index.knn(args.lat, args.lon, args.k)
+    else:
+        hits = [(pid, None) for pid in index.bbox(args.min_lat, args.min_lon, args.max_lat, args.max_lon)]
+    for pid, distance in hits:
+        print(pid if distance is None else f"{distance:9.3f} km  {pid}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""
+Tests for the scraper package (stdlib unittest; pytest also collects them).
+
+Run from the repository root:
+    python3 -m unittest discover -s scraper/tests -t .
+"""
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from scraper.cache import OBJECTS_DIR, ContentCache, content_hash, normalize_url
+
+
+class NormalizeUrlTest(unittest.TestCase):
+    def test_canonical_form(self):
+        cases = {
+            "HTTP://www.Example.com:80/?utm_source=gmb": "http://example.com",
+            "example.com/": "https://example.com",
+            "  https://WWW.example.com./about/#team ": "https://example.com/about",
+            "https://example.com:443/x?gclid=abc&b=2&a=1": "https://example.com/x?a=1&b=2",
+            "https://example.com:8443/x?UTM_Medium=maps&fbclid=1": "https://example.com:8443/x",
+            "https://example.com/?q=": "https://example.com?q=",
+        }
+        for url, expected in cases.items():
+            with self.subTest(url=url):
+                self.assertEqual(normalize_url(url), expected)
+
+    def test_listings_of_one_chain_share_a_key(self):
+        urls = ["https://www.dental365.com/?utm_source=gmb&utm_campaign=loc1",
+                "dental365.com/?utm_source=gmb&utm_campaign=loc2",
+                "https://dental365.com?gclid=xyz"]
+        self.assertEqual({normalize_url(u) for u in urls}, {"https://dental365.com"})
+
+    def test_malformed_urls_raise_value_error(self):
+        for url in ("https://example.com:99999/", "http://[::1", "https://example.com:port/"):
+            with self.subTest(url=url):
+                with self.assertRaises(ValueError):
+                    normalize_url(url)
+
+
+class ContentCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.cache = ContentCache(self._tmp.name, ttl=60)
+
+    def tearDown(self):
+        self.cache.close()
+        self._tmp.cleanup()
+
+    def objects(self):
+        return sorted(name for _, _, files in os.walk(os.path.join(self._tmp.name, OBJECTS_DIR))
+                      for name in files)
+
+    def test_round_trip(self):
+        self.assertIsNone(self.cache.get("firecrawl", "https://a.com"))
+        digest = self.cache.put("firecrawl", "https://a.com", "# Praxis Müller\n")
+        self.assertEqual(digest, content_hash("# Praxis Müller\n"))
+        self.assertEqual(self.cache.get("firecrawl", "https://a.com"), "# Praxis Müller\n")
+        # Keys are per namespace
+        self.assertIsNone(self.cache.get("other", "https://a.com"))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 2))
+
+        self.cache.put("firecrawl", "https://a.com", "updated")
+        self.assertEqual(self.cache.get("firecrawl", "https://a.com"), "updated")
+
+    def test_identical_bodies_are_stored_once(self):
+        for n in range(3):
+            self.cache.put("firecrawl", f"https://chain.com/loc{n}", "same page")
+        self.cache.put("firecrawl", "https://other.com", "other page")
+        self.assertEqual(len(self.objects()), 2)
+        stats = self.cache.stats()
+        self.assertEqual((stats["entries"], stats["objects"], stats["keys_per_object"]), (4, 2, 2.0))
+        self.assertEqual(stats["bytes"], len("same page") + len("other page"))
+
+        # The shared object stays until its last key is gone
+        self.cache.put("firecrawl", "https://chain.com/loc0", "changed")
+        self.assertEqual(self.cache.evict(), 0)
+        self.assertEqual(self.cache.get("firecrawl", "https://chain.com/loc1"), "same page")
+
+    def test_expired_entries_are_missing(self):
+        self.cache.put("firecrawl", "https://a.com", "page")
+        later = time.time() + 3600
+        with mock.patch("scraper.cache.time.time", return_value=later):
+            self.assertIsNone(self.cache.get("firecrawl", "https://a.com"))
+            self.assertEqual(self.cache.evict(), len("page"))
+        self.assertEqual(self.objects(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import unittest
+
+from scraper.catalog import Catalog, load_catalog
+from scraper.ledger import query_id, read_queries
+
+SCRAPER_DIR = os.path.join(os.path.dirname(__file__), "..")
+CATALOG = os.path.join(SCRAPER_DIR, "catalog.json")
+CITIES = os.path.join(SCRAPER_DIR, "cities.txt")
+
+
+class CatalogFileTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = load_catalog(CATALOG)
+
+    def test_reproduces_cities_txt(self):
+        with open(CITIES, "r", encoding="utf-8") as f:
+            self.assertEqual(self.catalog.cities_txt(), f.read())
+        queries = read_queries(CITIES)
+        self.assertEqual(len(queries), 1118)
+        self.assertEqual(self.catalog.texts(), queries)
+        self.assertEqual([q.position for q in self.catalog], list(range(1118)))
+
+    def test_filters(self):
+        tiers = {t: len(self.catalog.filter(tiers=[t])) for t in ("megacity", "large", "medium")}
+        self.assertEqual(tiers, {"megacity": 472, "large": 220, "medium": 426})
+
+        japan = self.catalog.filter(countries=["japan"])
+        self.assertEqual(len(japan), 34)
+        self.assertTrue(all(q.country == "Japan" for q in japan))
+        self.assertEqual(len(self.catalog.filter(tiers=["megacity"], countries=["Japan", "USA"])),
+                         sum(1 for q in self.catalog if q.tier == "megacity" and q.country in ("Japan", "USA")))
+        # Population filters by tier band: only the two neighbourhood tiers reach 5M
+        self.assertEqual(len(self.catalog.filter(min_population=5000000)), 472 + 220)
+        self.assertEqual(self.catalog.filter(tiers=["medium"], min_population=5000000), [])
+
+    def test_is_cached_per_file_version(self):
+        self.assertIs(load_catalog(CATALOG), self.catalog)
+
+
+class CatalogTest(unittest.TestCase):
+    def setUp(self):
+        self.catalog = Catalog({
+            "version": 1,
+            "query_format": "dentists {name}, {group}",
+            "tiers": [
+                {"name": "megacity", "title": "Megacities", "kind": "neighborhoods", "max_population": None,
+                 "groups": {"Lagos, Nigeria": ["Ikeja", "Lekki", "Ikeja"]}},
+                {"name": "medium", "title": "Medium", "kind": "cities", "max_population": 2000000,
+                 "groups": {"Nigeria": ["Kano"]}},
+            ],
+        })
+
+    def test_entries(self):
+        self.assertEqual(self.catalog.texts(), ["dentists Ikeja, Lagos, Nigeria",
+                                                "dentists Lekki, Lagos, Nigeria",
+                                                "dentists Kano, Nigeria"])
+        lekki = self.catalog.get("dentists Lekki, Lagos, Nigeria")
+        self.assertEqual((lekki.position, lekki.city_key, lekki.neighborhood), (1, "Lagos, Nigeria", "Lekki"))
+        kano = self.catalog.get(query_id("dentists Kano, Nigeria"))
+        self.assertEqual((kano.position, kano.city_key, kano.neighborhood), (2, "Kano, Nigeria", None))
+        self.assertIsNone(self.catalog.get("dentists Abuja, Nigeria"))
+        self.assertIsNone(self.catalog.position(""))
+
+    def test_cities_txt_layout(self):
+        self.assertEqual(self.catalog.cities_txt().split("\n"), [
+            "# Megacities", "", "# Lagos, Nigeria",
+            "dentists Ikeja, Lagos, Nigeria", "dentists Lekki, Lagos, Nigeria", "",
+            "# Medium", "", "# Nigeria", "dentists Kano, Nigeria", "",
+        ])
+
+    def test_rejects_unknown_version(self):
+        with self.assertRaises(ValueError):
+            Catalog({"version": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import os
+import tempfile
+import unittest
+
+from scraper.colstore import ColumnStore
+from scraper.export import Export
+from scraper.gosom_csv import COLUMNS
+from scraper.ingest import rebuild_store
+
+
+class ColumnStoreTest(unittest.TestCase):
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as root:
+            store = ColumnStore(root, ["title", "review_count", "latitude"])
+            rows = [{"title": "Zahnarzt Müller\nPraxis", "review_count": "12", "latitude": "52.5"},
+                    {"title": "", "review_count": "", "latitude": ""}]
+            self.assertEqual(store.append(rows), 2)
+            self.assertEqual(list(ColumnStore(root).scan()), [
+                {"title": "Zahnarzt Müller\nPraxis", "review_count": 12, "latitude": 52.5},
+                {"title": "", "review_count": None, "latitude": None},
+            ])
+
+    def test_unparseable_numbers_are_stored_as_missing(self):
+        with tempfile.TemporaryDirectory() as root:
+            store = ColumnStore(root, ["review_count", "review_rating"])
+            values = ["1,234", "n/a", "nan", "inf", "99999999999999999999999", "4.5"]
+            store.append({"review_count": v, "review_rating": v} for v in values)
+            self.assertEqual(list(store.column("review_count")), [None] * 5 + [4])
+            self.assertEqual(list(store.column("review_rating"))[:3], [None, None, None])
+
+
+class RebuildStoreTest(unittest.TestCase):
+    def test_store_is_rebuilt_from_the_export(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root, store_dir = os.path.join(tmp, "export"), os.path.join(tmp, "store")
+            export = Export(root)
+            for title in ("old", "new"):
+                export.append(dict({c: "" for c in COLUMNS}, place_id=f"p{n}", title=title,
+                                   review_count=str(n), city="Kano") for n in range(3))
+            export.compact()
+            self.assertEqual(rebuild_store(store_dir, root), 3)
+            self.assertEqual(list(ColumnStore(store_dir).scan(["place_id", "title", "review_count"])),
+                             [{"place_id": f"p{n}", "title": "new", "review_count": n} for n in range(3)])
+            self.assertEqual(rebuild_store(os.path.join(tmp, "empty"), os.path.join(tmp, "none")), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+
+from scraper.dedup import CHANGED, NEW, UNCHANGED, DedupIndex, read_hits, rebuild_index
+from scraper.export import Export
+from scraper.gosom_csv import COLUMNS
+from scraper.normalize import OUTPUT_COLUMNS
+
+
+def place(n, title):
+    row = {c: "" for c in COLUMNS}
+    row.update(input_id=f"q{n % 3}", place_id=f"p{n}", title=title, review_count=str(n))
+    return row
+
+
+class RebuildTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self._tmp.name, "export")
+        self.index = os.path.join(self._tmp.name, "seen.sqlite")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def run_batch(self, index, rows):
+        kept = list(index.filter(rows))
+        # The export holds kept rows after city resolution
+        Export(self.root).append(dict(r, **{c: "x" for c in OUTPUT_COLUMNS}) for r in kept)
+        return kept
+
+    def test_rebuilt_index_classifies_like_the_original(self):
+        with DedupIndex(self.index) as index:
+            self.run_batch(index, [place(n, "old") for n in range(20)])
+            self.run_batch(index, [place(n, "new") for n in range(10, 30)])
+        os.remove(self.index)
+
+        self.assertEqual(rebuild_index(self.index, self.root), 30)
+        with DedupIndex(self.index) as index:
+            # Another query finding the same place doesn't make it new
+            self.assertEqual(index.classify(dict(place(5, "old"), input_id="other")), UNCHANGED)
+            self.assertEqual(index.classify(place(15, "new")), UNCHANGED)
+            self.assertEqual(index.classify(place(25, "changed")), CHANGED)
+            self.assertEqual(index.classify(place(40, "new")), NEW)
+
+    def test_hits_survive_a_rebuild(self):
+        hits = os.path.join(self._tmp.name, "place_hits.csv")
+        with DedupIndex(self.index) as index:
+            self.run_batch(index, [place(n, "old") for n in range(5)])
+            # Unchanged re-finds are dropped before the export but still counted
+            for _ in range(3):
+                self.run_batch(index, [place(n, "old") for n in range(2)])
+            index.write_hits(hits)
+        self.assertEqual(read_hits(hits), {"place_id:p0": 4, "place_id:p1": 4, "place_id:p2": 1,
+                                           "place_id:p3": 1, "place_id:p4": 1})
+        os.remove(self.index)
+
+        rebuild_index(self.index, self.root, hits)
+        with DedupIndex(self.index) as index:
+            self.assertEqual(index.classify(place(0, "old")), UNCHANGED)
+            index.write_hits(hits)
+        self.assertEqual(read_hits(hits)["place_id:p0"], 5)
+
+    def test_missing_export_gives_empty_index(self):
+        self.assertEqual(rebuild_index(self.index, self.root), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from scraper.bench.firecrawl import MockFirecrawl, markdown_for
+from scraper.cache import ContentCache
+from scraper.enrich import FAILED, SCRAPED, Enricher
+
+
+class EnricherTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self._tmp.name, "enriched.jsonl")
+        self.server = MockFirecrawl(("127.0.0.1", 0), latency=0.05)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.cache = ContentCache(os.path.join(self._tmp.name, "cache"))
+        self.enricher = Enricher("test", f"http://127.0.0.1:{self.server.server_port}",
+                                 concurrency=2, api_rate=0, host_rate=0, retries=0,
+                                 cache=self.cache, log=lambda _: None)
+
+    def tearDown(self):
+        self.cache.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self._tmp.cleanup()
+
+    def run_leads(self, leads):
+        counts = asyncio.run(asyncio.wait_for(self.enricher.run(leads, self.output), timeout=10))
+        with open(self.output, encoding="utf-8") as f:
+            return counts, {entry["id"]: entry for entry in map(json.loads, f)}
+
+    def test_invalid_urls_fail_without_stalling_the_run(self):
+        leads = [{"id": 1, "website": "a.com"}, {"id": 2, "website": "b.com:99999"},
+                 {"id": 3, "website": "http://[::1"}, {"id": 4, "website": "c.com/"},
+                 {"id": 5, "website": "https://www.c.com"}]
+        counts, entries = self.run_leads(leads)
+        self.assertEqual(counts, {SCRAPED: 3, FAILED: 2})
+        self.assertEqual(entries[1]["text_content"], markdown_for("https://a.com"))
+        for lead in (2, 3):
+            self.assertEqual(entries[lead]["status"], FAILED)
+            self.assertTrue(entries[lead]["processing_error"].startswith("Invalid URL"))
+            self.assertEqual(entries[lead]["requests"], 0)
+        # Leads 4 and 5 share one normalised URL, so the second waits for the
+        # first's request or finds it cached
+        self.assertEqual(self.server.stats["requests"], 2)
+
+    def test_waiter_on_cancelled_request_records_a_failure(self):
+        async def wait_on_cancelled():
+            future = asyncio.get_running_loop().create_future()
+            self.enricher._inflight["https://a.com"] = future
+            waiter = asyncio.create_task(self.enricher._fetch(None, None, "https://a.com", "https://a.com"))
+            await asyncio.sleep(0)
+            future.cancel()
+            return await waiter
+
+        markdown, error, requests, shared = asyncio.run(wait_on_cancelled())
+        self.assertEqual((markdown, requests, shared), (None, 0, True))
+        self.assertIn("cancelled", error)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+import os
+import tempfile
+import unittest
+
+from scraper.export import Export, ExportError
+
+
+def batch(run, places):
+    return [{"place_id": f"p{p}", "title": f"run {run}"} for p in places]
+
+
+class ExportTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self._tmp.name, "export")
+        self.export = Export(self.root)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def append_runs(self, runs, places=range(50), every=None):
+        for run in runs:
+            self.export.append(batch(run, places))
+            if every:
+                self.export.maybe_compact(every=every, keep_snapshots=2)
+
+    def files(self, cursor):
+        return [f["file"] for f in self.export.changes(cursor)["files"]]
+
+    def replay(self, cursor=0, state=None):
+        """Apply rows_since(cursor) to ``state`` the way a consumer would."""
+        state = {} if state is None else state
+        plan, rows = Export(self.root).rows_since(cursor)
+        if plan["reset"]:
+            state.clear()
+        for row in rows:
+            state[row["place_id"]] = row["title"]
+        return plan["cursor"], state
+
+    def test_append_records_ranges_and_skips_empty_batches(self):
+        self.export.append(batch(1, range(3)))
+        self.assertIsNone(self.export.append([]))
+        self.export.append(batch(2, range(5)))
+        deltas = Export(self.root).manifest["deltas"]
+        self.assertEqual([d["seq"] for d in deltas], [1, 2])
+        self.assertEqual([d["row_range"] for d in deltas], [[0, 3], [3, 8]])
+        self.assertEqual(len(deltas[0]["sha256"]), 64)
+
+    def test_identical_rows_give_identical_files(self):
+        self.export.append(batch(1, range(10)))
+        other = Export(os.path.join(self._tmp.name, "other"))
+        other.append(batch(1, range(10)))
+        self.assertEqual(self.export.manifest["deltas"][0]["sha256"],
+                         other.manifest["deltas"][0]["sha256"])
+
+    def test_changes_without_snapshots(self):
+        self.append_runs(range(1, 4))
+        self.assertEqual(self.files(0), ["delta-000001.csv.gz", "delta-000002.csv.gz",
+                                         "delta-000003.csv.gz"])
+        self.assertEqual(self.files(2), ["delta-000003.csv.gz"])
+        plan = self.export.changes(3)
+        self.assertEqual((plan["cursor"], plan["reset"], plan["files"]), (3, False, []))
+
+    def test_cursor_outside_export_is_rejected(self):
+        self.append_runs(range(1, 3))
+        with self.assertRaises(ExportError):
+            self.export.changes(3)
+        with self.assertRaises(ExportError):
+            self.export.changes(-1)
+
+    def test_compact_keeps_latest_row_per_place(self):
+        self.export.append(batch(1, range(10)))
+        self.export.append(batch(2, range(5, 15)))
+        self.export.append([{"place_id": "", "title": "no id"}] * 2)
+        snapshot = self.export.compact()
+        self.assertEqual(snapshot["seq"], 3)
+        # 15 places plus both rows without an id
+        self.assertEqual(snapshot["rows"], 17)
+        self.assertIsNone(self.export.compact())
+
+    def test_snapshot_replaces_longer_delta_chain(self):
+        # Every run rewrites the same places, so the snapshot is far smaller
+        self.append_runs(range(1, 11), every=5)
+        plan = self.export.changes(0)
+        self.assertTrue(plan["reset"])
+        self.assertEqual([f["file"] for f in plan["files"]], ["snapshot-000010.csv.gz"])
+
+    def test_short_delta_chain_preferred_over_snapshot(self):
+        self.append_runs(range(1, 5), places=range(200))
+        self.export.compact()
+        self.append_runs(range(5, 7), places=range(3))
+        # Cursor 3 needs deltas 4-6; the snapshot of 200 places is larger
+        plan = self.export.changes(3)
+        self.assertFalse(plan["reset"])
+        self.assertEqual([f["seq"] for f in plan["files"]], [4, 5, 6])
+
+    def test_prune_boundaries(self):
+        # New places every run, so deltas stay cheaper than snapshots
+        for run in range(1, 17):
+            self.export.append(batch(run, range(run * 200, run * 200 + 200)))
+            self.export.maybe_compact(every=5, keep_snapshots=2)
+        manifest = self.export.manifest
+        self.assertEqual([s["seq"] for s in manifest["snapshots"]], [10, 15])
+        self.assertEqual(manifest["deltas"][0]["seq"], 11)
+        self.assertFalse(os.path.exists(os.path.join(self.root, "snapshot-000005.csv.gz")))
+        self.assertFalse(os.path.exists(os.path.join(self.root, "delta-000010.csv.gz")))
+
+        # Cursor at the oldest kept snapshot: its deltas are all still there
+        plan = self.export.changes(10)
+        self.assertFalse(plan["reset"])
+        self.assertEqual([f["seq"] for f in plan["files"]], list(range(11, 17)))
+        # Cursor behind it: deltas 10 and earlier are gone, so reset from the
+        # latest snapshot plus the deltas after it
+        plan = self.export.changes(9)
+        self.assertTrue(plan["reset"])
+        self.assertEqual([f["file"] for f in plan["files"]],
+                         ["snapshot-000015.csv.gz", "delta-000016.csv.gz"])
+
+    def test_replay_matches_state_across_reset(self):
+        truth = {}
+        for run in range(1, 24):
+            places = range(run % 4 * 10, run % 4 * 10 + 25)
+            self.export.append(batch(run, places))
+            self.export.maybe_compact(every=5, keep_snapshots=2)
+            truth.update({f"p{p}": f"run {run}" for p in places})
+            if run == 4:
+                cursor, state = self.replay()
+        cursor, state = self.replay(cursor, state)
+        self.assertEqual(cursor, 23)
+        self.assertEqual(state, truth)
+        _, fresh = self.replay()
+        self.assertEqual(fresh, truth)
+
+    def test_corrupt_file_fails_checksum(self):
+        self.append_runs(range(1, 3))
+        path = os.path.join(self.root, "delta-000002.csv.gz")
+        with open(path, "r+b") as f:
+            f.seek(-12, os.SEEK_END)
+            byte = f.read(1)
+            f.seek(-12, os.SEEK_END)
+            f.write(bytes([byte[0] ^ 0xFF]))
+        _, rows = self.export.rows_since(1)
+        with self.assertRaises(ExportError):
+            list(rows)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from scraper import geohash
+
+
+class GeohashTest(unittest.TestCase):
+    def test_encode_known_cell(self):
+        self.assertEqual(geohash.encode(57.64911, 10.40744, 11), "u4pruydqqvj")
+        self.assertEqual(geohash.encode(35.6895, 139.6917, 5), "xn774")
+
+    def test_bbox_and_center_round_trip(self):
+        for lat, lon in [(35.6895, 139.6917), (-33.8688, 151.2093), (40.7580, -73.9855), (0.0, 0.0)]:
+            cell = geohash.encode(lat, lon, 6)
+            min_lat, min_lon, max_lat, max_lon = geohash.bbox(cell)
+            self.assertTrue(min_lat <= lat <= max_lat and min_lon <= lon <= max_lon)
+            self.assertEqual(geohash.encode(*geohash.center(cell), 6), cell)
+
+    def test_children_tile_their_parent(self):
+        parent = geohash.bbox("xn77")
+        kids = geohash.children("xn77")
+        self.assertEqual(len(set(kids)), 32)
+        area = 0.0
+        for kid in kids:
+            min_lat, min_lon, max_lat, max_lon = geohash.bbox(kid)
+            self.assertTrue(parent[0] <= min_lat and max_lat <= parent[2])
+            self.assertTrue(parent[1] <= min_lon and max_lon <= parent[3])
+            area += (max_lat - min_lat) * (max_lon - min_lon)
+        self.assertAlmostEqual(area, (parent[2] - parent[0]) * (parent[3] - parent[1]))
+
+    def test_neighbors(self):
+        cell = geohash.encode(35.6895, 139.6917, 5)
+        around = geohash.neighbors(cell)
+        self.assertEqual(len(around), 8)
+        self.assertNotIn(cell, around)
+        # Wraps across the antimeridian and stops at the pole
+        east = geohash.encode(0.0, 179.99, 4)
+        self.assertIn(geohash.encode(0.0, -179.99, 4), geohash.neighbors(east))
+        self.assertEqual(len(geohash.neighbors(geohash.encode(89.99, 0.0, 3))), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import os
+import tempfile
+import unittest
+
+from scraper.ledger import DONE, FAILED, Ledger, query_id
+
+QUERIES = ["dentists Shinjuku, Tokyo, Japan", "dentists Shibuya, Tokyo, Japan",
+           "dentists Lagos, Nigeria"]
+
+
+class LedgerTextTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "ledger.sqlite")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_csv_restores_a_fresh_database(self):
+        with Ledger(self.path) as ledger:
+            ledger.sync(QUERIES)
+            ledger.record(query_id(QUERIES[0]), DONE, rows=60, duration=12.5, new=40, changed=2)
+            ledger.record(query_id(QUERIES[1]), FAILED, error="exit 1")
+            before = ledger.conn.execute("SELECT * FROM queries ORDER BY position").fetchall()
+        with open(os.path.join(self._tmp.name, "ledger.csv"), encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 1 + len(QUERIES))
+        self.assertTrue(lines[1].startswith(query_id(QUERIES[0])))
+
+        # Only the CSV is committed, so a new checkout starts without the database
+        os.remove(self.path)
+        with Ledger(self.path) as ledger:
+            after = ledger.conn.execute("SELECT * FROM queries ORDER BY position").fetchall()
+            self.assertEqual(ledger.select_batch(5), [(query_id(QUERIES[1]), QUERIES[1]),
+                                                      (query_id(QUERIES[2]), QUERIES[2])])
+        self.assertEqual(after, before)
+
+    def test_csv_wins_over_a_stale_database(self):
+        with Ledger(self.path) as ledger:
+            ledger.sync(QUERIES)
+        other = os.path.join(self._tmp.name, "other", "ledger.sqlite")
+        os.mkdir(os.path.dirname(other))
+        with Ledger(other) as ledger:
+            ledger.sync(QUERIES[:1])
+            ledger.record(query_id(QUERIES[0]), DONE, rows=1)
+        os.replace(os.path.join(self._tmp.name, "other", "ledger.csv"),
+                   os.path.join(self._tmp.name, "ledger.csv"))
+        with Ledger(self.path) as ledger:
+            self.assertEqual(ledger.counts(), {DONE: 1})
+
+
+class SyncTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.ledger = Ledger(os.path.join(self._tmp.name, "ledger.sqlite"))
+
+    def tearDown(self):
+        self.ledger.close()
+        self._tmp.cleanup()
+
+    def test_reordering_keeps_history_and_follows_new_order(self):
+        self.ledger.sync(QUERIES)
+        self.ledger.record(query_id(QUERIES[0]), DONE, rows=60)
+        self.ledger.record(query_id(QUERIES[1]), FAILED, error="timeout")
+
+        # Reordered, one dropped, one added; ids ignore case and spacing
+        new = "dentists Ikeja,  Lagos, Nigeria"
+        self.ledger.sync([QUERIES[2], new, QUERIES[0].upper()])
+        self.assertEqual(self.ledger.select_batch(5), [(query_id(QUERIES[2]), QUERIES[2]),
+                                                       (query_id(new), new)])
+        self.assertEqual(self.ledger.counts(), {"pending": 2, DONE: 1})
+        status, rows, query = self.ledger.conn.execute(
+            "SELECT status, rows, query FROM queries WHERE query_id = ?", (query_id(QUERIES[0]),)).fetchone()
+        self.assertEqual((status, rows, query), (DONE, 60, QUERIES[0].upper()))
+
+        # A dropped query comes back with its failed attempt
+        self.ledger.sync(QUERIES)
+        self.assertEqual(self.ledger.select_batch(1), [(query_id(QUERIES[1]), QUERIES[1])])
+        self.assertEqual(self.ledger.conn.execute(
+            "SELECT attempts FROM queries WHERE query_id = ?", (query_id(QUERIES[1]),)).fetchone(), (1,))
+
+
+class PlannedQueriesTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.ledger = Ledger(os.path.join(self._tmp.name, "ledger.sqlite"))
+        self.ledger.sync(QUERIES)
+
+    def tearDown(self):
+        self.ledger.close()
+        self._tmp.cleanup()
+
+    def ids(self, size=10):
+        return [qid for qid, _ in self.ledger.select_batch(size)]
+
+    def test_planned_queries_run_after_the_catalog(self):
+        planned = ["dentists near 35.68950,139.69170", "dentists near 6.52440,3.37920"]
+        self.ledger.sync_planned(planned)
+        self.assertEqual(self.ids(), [query_id(q) for q in QUERIES + planned])
+        for qid in self.ids(3):
+            self.ledger.record(qid, DONE)
+        self.assertEqual(self.ids(1), [query_id(planned[0])])
+
+    def test_catalog_sync_keeps_planned_queries(self):
+        self.ledger.sync_planned(["dentists near 35.68950,139.69170"])
+        self.ledger.sync(QUERIES[:1])
+        self.assertEqual(self.ids(), [query_id(QUERIES[0]), query_id("dentists near 35.68950,139.69170")])
+        self.ledger.sync_planned([])
+        self.assertEqual(self.ids(), [query_id(QUERIES[0])])
+
+    def test_catalog_query_is_never_planned(self):
+        self.ledger.sync_planned([QUERIES[2], "dentists near 6.52440,3.37920"])
+        self.assertEqual(self.ids(), [query_id(q) for q in QUERIES] + [query_id("dentists near 6.52440,3.37920")])
+        self.ledger.sync_planned([])
+        self.assertIn(query_id(QUERIES[2]), self.ids())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from scraper.metrics import METRICS_ENV, RUN_ID_ENV, group_runs, read_metrics, stage
+
+
+class StageTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "metrics.jsonl")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_success_appends_one_record(self):
+        with stage("dedup", self.path, run="run-1") as s:
+            s.add(rows_in=10, new=3)
+            s.add(rows_in=5, duplicate=None)
+            s.set(concurrency=4)
+        with stage("export", self.path, run="run-1"):
+            pass
+
+        first, second = read_metrics(self.path)
+        self.assertEqual({k: first[k] for k in ("run_id", "stage", "status", "rows_in", "new", "duplicate",
+                                                "concurrency")},
+                         {"run_id": "run-1", "stage": "dedup", "status": "ok", "rows_in": 15, "new": 3,
+                          "duplicate": 0, "concurrency": 4})
+        self.assertNotIn("error", first)
+        for key in ("started", "wall_seconds", "cpu_seconds", "peak_rss_kb"):
+            self.assertIn(key, first)
+        self.assertGreater(first["peak_rss_kb"], 0)
+        self.assertEqual(second["stage"], "export")
+        self.assertEqual([run for run, _ in group_runs([first, second])], ["run-1"])
+
+    def test_exception_is_recorded_and_reraised(self):
+        with self.assertRaises(ValueError):
+            with stage("upload", self.path, run="run-1") as s:
+                s.add(rows_in=2)
+                raise ValueError("webhook returned 500")
+        record, = read_metrics(self.path)
+        self.assertEqual((record["status"], record["error"], record["rows_in"]),
+                         ("error", "ValueError: webhook returned 500", 2))
+
+    def test_exit_zero_is_not_a_failure(self):
+        with self.assertRaises(SystemExit):
+            with stage("select", self.path, run="run-1"):
+                raise SystemExit(0)
+        with self.assertRaises(SystemExit):
+            with stage("select", self.path, run="run-1"):
+                raise SystemExit(2)
+        self.assertEqual([r["status"] for r in read_metrics(self.path)], ["ok", "error"])
+
+    def test_path_and_run_come_from_the_environment(self):
+        with mock.patch.dict(os.environ, {METRICS_ENV: self.path, RUN_ID_ENV: "gh-42"}):
+            with stage("scrape") as s:
+                s.add(rows_out=1)
+        self.assertEqual(s.record["run_id"], "gh-42")
+        self.assertEqual(read_metrics(self.path), [s.record])
+
+        # Outside the workflow nothing is written, but the record is still kept
+        os.remove(self.path)
+        with mock.patch.dict(os.environ, {METRICS_ENV: ""}):
+            with stage("scrape") as s:
+                pass
+        self.assertEqual(s.record["status"], "ok")
+        self.assertFalse(os.path.exists(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import json
+import os
+import tempfile
+import unittest
+
+from scraper.catalog import Catalog
+from scraper.gosom_csv import append_rows, read_header, read_rows
+from scraper.ledger import query_id
+from scraper.normalize import (ADDRESS, COORDINATES, OUTPUT_COLUMNS, QUERY, Normalizer, build_boxes,
+                               load_boxes, normalize_file)
+
+CATALOG = Catalog({
+    "version": 1,
+    "query_format": "dentists {name}, {group}",
+    "tiers": [
+        {"name": "megacity", "title": "Megacities", "kind": "neighborhoods", "max_population": None,
+         "groups": {"Tokyo, Japan": ["Shinjuku", "Shibuya"]}},
+        {"name": "medium", "title": "Medium", "kind": "cities", "max_population": 2000000,
+         "groups": {"Japan": ["Kawasaki"]}},
+    ],
+})
+SHINJUKU = query_id("dentists Shinjuku, Tokyo, Japan")
+KAWASAKI = query_id("dentists Kawasaki, Japan")
+
+# [min_lat, min_lon, max_lat, max_lon, points]; Kawasaki overlaps Tokyo's south-west corner
+BOXES = {
+    "version": 1,
+    "cities": {"Tokyo, Japan": [35.5, 139.5, 35.9, 139.9, 40], "Kawasaki, Japan": [35.45, 139.45, 35.6, 139.75, 12]},
+    "neighborhoods": {"Shinjuku, Tokyo, Japan": [35.68, 139.68, 35.72, 139.72, 20],
+                      "Shibuya, Tokyo, Japan": [35.64, 139.68, 35.67, 139.72, 15]},
+}
+
+
+def row(lat, lon, input_id="", address=""):
+    return {"input_id": input_id, "latitude": str(lat), "longitude": str(lon), "complete_address": address}
+
+
+class NormalizerTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.boxes_path = os.path.join(self._tmp.name, "city_boxes.json")
+        with open(self.boxes_path, "w", encoding="utf-8") as f:
+            json.dump(BOXES, f)
+        self.normalizer = Normalizer(CATALOG, load_boxes(self.boxes_path))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def resolve(self, r):
+        resolved = self.normalizer.resolve(r)
+        return resolved["city_key"], resolved["neighborhood"], resolved["city_source"]
+
+    def test_query_city_wins_inside_its_box(self):
+        self.assertEqual(self.resolve(row(35.70, 139.70, SHINJUKU)), ("Tokyo, Japan", "Shinjuku", QUERY))
+        # Inside the city but in another neighbourhood's box
+        self.assertEqual(self.resolve(row(35.65, 139.70, SHINJUKU)), ("Tokyo, Japan", "Shibuya", QUERY))
+        # No coordinates: trust the query
+        self.assertEqual(self.resolve(row("", "", KAWASAKI)), ("Kawasaki, Japan", None, QUERY))
+
+    def test_overlapping_boxes_pick_the_smallest(self):
+        self.assertEqual(self.resolve(row(35.55, 139.6)), ("Kawasaki, Japan", None, COORDINATES))
+        self.assertEqual(self.resolve(row(35.8, 139.8)), ("Tokyo, Japan", None, COORDINATES))
+        self.assertEqual(self.resolve(row(35.70, 139.70)), ("Tokyo, Japan", "Shinjuku", COORDINATES))
+        # Inside its own query's city too, so the query wins over the smaller box
+        self.assertEqual(self.resolve(row(35.55, 139.6, SHINJUKU)), ("Tokyo, Japan", None, QUERY))
+        # A catalog row found outside its own city resolves by coordinates
+        self.assertEqual(self.resolve(row(35.47, 139.47, SHINJUKU)), ("Kawasaki, Japan", None, COORDINATES))
+
+    def test_point_outside_every_box(self):
+        address = json.dumps({"city": "Osaka ", "country": "Japan", "borough": "Kita"})
+        self.assertEqual(self.resolve(row(34.7, 135.5, address=address)), ("Osaka, Japan", "Kita", ADDRESS))
+        self.assertEqual(self.resolve(row(34.7, 135.5, SHINJUKU)), ("Tokyo, Japan", None, QUERY))
+        self.assertEqual(self.resolve(row(34.7, 135.5, address="1 Main St, Osaka")), ("", None, ""))
+
+    def test_missing_boxes_file_resolves_by_query_only(self):
+        normalizer = Normalizer(CATALOG, load_boxes(os.path.join(self._tmp.name, "missing.json")))
+        self.assertEqual(normalizer.resolve(row(34.7, 135.5, SHINJUKU))["city_source"], QUERY)
+        self.assertEqual(normalizer.resolve(row(35.70, 139.70))["city_source"], "")
+
+    def test_normalize_file_appends_output_columns_in_order(self):
+        batch = os.path.join(self._tmp.name, "batch.csv")
+        header = ["input_id", "title", "latitude", "longitude", "city", "complete_address"]
+        append_rows(batch, [dict(row(35.70, 139.70, SHINJUKU), title="A", city="Shinjuku-ku"),
+                            dict(row(0, 0), title="B", city="")], header)
+        counts = normalize_file(batch, self.normalizer)
+        self.assertEqual(dict(counts), {QUERY: 1, "unresolved": 1})
+        # An existing column keeps its place; the rest follow in OUTPUT_COLUMNS order
+        self.assertEqual(read_header(batch), header + [c for c in OUTPUT_COLUMNS if c != "city"])
+        rows = list(read_rows(batch))
+        self.assertEqual([(r["city"], r["neighborhood"], r["city_key"]) for r in rows],
+                         [("Tokyo", "Shinjuku", "Tokyo, Japan"), ("", "", "")])
+
+
+class BuildBoxesTest(unittest.TestCase):
+    def test_boxes_from_query_points(self):
+        rows = [row(35.69 + i * 0.001, 139.69 + i * 0.001, SHINJUKU) for i in range(10)]
+        rows += [row(35.5, 139.5, KAWASAKI)] * 3 + [row(35.7, 139.7, "planned")]
+        boxes = build_boxes(rows, CATALOG)
+        self.assertEqual(sorted(boxes["cities"]), ["Tokyo, Japan"])
+        self.assertEqual(sorted(boxes["neighborhoods"]), ["Shinjuku, Tokyo, Japan"])
+        min_lat, min_lon, max_lat, max_lon, points = boxes["cities"]["Tokyo, Japan"]
+        self.assertEqual(points, 10)
+        self.assertTrue(min_lat < 35.69 and max_lat > 35.699 and min_lon < 139.69 and max_lon > 139.699)
+
+
+if __name__ == "__main__":
+    unittest.main()
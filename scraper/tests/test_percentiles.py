@@ -0,0 +1,67 @@
+import unittest
+
+from scraper.percentiles import build_tables, lookup, percentile, rank_table
+
+
+def calculate_percentile(value, all_values):
+    # calculatePercentile in compute-comparative-positioning, including
+    # Math.round's halves-up rounding
+    position = len([v for v in all_values if v < value])
+    return int(position / len(all_values) * 100 + 0.5)
+
+
+def place(n, city, rating="", reviews=""):
+    return {"place_id": f"p{n}", "city": city, "review_rating": rating, "review_count": reviews}
+
+
+def by_city(row):
+    return {"city": row["city"]} if row["city"] else {}
+
+
+class PercentileTest(unittest.TestCase):
+    def test_ties_count_only_lower_values(self):
+        table = rank_table([4, 5, 4, 3, 4])
+        self.assertEqual(table, {"n": 5, "values": [3, 4, 5], "below": [0, 1, 4]})
+        self.assertEqual([percentile(table, v) for v in (2, 3, 4, 4.5, 5, 6)], [0, 0, 20, 80, 80, 100])
+
+    def test_matches_calculate_percentile(self):
+        values = [4.8, 4.5, 4.5, 3.9, 5.0, 4.5, 4.1, 3.9]
+        table = rank_table(values)
+        for value in (3.0, 3.9, 4.0, 4.1, 4.5, 4.8, 4.9, 5.0, 5.5):
+            with self.subTest(value=value):
+                self.assertEqual(percentile(table, value), calculate_percentile(value, values))
+        # Three of eight below is 37.5: halves round up, as in JS
+        self.assertEqual(percentile(table, 4.5), 38)
+
+    def test_single_element_group(self):
+        table = rank_table([4.0])
+        self.assertEqual([percentile(table, v) for v in (3.0, 4.0, 5.0)], [0, 0, 100])
+
+    def test_empty_table_has_no_percentile(self):
+        self.assertIsNone(percentile(rank_table([]), 4.0))
+
+
+class BuildTablesTest(unittest.TestCase):
+    def test_groups_and_empty_metrics(self):
+        rows = [place(1, "kano", "4.0", "10"), place(2, "kano", "4.5", "3"), place(3, "kano", "4.0"),
+                # Latest row of a place wins
+                place(1, "kano", "3.5", "12"),
+                # A group whose places have no ratings gets no rating table
+                place(4, "abuja", reviews="7"),
+                place(5, "", "5.0", "1")]
+        artifact = build_tables(rows, by_city)
+        self.assertEqual(sorted(artifact["scopes"]["city"]), ["abuja", "kano"])
+        kano = artifact["scopes"]["city"]["kano"]
+        self.assertEqual(kano["rating"], {"n": 3, "values": [3.5, 4.0, 4.5], "below": [0, 1, 2]})
+        self.assertEqual(kano["reviews"]["n"], 2)
+        self.assertNotIn("rating", artifact["scopes"]["city"]["abuja"])
+
+        self.assertEqual(lookup(artifact, "city", "kano", "rating", 4.5),
+                         {"percentile": 67, "peer_count": 3, "threshold_met": False})
+        self.assertIsNone(lookup(artifact, "city", "abuja", "rating", 4.0))
+        self.assertIsNone(lookup(artifact, "neighborhood", "kano", "rating", 4.0))
+        self.assertIsNone(lookup(build_tables([], by_city), "city", "kano", "rating", 4.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import csv
+import os
+import random
+import tempfile
+import unittest
+
+from scraper import geohash
+from scraper.planner import load_points, plan_cells, plan_queries
+
+
+def points_in(cell, count, times_seen=1, seed=0):
+    """``count`` random points inside a geohash cell."""
+    rng = random.Random(seed)
+    min_lat, min_lon, max_lat, max_lon = geohash.bbox(cell)
+    return [(rng.uniform(min_lat, max_lat), rng.uniform(min_lon, max_lon), times_seen)
+            for _ in range(count)]
+
+
+class PlanCellsTest(unittest.TestCase):
+    def test_dense_cells_split_and_sparse_neighbours_merge(self):
+        dense = points_in("xn774", 120, seed=1)
+        sparse = points_in("xn776", 3, seed=2) + points_in("xn777", 4, seed=3)
+        planned, dropped = plan_cells(dense + sparse, precision=5, dense=40, sparse=10, max_precision=6)
+        by_cell = {cell.cell: cell for cell in planned}
+        self.assertEqual(dropped, [])
+        # Both sparse cells fold into their parent
+        self.assertEqual((by_cell["xn77"].action, by_cell["xn77"].places), ("merge", 7))
+        children = [cell for cell in planned if cell.cell.startswith("xn774")]
+        self.assertTrue(children and all(len(c.cell) == 6 and c.action == "split" for c in children))
+        self.assertEqual(sum(c.places for c in children), 120)
+
+    def test_saturated_cells_are_dropped(self):
+        covered = points_in("xn774", 20, times_seen=3, seed=4)
+        fresh = points_in("xn76p", 20, seed=5)
+        planned, dropped = plan_cells(covered + fresh, precision=5, dense=40, sparse=10)
+        self.assertEqual([(c.cell, c.action) for c in dropped], [("xn774", "saturated")])
+        self.assertEqual([(c.cell, c.action) for c in planned], [("xn76p", "keep")])
+
+    def test_budget_keeps_best_cells(self):
+        points = points_in("xn774", 30, seed=6) + points_in("xn76p", 15, seed=7)
+        queries = plan_queries(points, budget=1, precision=5)
+        self.assertEqual(len(queries), 1)
+        query, cell = queries[0]
+        self.assertEqual(cell.cell, "xn774")
+        lat, lon = geohash.center("xn774")
+        self.assertEqual(query, f"dentists near {lat:.5f},{lon:.5f}")
+
+
+class LoadPointsTest(unittest.TestCase):
+    def test_times_seen_comes_from_hits_only(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            results = os.path.join(tmp, "all_results.csv")
+            hits = os.path.join(tmp, "place_hits.csv")
+            with open(results, "w", encoding="utf-8", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["place_id", "cid", "data_id", "latitude", "longitude"])
+                # p1 changed once, so it is stored twice
+                writer.writerows([["p1", "", "", "35.1", "139.1"], ["p1", "", "", "35.1", "139.1"],
+                                  ["p2", "", "", "35.2", "139.2"], ["p3", "", "", "", ""]])
+            with open(hits, "w", encoding="utf-8", newline="") as f:
+                f.write("place_key,times_seen\nplace_id:p1,2\nplace_id:p2,5\n")
+            points = load_points(os.path.join(tmp, "no_store"), results, hits)
+        self.assertEqual(sorted(points), [(35.1, 139.1, 2), (35.2, 139.2, 5)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,21 @@
+import unittest
+
+from scraper.record import DentistRecord
+
+
+class DentistRecordTest(unittest.TestCase):
+    def test_unparseable_scalars_are_none(self):
+        record = DentistRecord(review_count="inf", cid="1e400", review_rating="n/a", latitude="")
+        self.assertEqual((record.review_count, record.cid, record.rating, record.latitude),
+                         (None, None, None, None))
+
+    def test_scalars_and_lazy_json(self):
+        record = DentistRecord(review_count="12.0", cid="1234567890123456789", review_rating="4.5",
+                               latitude="35.1", longitude="139.2", popular_times='{"Monday": []}')
+        self.assertEqual((record.review_count, record.cid, record.rating), (12, 1234567890123456789, 4.5))
+        self.assertTrue(record.has_location)
+        self.assertEqual(record.popular_times, {"Monday": []})
+
+
+if __name__ == "__main__":
+    unittest.main()
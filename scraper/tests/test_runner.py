@@ -0,0 +1,93 @@
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from scraper import runner
+from scraper.gosom_csv import read_rows
+from scraper.runner import ShardRunner
+
+STUB = (f"{sys.executable} -m scraper.bench.synth stub -input {{input_path}} -results {{results_path}}"
+        " -rows-per-query 3")
+
+
+class ShardRunnerTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.workdir = os.path.join(self._tmp.name, "shards")
+        self.output = os.path.join(self._tmp.name, "results.csv")
+        self.logged = []
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def run_queries(self, queries, stub_args="", chunk_size=1, **kwargs):
+        kwargs.setdefault("workers", 2)
+        shards = ShardRunner(f"{STUB} {stub_args}", workdir=self.workdir, log=self.logged.append, **kwargs)
+        started = time.monotonic()
+        jobs = shards.run(queries, self.output, chunk_size)
+        return jobs, time.monotonic() - started
+
+    def rows(self):
+        return list(read_rows(self.output)) if os.path.exists(self.output) else []
+
+    def test_failed_attempt_is_retried(self):
+        fail = os.path.join(self._tmp.name, "failed-once")
+        jobs, _ = self.run_queries(["dentists Kano"], f"-fail-once {fail}", retries=1)
+        self.assertEqual([(j.status, j.attempts, j.rows) for j in jobs], [("done", 2, 3)])
+        self.assertIn("retrying", self.logged[0])
+
+        os.remove(fail)
+        jobs, _ = self.run_queries(["dentists Kano"], f"-fail-once {fail}", retries=0)
+        self.assertEqual((jobs[0].status, jobs[0].error), ("failed", "exit 1: stub: failing once"))
+        self.assertEqual(self.rows(), [])
+
+    def test_hung_job_times_out_without_holding_up_the_rest(self):
+        queries = ["dentists hang Lagos"] + [f"dentists Area {i}" for i in range(8)]
+        jobs, elapsed = self.run_queries(queries, "-hang-on hang -seconds-per-query 0.3",
+                                         timeout=3, retries=0)
+        self.assertEqual(jobs[0].status, "failed")
+        self.assertTrue(jobs[0].error.startswith("timed out after 3s"))
+        self.assertTrue(all(j.status == "done" for j in jobs[1:]))
+        self.assertEqual(len(self.rows()), 8 * 3)
+        # The free worker took every other job while the hung one ran out its
+        # timeout; an even split would leave four of them behind it
+        serial = sum(j.duration for j in jobs[1:])
+        self.assertLess(elapsed, 3 + serial / 2)
+
+    def test_deadline_caps_attempts_and_leaves_jobs_pending(self):
+        queries = ["dentists hang Lagos", "dentists Kano"]
+        with mock.patch.object(runner, "MIN_ATTEMPT_SECONDS", 0.5):
+            jobs, elapsed = self.run_queries(queries, "-hang-on hang", workers=1, timeout=60,
+                                             retries=1, deadline=1.5)
+        self.assertLess(elapsed, 10)
+        # Cut off by the deadline, so no retry was spent; the second never started
+        self.assertEqual([(j.status, j.attempts, j.error) for j in jobs],
+                         [("pending", 0, "deadline reached"), ("pending", 0, "deadline reached")])
+
+    def test_merge_keeps_query_order_and_tags(self):
+        queries = [f"dentists Area {i} #!#id{i}" for i in range(5)]
+        jobs, _ = self.run_queries(queries, workers=3)
+        self.assertEqual([j.rows for j in jobs], [3] * 5)
+        self.assertEqual([row["input_id"] for row in self.rows()],
+                         [f"id{i}" for i in range(5) for _ in range(3)])
+
+    def test_report_counts_rows_per_query_in_a_chunk(self):
+        queries = [f"dentists Area {i} #!#id{i}" for i in range(5)]
+        fail = os.path.join(self._tmp.name, "failed-once")
+        jobs, _ = self.run_queries(queries[:4], chunk_size=2)
+        jobs += self.run_queries(queries[4:], f"-fail-once {fail}", retries=0)[0]
+        report = os.path.join(self._tmp.name, "report.jsonl")
+        runner.write_report(jobs, report)
+        with open(report, encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f]
+        self.assertEqual([j.rows for j in jobs], [6, 6, 0])
+        self.assertEqual([(e["status"], e["rows"]) for e in entries],
+                         [("done", 3)] * 4 + [("failed", 0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from scraper.ledger import Ledger, query_id
+from scraper.scheduler import refresh_batch, score_queries
+
+NOW = datetime(2026, 6, 1, tzinfo=timezone.utc)
+QUERIES = ["dentists Shinjuku, Tokyo, Japan", "dentists Shibuya, Tokyo, Japan"]
+
+
+class SchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "ledger.sqlite")
+        self.ledger = Ledger(self.path)
+        self.ledger.sync(QUERIES)
+
+    def tearDown(self):
+        self.ledger.close()
+        self._tmp.cleanup()
+
+    def run_query(self, query, rows, new, changed, days_ago):
+        when = (NOW - timedelta(days=days_ago)).isoformat()
+        self.ledger.record(query_id(query), "done", rows, when=when, new=new, changed=changed)
+
+    def scores(self):
+        return {qid: score for score, qid, _ in score_queries(self.ledger, NOW)}
+
+    def test_yield_comes_from_the_latest_run(self):
+        shinjuku, shibuya = (query_id(q) for q in QUERIES)
+        self.run_query(QUERIES[0], 60, 60, 0, days_ago=20)
+        self.run_query(QUERIES[1], 60, 30, 0, days_ago=20)
+        self.assertGreater(self.scores()[shinjuku], self.scores()[shibuya])
+
+        # A refresh that finds nothing new drops the first query's priority
+        self.run_query(QUERIES[0], 60, 0, 0, days_ago=20)
+        self.assertLess(self.scores()[shinjuku], self.scores()[shibuya])
+        self.assertEqual(refresh_batch(self.ledger, 1, now=NOW), [(shibuya, QUERIES[1])])
+
+    def test_recent_queries_are_not_refreshed(self):
+        self.run_query(QUERIES[0], 60, 60, 0, days_ago=2)
+        self.assertEqual(refresh_batch(self.ledger, 5, now=NOW), [])
+
+    def test_failed_refresh_is_retried_then_refreshed_again(self):
+        shinjuku = query_id(QUERIES[0])
+        for days_ago in (80, 60, 40, 20):
+            self.run_query(QUERIES[0], 60, 5, 1, days_ago)
+        self.ledger.record(shinjuku, "failed", error="exit 1", when=(NOW - timedelta(days=10)).isoformat())
+        # A failure after several successful refreshes still gets retried
+        self.assertEqual(self.ledger.select_batch(5), [(shinjuku, QUERIES[0]), (query_id(QUERIES[1]), QUERIES[1])])
+        self.assertNotIn(shinjuku, self.scores())
+
+        self.run_query(QUERIES[0], 60, 5, 1, days_ago=9)
+        self.assertEqual(self.ledger.conn.execute(
+            "SELECT attempts FROM queries WHERE query_id = ?", (shinjuku,)).fetchone(), (0,))
+        self.assertIn(shinjuku, self.scores())
+
+    def test_record_report_stores_dedup_outcomes(self):
+        shinjuku, shibuya = (query_id(q) for q in QUERIES)
+        report = os.path.join(self._tmp.name, "report.jsonl")
+        with open(report, "w", encoding="utf-8") as f:
+            for q in QUERIES:
+                f.write(json.dumps({"query": f"{q} #!#{query_id(q)}", "status": "done", "rows": 40}) + "\n")
+        self.ledger.record_report(report, {shinjuku: {"new": 12, "changed": 3, "unchanged": 25}})
+        found = dict((qid, (new, changed)) for qid, new, changed in self.ledger.conn.execute(
+            "SELECT query_id, new_places, changed_places FROM queries"))
+        # Absent from the outcomes: every row was a known, unchanged place
+        self.assertEqual(found, {shinjuku: (12, 3), shibuya: (0, 0)})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import random
+import string
+import unittest
+
+from scraper.similarity import (GENERATED, SOURCE, LSHIndex, chunk_text, estimate, find_similar,
+                                jaccard, ngram_set, signature, similarity)
+
+# Pseudo-words, so unrelated texts share few 3-grams
+_rng = random.Random(1)
+WORDS = ["".join(_rng.choice(string.ascii_lowercase) for _ in range(_rng.randint(3, 9)))
+         for _ in range(3000)]
+
+
+def text(rng, sentences=12):
+    return " ".join(" ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 14))).capitalize() + "."
+                    for _ in range(sentences))
+
+
+def edit(rng, original, changes):
+    words = original.split()
+    for _ in range(changes):
+        words[rng.randrange(len(words))] = rng.choice(WORDS)
+    return " ".join(words)
+
+
+def brute_force(documents, threshold):
+    """Every flagged (generated, other, kind) by scoring all chunk pairs."""
+    chunks = [(doc, kind, piece) for doc, kind, body in documents for piece in chunk_text(body)]
+    flagged = set()
+    for i, (doc_a, kind_a, a) in enumerate(chunks):
+        for doc_b, kind_b, b in chunks[i + 1:]:
+            if SOURCE == kind_a == kind_b or (doc_a == doc_b and kind_a == kind_b):
+                continue
+            if similarity(a, b) < threshold:
+                continue
+            pair = sorted([(doc_a, kind_a), (doc_b, kind_b)], key=lambda c: (c[1] != GENERATED, str(c[0])))
+            flagged.add((pair[0][0], pair[1][0], pair[1][1]))
+    return flagged
+
+
+class MinHashTest(unittest.TestCase):
+    def test_estimate_tracks_jaccard(self):
+        rng = random.Random(3)
+        base = text(rng)
+        for changes in (0, 5, 20, 60):
+            other = edit(rng, base, changes)
+            a, b = ngram_set(base), ngram_set(other)
+            with self.subTest(changes=changes):
+                self.assertAlmostEqual(estimate(signature(a), signature(b)), jaccard(a, b), delta=0.12)
+
+    def test_signature_is_deterministic_and_dense(self):
+        shingles = ngram_set("Gentle family dentistry in Shinjuku.")
+        sig = signature(shingles)
+        self.assertEqual(sig, signature(set(shingles)))
+        # Densification fills every bin even though there are fewer shingles than bins
+        self.assertNotIn(1 << 64, sig)
+
+    def test_near_duplicates_share_a_band(self):
+        rng = random.Random(5)
+        base = text(rng)
+        index = LSHIndex()
+        index.add("base", signature(ngram_set(base)))
+        index.add("copy", signature(ngram_set(edit(rng, base, 3))))
+        index.add("other", signature(ngram_set(
+            "Open weekdays until 7pm with free parking behind the building. "
+            "Ask reception about payment plans for larger treatments.")))
+        self.assertEqual(list(index.candidates()), [("base", "copy")])
+
+
+class FindSimilarTest(unittest.TestCase):
+    def test_matches_brute_force(self):
+        rng = random.Random(11)
+        sources = {f"d{i}": text(rng, 30) for i in range(8)}
+        documents = [(doc, SOURCE, body) for doc, body in sources.items()]
+        for i, (doc, body) in enumerate(sources.items()):
+            # Light rewrites of their own or another practice's source, copies
+            # of another generated page, and original text
+            if i % 4 == 0:
+                generated = edit(rng, body, 4)
+            elif i % 4 == 1:
+                generated = edit(rng, sources["d0"], 2)
+            elif i % 4 == 2:
+                generated = text(rng, 30)
+            else:
+                generated = edit(rng, body, 150)
+            documents.append((doc, GENERATED, generated))
+
+        found = find_similar(documents)
+        flagged = {(f["generated"], f["other"], f["kind"]) for f in found}
+        self.assertEqual(flagged, brute_force(documents, 0.85))
+        self.assertIn(("d0", "d0", SOURCE), flagged)
+        self.assertIn(("d1", "d0", SOURCE), flagged)
+        for f in found:
+            self.assertGreaterEqual(f["max_similarity"], 0.85)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import random
+import tempfile
+import unittest
+
+from scraper.spatial import SpatialIndex, haversine_km
+
+
+def brute_knn(points, lat, lon, k):
+    ranked = sorted((haversine_km(lat, lon, plat, plon), pid) for pid, plat, plon in points)
+    return [pid for _, pid in ranked[:k]]
+
+
+class SpatialIndexTest(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        # Two dense clusters, one straddling the antimeridian, plus scattered points
+        self.points = [(f"t{i}", 35.69 + rng.uniform(-0.2, 0.2), 139.70 + rng.uniform(-0.2, 0.2))
+                       for i in range(300)]
+        self.points += [(f"f{i}", -17.7 + rng.uniform(-0.5, 0.5), rng.choice([179.8, -179.8]) + rng.uniform(-0.15, 0.15))
+                        for i in range(100)]
+        self.points += [(f"w{i}", rng.uniform(-85, 85), rng.uniform(-180, 179.999))
+                        for i in range(200)]
+        self.index = SpatialIndex.build(self.points)
+
+    def assert_knn_matches(self, index, lat, lon, k):
+        found = index.knn(lat, lon, k)
+        self.assertEqual([pid for pid, _ in found], brute_knn(self.points, lat, lon, k))
+        distances = [d for _, d in found]
+        self.assertEqual(distances, sorted(distances))
+
+    def test_knn_matches_brute_force(self):
+        for lat, lon, k in [(35.69, 139.70, 10), (35.69, 139.70, 350), (-17.7, 179.99, 25),
+                            (-17.7, -179.99, 5), (0.0, 0.0, 3), (89.0, 10.0, 4)]:
+            with self.subTest(lat=lat, lon=lon, k=k):
+                self.assert_knn_matches(self.index, lat, lon, k)
+
+    def test_knn_edge_cases(self):
+        self.assertEqual(self.index.knn(0, 0, 0), [])
+        self.assertEqual(SpatialIndex.build([]).knn(0, 0, 5), [])
+        self.assertEqual(len(self.index.knn(0, 0, len(self.points) + 10)), len(self.points))
+
+    def test_radius_matches_brute_force(self):
+        lat, lon, km = -17.7, 180.0, 30.0
+        expected = {pid for pid, plat, plon in self.points if haversine_km(lat, lon, plat, plon) <= km}
+        self.assertEqual({pid for pid, _ in self.index.radius(lat, lon, km)}, expected)
+        self.assertTrue(any(pid.startswith("f") for pid in expected))
+
+    def test_saved_index_answers_the_same(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "spatial.idx")
+            self.index.save(path)
+            loaded = SpatialIndex.load(path)
+        self.assertEqual(len(loaded), len(self.points))
+        self.assert_knn_matches(loaded, 35.6938, 139.7034, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import gzip
+import http.server
+import io
+import os
+import tempfile
+import threading
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from scraper import uploader
+from scraper.export import Export, read_cursor
+
+
+class _Webhook(http.server.BaseHTTPRequestHandler):
+    """Answers chunk posts; ``fail_from`` makes the Nth chunk onwards return 503."""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        server = self.server
+        server.received += 1
+        if server.fail_from is not None and server.received >= server.fail_from:
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        rows = gzip.decompress(body).decode("utf-8").count("\n") - 1
+        server.rows += rows
+        data = b'{"inserted": %d, "errors": 0}' % rows
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class ExportSyncTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self._tmp.name, "export")
+        self.cursor = os.path.join(self._tmp.name, "sync.cursor")
+        export = Export(self.root)
+        for run in range(3):
+            export.append([{"place_id": f"p{run}-{i}", "website": "https://example.com"}
+                           for i in range(10)])
+        self.server = http.server.HTTPServer(("127.0.0.1", 0), _Webhook)
+        self.server.received = 0
+        self.server.rows = 0
+        self.server.fail_from = None
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        env = {k: v for k, v in os.environ.items() if k != "SCRAPER_METRICS"}
+        self._env = mock.patch.dict(os.environ, env, clear=True)
+        self._env.start()
+
+    def tearDown(self):
+        self._env.stop()
+        self.server.shutdown()
+        self.server.server_close()
+        self._tmp.cleanup()
+
+    def sync(self):
+        out = io.StringIO()
+        with redirect_stdout(out):
+            uploader.main(["--export", self.root, "--cursor", self.cursor,
+                           "--url", f"http://127.0.0.1:{self.server.server_port}/hook",
+                           "--chunk-rows", "8", "--retries", "0"])
+        return out.getvalue()
+
+    def test_cursor_advances_after_full_delivery(self):
+        self.sync()
+        self.assertEqual(self.server.rows, 30)
+        self.assertEqual(read_cursor(self.cursor), 3)
+        self.assertIn("Nothing to sync", self.sync())
+
+    def test_failed_chunk_keeps_cursor_and_next_run_resends(self):
+        self.server.fail_from = 3
+        output = self.sync()
+        self.assertIn("Sync failed", output)
+        # Two chunks got through, but the cursor only moves on full delivery
+        self.assertEqual(self.server.rows, 16)
+        self.assertEqual(read_cursor(self.cursor), 0)
+
+        self.server.fail_from = None
+        self.server.rows = 0
+        self.sync()
+        self.assertEqual(self.server.rows, 30)
+        self.assertEqual(read_cursor(self.cursor), 3)
+
+    def test_only_new_deltas_are_sent(self):
+        self.sync()
+        Export(self.root).append([{"place_id": "new", "website": "https://example.org"}])
+        self.server.rows = 0
+        self.sync()
+        self.assertEqual(self.server.rows, 1)
+        self.assertEqual(read_cursor(self.cursor), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
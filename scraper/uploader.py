@@ -0,0 +1,248 @@
+"""
+Chunked, compressed upload of a batch CSV to the github-sync-webhook function.
+
+The webhook only reads the ~15 fields of its ``ScrapedDentist`` interface, so
+the heavyweight JSON columns (reviews, images, popular times) are projected
+away before sending. Rows go out in fixed-size gzip-compressed CSV chunks over
+one keep-alive connection per host, which keeps each request well inside the
+edge function's body and time limits. Every chunk carries an Idempotency-Key
+derived from its content, so a retried chunk is recognisable as a repeat.
+
+With ``--export`` the rows come from the delta export instead: every delta
+after the cursor in ``--cursor``, which advances only once all chunks are
+delivered. A failed delivery is logged and exits 0, so the workflow still
+commits the export and the next run resends everything after the cursor.
+
+Usage (from the repository root):
+    SUPABASE_URL=... WEBHOOK_SECRET=... python3 -m scraper.uploader scraper/batch_results.csv
+    SUPABASE_URL=... WEBHOOK_SECRET=... python3 -m scraper.uploader \
+        --export scraper/export --cursor scraper/export/sync.cursor
+"""
+
+import argparse
+import csv
+import gzip
+import hashlib
+import http.client
+import io
+import json
+import os
+import time
+from urllib.parse import urlsplit
+
+from .export import Export, read_cursor, write_cursor
+from .gosom_csv import read_rows
+from .metrics import stage
+
+# Fields of ScrapedDentist in supabase/functions/github-sync-webhook/index.ts
+SYNC_COLUMNS = [
+    "input_id", "link", "title", "category", "address", "open_hours",
+    "website", "phone", "review_count", "review_rating", "latitude",
+    "longitude", "place_id", "emails", "complete_address", "city",
+]
+
+WEBHOOK_PATH = "/functions/v1/github-sync-webhook"
+DEFAULT_CHUNK_ROWS = 500
+DEFAULT_RETRIES = 4
+DEFAULT_TIMEOUT = 120
+RETRY_STATUSES = frozenset([408, 425, 429, 500, 502, 503, 504])
+
+
+class UploadError(Exception):
+    """A chunk could not be delivered after all retries."""
+
+
+class Session:
+    """Keeps one persistent HTTP(S) connection per host and reuses it."""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT):
+        self.timeout = timeout
+        self._connections = {}
+
+    def _connection(self, scheme, netloc):
+        key = (scheme, netloc)
+        conn = self._connections.get(key)
+        if conn is None:
+            cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            conn = cls(netloc, timeout=self.timeout)
+            self._connections[key] = conn
+        return conn
+
+    def _discard(self, scheme, netloc):
+        conn = self._connections.pop((scheme, netloc), None)
+        if conn is not None:
+            conn.close()
+
+    def request(self, method, url, body=None, headers=None):
+        """Send a request and return (status, response headers, body bytes)."""
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        conn = self._connection(parts.scheme, parts.netloc)
+        try:
+            conn.request(method, path, body=body, headers=headers or {})
+            response = conn.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            # Stale keep-alive sockets surface here; drop and let caller retry
+            self._discard(parts.scheme, parts.netloc)
+            raise
+        if response.getheader("Connection", "").lower() == "close":
+            self._discard(parts.scheme, parts.netloc)
+        return response.status, dict(response.getheaders()), data
+
+    def close(self):
+        for conn in self._connections.values():
+            conn.close()
+        self._connections.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def project(rows, columns=SYNC_COLUMNS):
+    """Yield rows restricted to the columns the webhook consumes."""
+    for row in rows:
+        yield {c: row.get(c, "") for c in columns}
+
+
+def chunks(rows, size=DEFAULT_CHUNK_ROWS):
+    """Group an iterable of rows into lists of at most ``size``."""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def encode_chunk(rows, columns=SYNC_COLUMNS):
+    """Serialise rows as CSV; returns (raw bytes, gzip bytes)."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore",
+                            lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(rows)
+    raw = buffer.getvalue().encode("utf-8")
+    return raw, gzip.compress(raw, compresslevel=6, mtime=0)
+
+
+class Uploader:
+    """Posts projected, gzip-compressed chunks to the sync webhook."""
+
+    def __init__(self, url, secret=None, chunk_rows=DEFAULT_CHUNK_ROWS,
+                 retries=DEFAULT_RETRIES, backoff=1.0, session=None, log=print):
+        self.url = url
+        self.secret = secret
+        self.chunk_rows = chunk_rows
+        self.retries = retries
+        self.backoff = backoff
+        self.session = session or Session()
+        self.log = log
+
+    def _send(self, raw, body, index):
+        headers = {
+            "Content-Type": "text/csv; charset=utf-8",
+            "Content-Encoding": "gzip",
+            "Idempotency-Key": hashlib.sha256(raw).hexdigest(),
+            "Connection": "keep-alive",
+        }
+        if self.secret:
+            headers["Authorization"] = f"Bearer {self.secret}"
+
+        for attempt in range(self.retries + 1):
+            try:
+                status, _, data = self.session.request("POST", self.url, body, headers)
+            except (OSError, http.client.HTTPException) as exc:
+                status, data = None, str(exc).encode("utf-8")
+            if status is not None and 200 <= status < 300:
+                try:
+                    return json.loads(data or b"{}")
+                except ValueError:
+                    return {}
+            retryable = status is None or status in RETRY_STATUSES
+            if not retryable or attempt == self.retries:
+                raise UploadError(f"chunk {index} failed with status {status}: "
+                                  f"{data[:200].decode('utf-8', 'replace')}")
+            delay = self.backoff * (2 ** attempt)
+            self.log(f"Chunk {index} got status {status}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+    def upload(self, rows):
+        """Upload all rows; returns a summary dict."""
+        summary = {"chunks": 0, "rows": 0, "raw_bytes": 0, "sent_bytes": 0,
+                   "inserted": 0, "errors": 0}
+        for index, chunk in enumerate(chunks(project(rows), self.chunk_rows)):
+            raw, body = encode_chunk(chunk)
+            response = self._send(raw, body, index)
+            summary["chunks"] += 1
+            summary["rows"] += len(chunk)
+            summary["raw_bytes"] += len(raw)
+            summary["sent_bytes"] += len(body)
+            summary["inserted"] += response.get("inserted", 0) or 0
+            summary["errors"] += response.get("errors", 0) or 0
+        return summary
+
+    def upload_file(self, path):
+        return self.upload(read_rows(path))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Upload a batch CSV to github-sync-webhook")
+    parser.add_argument("batch_file", nargs="?", help="gosom CSV to upload")
+    parser.add_argument("--export", help="upload export deltas after --cursor instead of a batch file")
+    parser.add_argument("--cursor", help="file holding the last delta uploaded")
+    parser.add_argument("--url", help="webhook URL (default: $SUPABASE_URL + webhook path)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES)
+    args = parser.parse_args(argv)
+
+    if bool(args.batch_file) == bool(args.export):
+        parser.error("give either a batch file or --export")
+    if args.batch_file and not os.path.exists(args.batch_file):
+        print(f"No batch file at {args.batch_file}")
+        return
+    plan = None
+    if args.export:
+        cursor = read_cursor(args.cursor)
+        plan, rows = Export(args.export).rows_since(cursor)
+        if not plan["files"]:
+            print(f"Nothing to sync after cursor {plan['cursor']}")
+            return
+    else:
+        rows = read_rows(args.batch_file)
+    url = args.url or os.environ.get("SUPABASE_URL", "").rstrip("/") + WEBHOOK_PATH
+    if not urlsplit(url).netloc:
+        parser.error("set --url or SUPABASE_URL")
+
+    try:
+        with stage("upload") as metrics, Session() as session:
+            uploader = Uploader(url, os.environ.get("WEBHOOK_SECRET"), args.chunk_rows,
+                                args.retries, session=session)
+            summary = uploader.upload(rows)
+            # What the webhook reported back, not just what was sent
+            metrics.add(rows_in=summary["rows"], chunks=summary["chunks"], bytes_raw=summary["raw_bytes"],
+                        bytes_sent=summary["sent_bytes"], inserted=summary["inserted"],
+                        webhook_errors=summary["errors"])
+            if plan is not None:
+                metrics.add(files=len(plan["files"]))
+                if args.cursor:
+                    write_cursor(args.cursor, plan["cursor"])
+    except UploadError as exc:
+        if plan is None:
+            raise
+        print(f"Sync failed, cursor stays at {cursor} for the next run: {exc}")
+        return
+    print(f"Uploaded {summary['rows']} rows in {summary['chunks']} chunks: "
+          f"{summary['sent_bytes']} bytes sent ({summary['raw_bytes']} uncompressed), "
+          f"{summary['inserted']} inserted, {summary['errors']} errors")
+
+
+if __name__ == "__main__":
+    main()
@@ -21,6 +21,8 @@ interface ScrapedDentist {
   place_id: string;
   emails: string;
   complete_address: string;
+  // Resolved from the originating query/coordinates by scraper/normalize.py
+  city?: string;
 }
 
 function parseCSV(csvText: string): ScrapedDentist[] {
@@ -102,9 +104,14 @@ Deno.serve(async (req) => {
 
     // Get CSV content
     const contentType = req.headers.get("Content-Type") || "";
+    const contentEncoding = req.headers.get("Content-Encoding") || "";
     let csvText: string;
-    
-    if (contentType.includes("text/csv")) {
+
+    if (contentEncoding.includes("gzip") && req.body) {
+      // Chunked uploads from scraper/uploader.py are gzip-compressed CSV
+      const decompressed = req.body.pipeThrough(new DecompressionStream("gzip"));
+      csvText = await new Response(decompressed).text();
+    } else if (contentType.includes("text/csv")) {
       csvText = await req.text();
     } else if (contentType.includes("application/json")) {
       const body = await req.json();
@@ -156,7 +163,7 @@ Deno.serve(async (req) => {
           continue;
         }
 
-        const city = extractCity(dentist.complete_address || dentist.address || "", dentist.input_id);
+        const city = dentist.city || extractCity(dentist.complete_address || dentist.address || "", dentist.input_id);
         
         // Extract first email if multiple
         let email: string | null = null;